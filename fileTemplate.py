@@ -23,10 +23,21 @@
 #
 ################################################################################
 #
+# A template is an HTML file with placeholder comments, like <!-- BODY -->, that
+# are replaced with the text of each page.
+#
+# Each template file is parsed once into a list of literal text and placeholder
+# segments, and kept in a cache. The cache checks the file's modification time,
+# so an edited template is parsed again, but the file is not read again while it
+# is unchanged. A page is made by joining the segments, or is sent as chunks
+# straight to a WSGI response, so the time is linear in the number of table rows.
 #
 ################################################################################
+import os
+import re
 import sys
 import copy
+import threading
 from datetime import datetime
 
 
@@ -49,12 +60,16 @@ BODY_TEXT_VAR_NAME = "<!-- BODY -->"
 TABLE_TEXT_VAR_NAME = "<!-- TABLE -->"
 JAVASCRIPT_DICT_TEXT_VAR_NAME = "<!-- JSCRIPTDICT -->"
 LOG_TEXT_VAR_NAME = "<!-- LOG -->"
+g_TemplateVarNameList = [BODY_TEXT_VAR_NAME, TABLE_TEXT_VAR_NAME, JAVASCRIPT_DICT_TEXT_VAR_NAME, LOG_TEXT_VAR_NAME]
+
+# The size of each chunk of a page sent to a WSGI response.
+RESPONSE_CHUNK_SIZE = 64 * 1024
 class CHTMLFileTemplate(object):
     #####################################################
     # Constructor - This method is part of any class
     #####################################################
     def __init__(self):
-        self.m_Body = ""
+        self.m_BodyStrList = []
         self.m_TableStr = ""
         self.m_HTMLTableStrList = []
         self.m_JScriptDictEntryList = []
@@ -75,7 +90,7 @@ class CHTMLFileTemplate(object):
     # [CHTMLFileTemplate::SetBodyStr]
     #####################################################
     def SetBodyStr(self, textStr):
-        self.m_Body += textStr
+        self.m_BodyStrList.append(textStr)
 
 
     #####################################################
@@ -90,17 +105,17 @@ class CHTMLFileTemplate(object):
     # [CHTMLFileTemplate::AddHTMLTableRowToDoc]
     #####################################################
     def AddHTMLTableRowToDoc(self, textStrList):
-        rowStr = "<tr>"
+        cellStrList = ["<tr>"]
 
         for textStr in textStrList:
             if (textStr.startswith("<td")):
-                rowStr = rowStr + " " + str(textStr)
+                cellStrList.append(" " + str(textStr))
             else:
-                rowStr = rowStr + " <td>" + str(textStr) + "</td>"
+                cellStrList.append(" <td>" + str(textStr) + "</td>")
         # End - for textStr in textStrList:
 
-        rowStr = rowStr + "</tr>\n"
-        self.m_HTMLTableStrList.append(rowStr)
+        cellStrList.append("</tr>\n")
+        self.m_HTMLTableStrList.append("".join(cellStrList))
     # End - AddHTMLTableRowToDoc
 
 
@@ -172,40 +187,75 @@ class CHTMLFileTemplate(object):
 
 
     #####################################################
-    # [CHTMLFileTemplate::ExpandTemplate]
+    #
+    # [CHTMLFileTemplate::ExpandTemplateChunks]
+    #
+    # Returns an iterator of the strings of the page, in order.
+    # The template is read from the cache, and only parsed if the file changed.
     #####################################################
-    def ExpandTemplate(self, templateFilePathName):
-        templateStr = ""
-        with open(templateFilePathName, 'r') as fileH:
-            templateStr = fileH.read()
+    def ExpandTemplateChunks(self, templateFilePathName):
+        compiledTemplate = GetCompiledTemplate(templateFilePathName)
+        return compiledTemplate.Render(self.GetVarChunksDict())
+    # End - ExpandTemplateChunks
 
-        templateStr = templateStr.replace(BODY_TEXT_VAR_NAME, self.m_Body)
 
-        # Make a string with the HTML Table contents
-        tableStr = self.m_TableStr
+    #####################################################
+    #
+    # [CHTMLFileTemplate::GetVarChunksDict]
+    #
+    # The text for each placeholder, as a list of strings.
+    #####################################################
+    def GetVarChunksDict(self):
+        # The table is the table string, and then each row on its own line
+        tableStrList = [self.m_TableStr]
         for currentStr in self.m_HTMLTableStrList:
-            tableStr = tableStr + currentStr + "\n"
-        templateStr = templateStr.replace(TABLE_TEXT_VAR_NAME, tableStr)
+            tableStrList.append(currentStr)
+            tableStrList.append("\n")
 
-        # Make a string with the Javascript array contents
-        dictDeclarationStr = ""
-        tableStr = ""
+        # The Javascript array contents
+        dictDeclarationStrList = []
         for currentStr in self.m_JScriptDictEntryList:
-            dictDeclarationStr = dictDeclarationStr + currentStr + "\n"
-        templateStr = templateStr.replace(JAVASCRIPT_DICT_TEXT_VAR_NAME, dictDeclarationStr)
-
-        # Make a string with the logging contents
-        logStr = ""
-        for currentStr in self.m_LogStrList:
-            logStr = logStr + currentStr + "\n<br>"
-        if (logStr != ""):
-            logStr = "Log:\n<br>" + logStr
-        templateStr = templateStr.replace(LOG_TEXT_VAR_NAME, logStr)
-
-        return templateStr
+            dictDeclarationStrList.append(currentStr)
+            dictDeclarationStrList.append("\n")
+
+        # The logging contents
+        logStrList = []
+        if (len(self.m_LogStrList) > 0):
+            logStrList.append("Log:\n<br>")
+            for currentStr in self.m_LogStrList:
+                logStrList.append(currentStr)
+                logStrList.append("\n<br>")
+        # End - if (len(self.m_LogStrList) > 0):
+
+        return {BODY_TEXT_VAR_NAME: self.m_BodyStrList,
+                TABLE_TEXT_VAR_NAME: tableStrList,
+                JAVASCRIPT_DICT_TEXT_VAR_NAME: dictDeclarationStrList,
+                LOG_TEXT_VAR_NAME: logStrList}
+    # End - GetVarChunksDict
+
+
+    #####################################################
+    # [CHTMLFileTemplate::ExpandTemplate]
+    #####################################################
+    def ExpandTemplate(self, templateFilePathName):
+        return "".join(self.ExpandTemplateChunks(templateFilePathName))
     # End - ExpandTemplate
 
 
+    #####################################################
+    #
+    # [CHTMLFileTemplate::ExpandTemplateToResponse]
+    #
+    # Returns an iterator of UTF-8 byte chunks, of about RESPONSE_CHUNK_SIZE each,
+    # which a WSGI application can return as its response body.
+    # The template is found before this returns, so a missing file raises
+    # here and not after the response has started.
+    #####################################################
+    def ExpandTemplateToResponse(self, templateFilePathName):
+        return MakeResponseChunks(self.ExpandTemplateChunks(templateFilePathName))
+    # End - ExpandTemplateToResponse
+
+
 
     #####################################################
     # [CHTMLFileTemplate::MakeFileFromTemplate]
@@ -225,6 +275,131 @@ class CHTMLFileTemplate(object):
 
 
 
+################################################################################
+#
+# class CCompiledTemplate
+#
+# A template file, parsed into segments. Each segment is either literal text,
+# or the name of a placeholder.
+################################################################################
+class CCompiledTemplate(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, templateFilePathName, templateStr, modifiedTime, fileSize):
+        self.m_FilePathName = templateFilePathName
+        self.m_ModifiedTime = modifiedTime
+        self.m_FileSize = fileSize
+
+        # A list of (fIsVar, textStr)
+        self.m_SegmentList = []
+        currentOffset = 0
+        for varMatch in g_TemplateVarPattern.finditer(templateStr):
+            if (varMatch.start() > currentOffset):
+                self.m_SegmentList.append((False, templateStr[currentOffset:varMatch.start()]))
+            self.m_SegmentList.append((True, varMatch.group(0)))
+            currentOffset = varMatch.end()
+        # End - for varMatch in g_TemplateVarPattern.finditer(templateStr):
+        if (currentOffset < len(templateStr)):
+            self.m_SegmentList.append((False, templateStr[currentOffset:]))
+    # End -  __init__
+
+
+    #####################################################
+    # [CCompiledTemplate::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CCompiledTemplate::IsCurrent]
+    #####################################################
+    def IsCurrent(self, modifiedTime, fileSize):
+        return ((modifiedTime == self.m_ModifiedTime) and (fileSize == self.m_FileSize))
+    # End - IsCurrent
+
+
+    #####################################################
+    #
+    # [CCompiledTemplate::Render]
+    #
+    # varChunksDict is a dict of placeholder to a list of strings.
+    # A placeholder that is not in the dict is replaced with nothing.
+    # Returns an iterator of strings.
+    #####################################################
+    def Render(self, varChunksDict):
+        for fIsVar, textStr in self.m_SegmentList:
+            if (fIsVar):
+                yield from varChunksDict.get(textStr, [])
+            else:
+                yield textStr
+        # End - for fIsVar, textStr in self.m_SegmentList:
+    # End - Render
+
+# End - CCompiledTemplate
+
+
+
+# The parsed templates, by file path.
+g_TemplateVarPattern = re.compile("|".join(re.escape(varName) for varName in g_TemplateVarNameList))
+g_CompiledTemplateDict = {}
+g_CompiledTemplateLock = threading.Lock()
+
+
+################################################################################
+#
+# [GetCompiledTemplate]
+#
+# Returns the parsed template. The file is only read the first time, and
+# again if its modification time or size changes.
+################################################################################
+def GetCompiledTemplate(templateFilePathName):
+    fileStat = os.stat(templateFilePathName)
+    compiledTemplate = g_CompiledTemplateDict.get(templateFilePathName, None)
+    if ((compiledTemplate is not None) and (compiledTemplate.IsCurrent(fileStat.st_mtime_ns, fileStat.st_size))):
+        return compiledTemplate
+
+    with open(templateFilePathName, 'r') as fileH:
+        templateStr = fileH.read()
+    compiledTemplate = CCompiledTemplate(templateFilePathName, templateStr, fileStat.st_mtime_ns, fileStat.st_size)
+    with g_CompiledTemplateLock:
+        g_CompiledTemplateDict[templateFilePathName] = compiledTemplate
+
+    return compiledTemplate
+# End - GetCompiledTemplate
+
+
+
+################################################################################
+#
+# [MakeResponseChunks]
+#
+# Join an iterator of strings into UTF-8 byte chunks of about chunkSize.
+# A WSGI server writes each chunk separately, so one chunk per string is slow.
+################################################################################
+def MakeResponseChunks(strIterator, chunkSize=RESPONSE_CHUNK_SIZE):
+    pendingStrList = []
+    pendingSize = 0
+    for textStr in strIterator:
+        pendingStrList.append(textStr)
+        pendingSize += len(textStr)
+        if (pendingSize >= chunkSize):
+            yield "".join(pendingStrList).encode('utf-8')
+            pendingStrList = []
+            pendingSize = 0
+    # End - for textStr in strIterator:
+
+    if (pendingSize > 0):
+        yield "".join(pendingStrList).encode('utf-8')
+# End - MakeResponseChunks
+
+
+
+
+
 ################################################################################
 ################################################################################
 def MakeTemplate():
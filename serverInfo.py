@@ -202,10 +202,11 @@ def MakeServerInfoTable():
 
 ################################################################################
 #
-# [MakeServerInfoPage]
+# [MakeServerInfoTemplate]
 #
+# Returns the filled in template, and the path of the template file.
 ################################################################################
-def MakeServerInfoPage(requestContext):
+def MakeServerInfoTemplate(requestContext):
     startimeStr = datetime.today().strftime("%A %B %d, %Y (%H:%M:%S)")
     reportHTML = FileTemplate.MakeTemplate()
     reportHTML.SetBodyStr("Collected " + startimeStr)
@@ -218,6 +219,18 @@ def MakeServerInfoPage(requestContext):
 
     localDirPath = os.path.dirname(os.path.realpath(__file__))
     localTemplatePath = localDirPath + "/serverInfoTemplate.html"
+    return reportHTML, localTemplatePath
+# End - MakeServerInfoTemplate
+
+
+
+################################################################################
+#
+# [MakeServerInfoPage]
+#
+################################################################################
+def MakeServerInfoPage(requestContext):
+    reportHTML, localTemplatePath = MakeServerInfoTemplate(requestContext)
     reportStr = reportHTML.ExpandTemplate(localTemplatePath)
 
     return reportStr
@@ -225,4 +238,17 @@ def MakeServerInfoPage(requestContext):
 
 
 
+################################################################################
+#
+# [MakeServerInfoResponse]
+#
+# This is MakeServerInfoPage, as UTF-8 chunks for a WSGI response.
+################################################################################
+def MakeServerInfoResponse(requestContext):
+    reportHTML, localTemplatePath = MakeServerInfoTemplate(requestContext)
+    return reportHTML.ExpandTemplateToResponse(localTemplatePath)
+# End - MakeServerInfoResponse
+
+
+
 
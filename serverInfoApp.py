@@ -123,22 +123,19 @@ def application(environ, start_response):
     requestContext = CWebServerRequestContext(environ)
 
     try:
-        if (True):
-            textStr = ServerInfoLib.MakeServerInfoPage(requestContext)
-        else:
-            textStr = "<html><head></head><body><h2>Hi! Debugging Top Level - Version 11</h2></body><html>"
-        output = textStr.encode('utf-8')
-        contentTypeStr = 'text/html'
+        # The page is sent in chunks as it is made, so there is no Content-Length.
+        outputChunks = ServerInfoLib.MakeServerInfoResponse(requestContext)
+        #outputChunks = ["<html><head></head><body><h2>Hi! Debugging Top Level - Version 11</h2></body><html>".encode('utf-8')]
+        response_headers = [('Content-type', 'text/html')]
     except:
         errStr = "Exception in MakeServerInfoPage. Version 1 textStr=(" + textStr + ")"
         output = errStr.encode('utf-8')
-        contentTypeStr = 'text/plain'
-
-    response_headers = [('Content-type', contentTypeStr),
-                        ('Content-Length', str(len(output)))]
+        outputChunks = [output]
+        response_headers = [('Content-type', 'text/plain'),
+                            ('Content-Length', str(len(output)))]
 
     start_response(status, response_headers)
-    return [output]
+    return outputChunks
 # End - application
 
 
@@ -51,6 +51,8 @@
 import sys
 from datetime import datetime
 
+import numpy as np
+
 # Apache will not let you set the lib from an imported library.
 # So, this *assumes* that it can import all other libraries from the same directory.
 import stockTicker as StockTicker
@@ -76,6 +78,10 @@ class CStockAccount(object):
         self.StockHoldings = {}
 
         self.m_DailyTotalValueList = []
+        # Arrays of daily values from vectorized runs. These are added to the
+        # list the first time the list is needed, since most callers only want
+        # the final value.
+        self.m_PendingDailyValueArrayList = []
     # End -  __init__
 
 
@@ -99,9 +105,35 @@ class CStockAccount(object):
     # [CStockAccount::GetDailyValueList]
     #####################################################
     def GetDailyValueList(self):
+        self.AddPendingDailyValues()
         return(self.m_DailyTotalValueList)
 
 
+    #####################################################
+    #
+    # [CStockAccount::GetDailyValueArray]
+    #
+    # This is GetDailyValueList as a numpy array. After one vectorized
+    # run, it is the run's own array, and nothing is copied.
+    #####################################################
+    def GetDailyValueArray(self):
+        if ((len(self.m_DailyTotalValueList) == 0) and (len(self.m_PendingDailyValueArrayList) == 1)):
+            return self.m_PendingDailyValueArrayList[0]
+
+        return np.array(self.GetDailyValueList(), dtype=np.float64)
+    # End - GetDailyValueArray
+
+
+    #####################################################
+    # [CStockAccount::AddPendingDailyValues]
+    #####################################################
+    def AddPendingDailyValues(self):
+        for dailyValueArray in self.m_PendingDailyValueArrayList:
+            self.m_DailyTotalValueList.extend(dailyValueArray.tolist())
+        self.m_PendingDailyValueArrayList = []
+    # End - AddPendingDailyValues
+
+
     #####################################################
     # [CStockAccount::StartRun]
     #####################################################
@@ -139,11 +171,32 @@ class CStockAccount(object):
                     print("FinishDay. stockValue=" + str(stockValue) + ", self.TotalAccountValue=" + str(self.TotalAccountValue))
          # End - for index, (tickerName, stockHolding) in enumerate(self.StockHoldings.items()):
 
+        self.AddPendingDailyValues()
         self.m_DailyTotalValueList.append(self.TotalAccountValue)
     # End - FinishDay
 
 
 
+    #####################################################
+    #
+    # [CStockAccount::FinishVectorizedRun]
+    #
+    # Set the account to where a whole run left it, when the run was done
+    # with arrays and not one day at a time. numShares is None if the run
+    # never bought stockTicker.
+    #####################################################
+    def FinishVectorizedRun(self, stockTicker, cashTotal, numShares, dailyValueArray):
+        self.CashTotal = cashTotal
+        if (numShares is not None):
+            stockHolding = self.GetStockHolding(stockTicker, True)
+            stockHolding['numShares'] = numShares
+        if (len(dailyValueArray) > 0):
+            self.TotalAccountValue = float(dailyValueArray[-1])
+        self.m_PendingDailyValueArrayList.append(dailyValueArray)
+    # End - FinishVectorizedRun
+
+
+
 
 
     #####################################################
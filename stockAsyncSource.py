@@ -0,0 +1,469 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+################################################################################
+#
+# Async Data Source
+#
+# This fetches quotes and price histories with asyncio, so hundreds of requests
+# can be waiting on the network at once from one thread. It only uses the
+# standard library. There are 3 layers:
+#
+#   CAsyncConnectionPool - Keeps HTTP/1.1 connections open for reuse, and caps
+#       the number of connections to each host.
+#   CTokenBucket - Limits the request rate to each host. The bucket fills at
+#       requestsPerSec, up to burstSize requests.
+#   CAsyncDataSource - Sends each request through the bucket and pool, and retries
+#       throttled or failed requests after a jittered exponential backoff.
+#
+################################################################################
+import sys
+import ssl
+import json
+import random
+import asyncio
+import urllib.parse
+
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockTicker as StockTicker
+
+DEFAULT_REQUESTS_PER_SEC = 20.0
+DEFAULT_BURST_SIZE = 20
+DEFAULT_CONNECTIONS_PER_HOST = 8
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_BACKOFF_SECS = 0.25
+DEFAULT_MAX_BACKOFF_SECS = 8.0
+DEFAULT_TIMEOUT_SECS = 10.0
+
+# These are worth retrying. 0 means the server could not be reached.
+g_RetryStatusList = [0, 429, 500, 502, 503, 504]
+
+QUOTE_BATCH_SIZE = 50
+USER_AGENT = "Mozilla/5.0"
+
+# With no first day, ask for the history from 1900, so it has the years before 1970.
+FULL_HISTORY_FIRST_DAY_NUM = StockTicker.DateToDayNum(1900, 1, 1)
+
+
+
+
+
+################################################################################
+#
+# class CTokenBucket
+#
+################################################################################
+class CTokenBucket(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, requestsPerSec, burstSize):
+        self.m_RequestsPerSec = float(requestsPerSec)
+        self.m_BurstSize = float(max(1, burstSize))
+        self.m_NumTokens = self.m_BurstSize
+        self.m_LastFillTime = None
+    # End -  __init__
+
+
+    #####################################################
+    #
+    # [CTokenBucket::Acquire]
+    #
+    # Wait until there is a token, and take it.
+    # This is only called from the event loop thread, so it needs no lock.
+    #####################################################
+    async def Acquire(self):
+        loop = asyncio.get_running_loop()
+        while (True):
+            currentTime = loop.time()
+            if (self.m_LastFillTime is not None):
+                self.m_NumTokens = min(self.m_BurstSize, 
+                                    self.m_NumTokens + ((currentTime - self.m_LastFillTime) * self.m_RequestsPerSec))
+            self.m_LastFillTime = currentTime
+
+            if (self.m_NumTokens >= 1.0):
+                self.m_NumTokens -= 1.0
+                return
+
+            await asyncio.sleep((1.0 - self.m_NumTokens) / self.m_RequestsPerSec)
+        # End - while (True):
+    # End - Acquire
+
+# End - CTokenBucket
+
+
+
+
+
+################################################################################
+#
+# class CAsyncConnectionPool
+#
+################################################################################
+class CAsyncConnectionPool(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, maxConnectionsPerHost, timeoutSecs):
+        self.m_MaxConnectionsPerHost = maxConnectionsPerHost
+        self.m_TimeoutSecs = timeoutSecs
+        self.m_HostSemaphoreDict = {}
+        self.m_IdleConnectionDict = {}
+        self.m_NumConnectionsOpened = 0
+        self.m_SslContext = None
+    # End -  __init__
+
+
+    #####################################################
+    #
+    # [CAsyncConnectionPool::Request]
+    #
+    # Send a GET, and return the status, a dict of lower-case header
+    # names, and the body. The status is 0 if the request failed.
+    #####################################################
+    async def Request(self, url):
+        urlParts = urllib.parse.urlsplit(url)
+        fSecure = (urlParts.scheme == 'https')
+        hostName = urlParts.hostname
+        port = urlParts.port if (urlParts.port is not None) else (443 if fSecure else 80)
+        hostKey = (urlParts.scheme, hostName, port)
+        pathStr = urlParts.path if (urlParts.path != '') else '/'
+        if (urlParts.query != ''):
+            pathStr = pathStr + '?' + urlParts.query
+        requestBytes = ("GET " + pathStr + " HTTP/1.1\r\n"
+                        + "Host: " + urlParts.netloc + "\r\n"
+                        + "User-Agent: " + USER_AGENT + "\r\n"
+                        + "Accept: application/json\r\n"
+                        + "Connection: keep-alive\r\n\r\n").encode('latin-1')
+
+        if (hostKey not in self.m_HostSemaphoreDict):
+            self.m_HostSemaphoreDict[hostKey] = asyncio.Semaphore(self.m_MaxConnectionsPerHost)
+            self.m_IdleConnectionDict[hostKey] = []
+
+        async with self.m_HostSemaphoreDict[hostKey]:
+            # An idle connection may have been closed by the server, so if a reused
+            # connection fails, then try once more on a new one.
+            for attemptNum in range(2):
+                fReused = (len(self.m_IdleConnectionDict[hostKey]) > 0)
+                writer = None
+                try:
+                    if (fReused):
+                        reader, writer = self.m_IdleConnectionDict[hostKey].pop()
+                    else:
+                        reader, writer = await asyncio.wait_for(self.OpenConnection(hostName, port, fSecure), self.m_TimeoutSecs)
+
+                    writer.write(requestBytes)
+                    statusCode, headerDict, bodyBytes, fKeepOpen = await asyncio.wait_for(self.ReadResponse(reader), self.m_TimeoutSecs)
+                except (OSError, EOFError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    # Do not leave the socket open until it is garbage collected.
+                    if (writer is not None):
+                        writer.close()
+                    if (fReused):
+                        continue
+                    return 0, {}, b''
+                # End - try
+
+                if (fKeepOpen):
+                    self.m_IdleConnectionDict[hostKey].append((reader, writer))
+                else:
+                    writer.close()
+                return statusCode, headerDict, bodyBytes
+            # End - for attemptNum in range(2):
+        # End - async with self.m_HostSemaphoreDict[hostKey]:
+
+        return 0, {}, b''
+    # End - Request
+
+
+    #####################################################
+    # [CAsyncConnectionPool::OpenConnection]
+    #####################################################
+    async def OpenConnection(self, hostName, port, fSecure):
+        sslContext = None
+        if (fSecure):
+            if (self.m_SslContext is None):
+                self.m_SslContext = ssl.create_default_context()
+            sslContext = self.m_SslContext
+
+        self.m_NumConnectionsOpened += 1
+        return await asyncio.open_connection(hostName, port, ssl=sslContext)
+    # End - OpenConnection
+
+
+    #####################################################
+    #
+    # [CAsyncConnectionPool::ReadResponse]
+    #
+    # Returns the status, headers, body, and whether the connection can be reused.
+    #####################################################
+    async def ReadResponse(self, reader):
+        statusLine = await reader.readline()
+        if (statusLine == b''):
+            raise EOFError("Connection closed")
+        statusParts = statusLine.decode('latin-1').split(' ', 2)
+        statusCode = int(statusParts[1])
+        fKeepOpen = (statusParts[0] == 'HTTP/1.1')
+
+        headerDict = {}
+        while (True):
+            headerLine = await reader.readline()
+            if (headerLine in (b'\r\n', b'\n', b'')):
+                break
+            headerName, _, headerValue = headerLine.decode('latin-1').partition(':')
+            headerDict[headerName.strip().lower()] = headerValue.strip()
+        # End - while (True):
+
+        if (headerDict.get('connection', '').lower() == 'close'):
+            fKeepOpen = False
+
+        if (headerDict.get('transfer-encoding', '').lower() == 'chunked'):
+            chunkList = []
+            while (True):
+                chunkSize = int((await reader.readline()).split(b';')[0], 16)
+                if (chunkSize == 0):
+                    await reader.readline()
+                    break
+                chunkList.append(await reader.readexactly(chunkSize))
+                await reader.readline()
+            # End - while (True):
+            bodyBytes = b''.join(chunkList)
+        elif ('content-length' in headerDict):
+            bodyBytes = await reader.readexactly(int(headerDict['content-length']))
+        else:
+            bodyBytes = await reader.read()
+            fKeepOpen = False
+
+        return statusCode, headerDict, bodyBytes, fKeepOpen
+    # End - ReadResponse
+
+
+    #####################################################
+    # [CAsyncConnectionPool::Close]
+    #####################################################
+    async def Close(self):
+        for connectionList in self.m_IdleConnectionDict.values():
+            for reader, writer in connectionList:
+                writer.close()
+            connectionList.clear()
+        # End - for connectionList in self.m_IdleConnectionDict.values():
+    # End - Close
+
+# End - CAsyncConnectionPool
+
+
+
+
+
+################################################################################
+#
+# class CAsyncDataSource
+#
+################################################################################
+class CAsyncDataSource(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, requestsPerSec=DEFAULT_REQUESTS_PER_SEC, burstSize=DEFAULT_BURST_SIZE,
+                maxConnectionsPerHost=DEFAULT_CONNECTIONS_PER_HOST, maxAttempts=DEFAULT_MAX_ATTEMPTS,
+                baseBackoffSecs=DEFAULT_BASE_BACKOFF_SECS, maxBackoffSecs=DEFAULT_MAX_BACKOFF_SECS,
+                timeoutSecs=DEFAULT_TIMEOUT_SECS):
+        self.m_RequestsPerSec = requestsPerSec
+        self.m_BurstSize = burstSize
+        self.m_MaxAttempts = maxAttempts
+        self.m_BaseBackoffSecs = baseBackoffSecs
+        self.m_MaxBackoffSecs = maxBackoffSecs
+        self.m_ConnectionPool = CAsyncConnectionPool(maxConnectionsPerHost, timeoutSecs)
+        self.m_HostBucketDict = {}
+
+        # Counters, for measuring throughput and backoff.
+        self.m_NumRequests = 0
+        self.m_NumRetries = 0
+        self.m_NumThrottled = 0
+        self.m_NumFailed = 0
+    # End -  __init__
+
+
+    #####################################################
+    #
+    # [CAsyncDataSource::GetBackoffSecs]
+    #
+    # Full jitter: a random wait up to the exponential backoff. This keeps many
+    # throttled requests from all retrying at the same moment.
+    # A Retry-After header from the server is the least that this waits, but
+    # it is capped at m_MaxBackoffSecs, so one server cannot stall every request.
+    #####################################################
+    def GetBackoffSecs(self, attemptNum, headerDict):
+        backoffSecs = random.uniform(0, min(self.m_MaxBackoffSecs, self.m_BaseBackoffSecs * (2 ** attemptNum)))
+        try:
+            retryAfterSecs = min(self.m_MaxBackoffSecs, float(headerDict.get('retry-after', 0)))
+            backoffSecs = max(backoffSecs, retryAfterSecs)
+        except ValueError:
+            pass
+        return backoffSecs
+    # End - GetBackoffSecs
+
+
+    #####################################################
+    #
+    # [CAsyncDataSource::Get]
+    #
+    # Returns the status and body. This retries up to m_MaxAttempts times,
+    # and the status is the last one if every attempt failed.
+    #####################################################
+    async def Get(self, url):
+        hostName = urllib.parse.urlsplit(url).netloc
+        if (hostName not in self.m_HostBucketDict):
+            self.m_HostBucketDict[hostName] = CTokenBucket(self.m_RequestsPerSec, self.m_BurstSize)
+        tokenBucket = self.m_HostBucketDict[hostName]
+
+        statusCode = 0
+        bodyBytes = b''
+        for attemptNum in range(self.m_MaxAttempts):
+            await tokenBucket.Acquire()
+            self.m_NumRequests += 1
+            statusCode, headerDict, bodyBytes = await self.m_ConnectionPool.Request(url)
+            if (statusCode not in g_RetryStatusList):
+                return statusCode, bodyBytes
+
+            if (statusCode == 429):
+                self.m_NumThrottled += 1
+            if (attemptNum + 1 < self.m_MaxAttempts):
+                self.m_NumRetries += 1
+                await asyncio.sleep(self.GetBackoffSecs(attemptNum, headerDict))
+        # End - for attemptNum in range(self.m_MaxAttempts):
+
+        self.m_NumFailed += 1
+        return statusCode, bodyBytes
+    # End - Get
+
+
+    #####################################################
+    #
+    # [CAsyncDataSource::FetchQuotes]
+    #
+    # Returns a dict of symbol to quote dict, like FetchQuoteSnapshot.
+    #####################################################
+    async def FetchQuotes(self, symbolList, quoteUrl):
+        uniqueSymbolList = list(dict.fromkeys(symbolList))
+        batchList = [uniqueSymbolList[index:index + QUOTE_BATCH_SIZE] 
+                        for index in range(0, len(uniqueSymbolList), QUOTE_BATCH_SIZE)]
+        urlList = [quoteUrl + "?" + urllib.parse.urlencode({'symbols': ",".join(batchSymbolList)}) 
+                    for batchSymbolList in batchList]
+        replyList = await asyncio.gather(*[self.Get(url) for url in urlList])
+
+        snapshotDict = {}
+        for statusCode, bodyBytes in replyList:
+            if (statusCode != 200):
+                continue
+            try:
+                resultList = json.loads(bodyBytes)['quoteResponse']['result']
+            except (ValueError, KeyError, TypeError):
+                continue
+            for quote in resultList:
+                if ('symbol' in quote):
+                    snapshotDict[quote['symbol']] = quote
+        # End - for statusCode, bodyBytes in replyList:
+
+        return snapshotDict
+    # End - FetchQuotes
+
+
+    #####################################################
+    #
+    # [CAsyncDataSource::FetchHistory]
+    #
+    # Get the daily bars of one symbol from the chart API, from firstDayNum
+    # to today. Returns the price columns and number of rows, like
+    # GetHistoryColumns, or None, 0 if the request failed.
+    #####################################################
+    async def FetchHistory(self, tickerSymbol, chartUrl, firstDayNum=FULL_HISTORY_FIRST_DAY_NUM):
+        startSecs = (int(firstDayNum) - StockTicker.EPOCH_DAY_NUM) * 86400
+        queryStr = urllib.parse.urlencode({'period1': startSecs, 'period2': 9999999999, 'interval': '1d'})
+        url = chartUrl + urllib.parse.quote(tickerSymbol, safe='') + "?" + queryStr
+
+        statusCode, bodyBytes = await self.Get(url)
+        if (statusCode != 200):
+            return None, 0
+
+        return ParseChartReply(bodyBytes)
+    # End - FetchHistory
+
+
+    #####################################################
+    # [CAsyncDataSource::Close]
+    #####################################################
+    async def Close(self):
+        await self.m_ConnectionPool.Close()
+
+# End - CAsyncDataSource
+
+
+
+
+
+################################################################################
+#
+# [ParseChartReply]
+#
+# The chart API returns a list of bar times in seconds, and a list for each of
+# open, high, low, close and volume. Days with no trading have null values.
+# The bar time is in UTC, so add the exchange's offset to get the local trading day.
+################################################################################
+def ParseChartReply(bodyBytes):
+    try:
+        chartResult = json.loads(bodyBytes)['chart']['result'][0]
+        gmtOffsetSecs = int(chartResult['meta'].get('gmtoffset', 0))
+        timeArray = np.array(chartResult.get('timestamp', []), dtype=np.int64)
+        quoteDict = chartResult['indicators']['quote'][0]
+        openArray = np.array(quoteDict.get('open', []), dtype=np.float64)
+        highArray = np.array(quoteDict.get('high', []), dtype=np.float64)
+        lowArray = np.array(quoteDict.get('low', []), dtype=np.float64)
+        closeArray = np.array(quoteDict.get('close', []), dtype=np.float64)
+        volumeArray = np.array(quoteDict.get('volume', []), dtype=np.float64)
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None, 0
+
+    # A reply whose lists do not line up cannot be masked, so it is a bad reply for this symbol only.
+    arrayList = [timeArray, openArray, highArray, lowArray, closeArray, volumeArray]
+    if (any(((valueArray.ndim != 1) or (len(valueArray) != len(timeArray))) for valueArray in arrayList)):
+        return None, 0
+
+    fValidArray = ~np.isnan(closeArray)
+    dayNumArray = (((timeArray[fValidArray] + gmtOffsetSecs) // 86400) + StockTicker.EPOCH_DAY_NUM).astype(np.int32)
+    yearArray, monthArray, dayArray = StockTicker.DayNumsToDates(dayNumArray)
+    columnDict = {'y': yearArray.astype(np.int16), 
+                'm': monthArray.astype(np.int8), 
+                'd': dayArray.astype(np.int8),
+                'Op': openArray[fValidArray],
+                'Hi': highArray[fValidArray],
+                'Lo': lowArray[fValidArray],
+                'Cl': closeArray[fValidArray],
+                'Vo': np.nan_to_num(volumeArray[fValidArray]).astype(np.int64),
+                'DayNum': dayNumArray}
+    return columnDict, len(dayNumArray)
+# End - ParseChartReply
+
@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+################################################################################
+#
+# Trading Calendar
+#
+# A trading calendar is the sorted list of days that the market was open.
+# Each of those days is a session, and sessions are numbered from 0.
+# A date is stored as its day number, from datetime.date.toordinal(), which is
+# the same as the DayNum column of the price store.
+#
+# The calendar keeps a dense table with one entry for every calendar day from
+# the first session to the last. Each entry is the index of the last session on
+# or before that day. So, finding the session for a date, or the date N trading
+# days before a date, is one table lookup rather than a walk over the dates.
+# The table is 4 bytes per calendar day, which is under 150KB for a century.
+#
+################################################################################
+import sys
+from datetime import date
+
+import numpy as np
+
+
+
+
+
+################################################################################
+#
+# class CTradingCalendar
+#
+################################################################################
+class CTradingCalendar(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, dayNumArray):
+        self.m_SessionDayNums = np.unique(np.asarray(dayNumArray, dtype=np.int32))
+        self.m_NumSessions = len(self.m_SessionDayNums)
+        self.m_FirstDayNum = 0
+        self.m_LastDayNum = -1
+        self.m_DayToSession = np.zeros(0, dtype=np.int32)
+
+        if (self.m_NumSessions > 0):
+            self.m_FirstDayNum = int(self.m_SessionDayNums[0])
+            self.m_LastDayNum = int(self.m_SessionDayNums[-1])
+            allDayNums = np.arange(self.m_FirstDayNum, self.m_LastDayNum + 1, dtype=np.int32)
+            self.m_DayToSession = (np.searchsorted(self.m_SessionDayNums, allDayNums, side='right') - 1).astype(np.int32)
+    # End -  __init__
+
+
+    #####################################################
+    # [CTradingCalendar::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CTradingCalendar::GetNumSessions]
+    #####################################################
+    def GetNumSessions(self):
+        return self.m_NumSessions
+
+    #####################################################
+    # [CTradingCalendar::GetSessionDayNums]
+    #####################################################
+    def GetSessionDayNums(self):
+        return self.m_SessionDayNums
+
+    #####################################################
+    # [CTradingCalendar::GetSessionDayNum]
+    #####################################################
+    def GetSessionDayNum(self, sessionIndex):
+        return int(self.m_SessionDayNums[sessionIndex])
+
+    #####################################################
+    # [CTradingCalendar::GetSessionDate]
+    #####################################################
+    def GetSessionDate(self, sessionIndex):
+        dateValue = date.fromordinal(int(self.m_SessionDayNums[sessionIndex]))
+        return dateValue.year, dateValue.month, dateValue.day
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::GetSessionOnOrBefore]
+    #
+    # Returns the index of the last session on or before the day.
+    # This is -1 if the day is before the first session.
+    # dayNum may also be an array, and then this returns an array.
+    #####################################################
+    def GetSessionOnOrBefore(self, dayNum):
+        if (np.ndim(dayNum) > 0):
+            dayNumArray = np.asarray(dayNum, dtype=np.int64)
+            if (self.m_NumSessions <= 0):
+                return np.full(dayNumArray.shape, -1, dtype=np.int32)
+            tableIndex = np.clip(dayNumArray - self.m_FirstDayNum, 0, len(self.m_DayToSession) - 1)
+            return np.where(dayNumArray < self.m_FirstDayNum, -1, self.m_DayToSession[tableIndex])
+        # End - if (np.ndim(dayNum) > 0):
+
+        if (dayNum < self.m_FirstDayNum):
+            return -1
+        if (dayNum > self.m_LastDayNum):
+            return self.m_NumSessions - 1
+        return int(self.m_DayToSession[int(dayNum) - self.m_FirstDayNum])
+    # End - GetSessionOnOrBefore
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::GetSessionOnOrAfter]
+    #
+    # Returns the index of the first session on or after the day.
+    # This is GetNumSessions() if the day is after the last session.
+    # dayNum may also be an array, and then this returns an array.
+    #####################################################
+    def GetSessionOnOrAfter(self, dayNum):
+        if (np.ndim(dayNum) > 0):
+            dayNumArray = np.asarray(dayNum, dtype=np.int64)
+            sessionIndex = self.GetSessionOnOrBefore(dayNumArray)
+            return np.where(self.IsSession(dayNumArray), sessionIndex, sessionIndex + 1)
+        # End - if (np.ndim(dayNum) > 0):
+
+        sessionIndex = self.GetSessionOnOrBefore(dayNum)
+        if ((sessionIndex < 0) or (self.m_SessionDayNums[sessionIndex] != dayNum)):
+            sessionIndex += 1
+        return sessionIndex
+    # End - GetSessionOnOrAfter
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::IsSession]
+    #
+    # dayNum may also be an array, and then this returns a bool array.
+    #####################################################
+    def IsSession(self, dayNum):
+        if (np.ndim(dayNum) > 0):
+            dayNumArray = np.asarray(dayNum, dtype=np.int64)
+            if (self.m_NumSessions <= 0):
+                return np.zeros(dayNumArray.shape, dtype=bool)
+            sessionIndex = self.GetSessionOnOrBefore(dayNumArray)
+            return (sessionIndex >= 0) & (self.m_SessionDayNums[np.clip(sessionIndex, 0, None)] == dayNumArray)
+        # End - if (np.ndim(dayNum) > 0):
+
+        sessionIndex = self.GetSessionOnOrBefore(dayNum)
+        return ((sessionIndex >= 0) and (self.m_SessionDayNums[sessionIndex] == dayNum))
+    # End - IsSession
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::GetSessionForDate]
+    #
+    # Returns the index of the last session on or before the date.
+    #####################################################
+    def GetSessionForDate(self, year, month, day):
+        return self.GetSessionOnOrBefore(date(int(year), int(month), int(day)).toordinal())
+    # End - GetSessionForDate
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::GetDateForNumSessionsOffset]
+    #
+    # This is like GetDateForNumDaysOffset, but counts trading days.
+    # It returns the date of the session that is numSessions before the
+    # last session on or before the start date. A negative numSessions
+    # goes forward. The result is clipped to the first and last sessions.
+    #####################################################
+    def GetDateForNumSessionsOffset(self, startYear, startMonth, startDay, numSessions):
+        if (self.m_NumSessions <= 0):
+            return startYear, startMonth, startDay
+
+        startSession = self.GetSessionForDate(startYear, startMonth, startDay)
+        sessionIndex = min(max(startSession - numSessions, 0), self.m_NumSessions - 1)
+        return self.GetSessionDate(sessionIndex)
+    # End - GetDateForNumSessionsOffset
+
+
+    #####################################################
+    #
+    # [CTradingCalendar::GetNumSessionsBetweenDates]
+    #
+    # Returns the number of sessions from the first date to the last date,
+    # including both dates.
+    #####################################################
+    def GetNumSessionsBetweenDates(self, firstYear, firstMonth, firstDay, lastYear, lastMonth, lastDay):
+        firstDayNum = date(int(firstYear), int(firstMonth), int(firstDay)).toordinal()
+        lastDayNum = date(int(lastYear), int(lastMonth), int(lastDay)).toordinal()
+        if (lastDayNum < firstDayNum):
+            return 0
+
+        return self.GetSessionOnOrBefore(lastDayNum) - self.GetSessionOnOrBefore(firstDayNum - 1)
+    # End - GetNumSessionsBetweenDates
+
+# End - CTradingCalendar
+
+
+
+
+
+################################################################################
+#
+# [MakeTradingCalendarForTickers]
+#
+# Make one calendar for a group of tickers, with a session for every day
+# that any of them has a price.
+################################################################################
+def MakeTradingCalendarForTickers(stockTickerList):
+    dayNumArrayList = [np.zeros(0, dtype=np.int32)]
+    for stockTicker in stockTickerList:
+        dayNumArrayList.append(stockTicker.PastPrices.GetColumn('DayNum'))
+
+    return CTradingCalendar(np.concatenate(dayNumArrayList))
+# End - MakeTradingCalendarForTickers
+
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Extreme Prices
+#
+# This finds the days with the biggest or smallest prices or price changes,
+# such as "the 10 biggest declines in the last 5 years".
+#
+# CExtremePriceIndex is built once from the price columns. It makes the value
+# of every day for each kind of extreme, and sorts each of them once, most
+# extreme first. Then a query over the whole history is just the first K entries
+# of a sorted list, and a query over a window of days takes entries from the
+# front of the list until it has K that are in the window. So, the cost of a
+# query does not depend much on K, and all of the kinds share one build.
+#
+# Ties are in date order, so the earlier day is returned first.
+#
+################################################################################
+import sys
+
+import numpy as np
+
+# OpCodes for the kinds of extremes. stockTicker.py uses these same names.
+EXTREMES_MAX_PRICES = "maxPrices"
+EXTREMES_MIN_PRICES = "minPrices"
+EXTREMES_MAX_PRICE_CHANGES = "maxPriceChanges"
+EXTREMES_MAX_PRICE_INCREASES = "maxPriceIncreases"
+EXTREMES_MAX_PRICE_DECLINES = "maxPriceDeclines"
+
+g_ExtremeTypeList = [EXTREMES_MAX_PRICES, EXTREMES_MIN_PRICES, EXTREMES_MAX_PRICE_CHANGES, 
+                    EXTREMES_MAX_PRICE_INCREASES, EXTREMES_MAX_PRICE_DECLINES]
+
+
+
+
+
+################################################################################
+#
+# class CExtremePriceIndex
+#
+################################################################################
+class CExtremePriceIndex(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self):
+        self.m_NumRows = 0
+        self.m_DayNumArray = np.zeros(0, dtype=np.int32)
+        # opCode --> the value of each day
+        self.m_ValueArrayDict = {}
+        # opCode --> the row indexes, most extreme first
+        self.m_SortedIndexArrayDict = {}
+    # End -  __init__
+
+
+    #####################################################
+    # [CExtremePriceIndex::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    #
+    # [CExtremePriceIndex::Build]
+    #
+    # Make the values and the sort order of every kind of extreme.
+    # The price change of the first day is 0, since it has no previous day.
+    #####################################################
+    def Build(self, priceStore):
+        closeArray = priceStore.GetColumn('Cl').astype(np.float64)
+        priceChangeArray = np.concatenate(([0.0], np.diff(closeArray)))
+
+        self.m_NumRows = priceStore.GetNumRows()
+        self.m_DayNumArray = priceStore.GetColumn('DayNum')
+        self.m_ValueArrayDict = {EXTREMES_MAX_PRICES: closeArray,
+                                EXTREMES_MIN_PRICES: closeArray,
+                                EXTREMES_MAX_PRICE_CHANGES: np.abs(priceChangeArray),
+                                EXTREMES_MAX_PRICE_INCREASES: priceChangeArray,
+                                EXTREMES_MAX_PRICE_DECLINES: priceChangeArray}
+
+        # A stable sort on the value, or the negated value for the largest first,
+        # keeps ties in date order.
+        self.m_SortedIndexArrayDict = {}
+        for opCodeStr, valueArray in self.m_ValueArrayDict.items():
+            if (opCodeStr in [EXTREMES_MIN_PRICES, EXTREMES_MAX_PRICE_DECLINES]):
+                sortKeyArray = valueArray
+            else:
+                sortKeyArray = -valueArray
+            self.m_SortedIndexArrayDict[opCodeStr] = np.argsort(sortKeyArray, kind='stable').astype(np.int32)
+        # End - for opCodeStr, valueArray in self.m_ValueArrayDict.items():
+    # End - Build
+
+
+    #####################################################
+    # [CExtremePriceIndex::GetNumRows]
+    #####################################################
+    def GetNumRows(self):
+        return self.m_NumRows
+
+
+    #####################################################
+    #
+    # [CExtremePriceIndex::GetExtremes]
+    #
+    # Returns 2 arrays, the row indexes and the values of the numExtremes
+    # most extreme days from firstIndex to lastIndex, both included.
+    # The most extreme day is first. A lastIndex of -1 means the last row.
+    #####################################################
+    def GetExtremes(self, opCodeStr, numExtremes, firstIndex=0, lastIndex=-1):
+        sortedIndexArray = self.m_SortedIndexArrayDict.get(opCodeStr, None)
+        if (sortedIndexArray is None):
+            print("CExtremePriceIndex::GetExtremes. Unknown opCode: " + str(opCodeStr))
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        if ((lastIndex < 0) or (lastIndex >= self.m_NumRows)):
+            lastIndex = self.m_NumRows - 1
+        firstIndex = max(0, firstIndex)
+        numInWindow = lastIndex - firstIndex + 1
+        numExtremes = max(0, min(numExtremes, numInWindow))
+
+        if (numInWindow == self.m_NumRows):
+            resultIndexArray = sortedIndexArray[:numExtremes]
+        else:
+            # About numExtremes * (numRows / numInWindow) entries from the front of the list are
+            # in the window. Look at twice that, and then twice as many again until there are enough.
+            numToSearch = 2 * numExtremes * (self.m_NumRows // max(numInWindow, 1) + 1)
+            while (True):
+                searchArray = sortedIndexArray[:numToSearch]
+                resultIndexArray = searchArray[(searchArray >= firstIndex) & (searchArray <= lastIndex)][:numExtremes]
+                if ((len(resultIndexArray) >= numExtremes) or (numToSearch >= self.m_NumRows)):
+                    break
+                numToSearch = 2 * numToSearch
+            # End - while (True):
+        # End - else
+
+        return resultIndexArray, self.m_ValueArrayDict[opCodeStr][resultIndexArray]
+    # End - GetExtremes
+
+
+    #####################################################
+    #
+    # [CExtremePriceIndex::GetExtremesInDateRange]
+    #
+    # This is GetExtremes, for the days from firstDayNum to lastDayNum,
+    # both included. These are day numbers, like the DayNum column.
+    #####################################################
+    def GetExtremesInDateRange(self, opCodeStr, numExtremes, firstDayNum, lastDayNum):
+        firstIndex = int(np.searchsorted(self.m_DayNumArray, firstDayNum, side='left'))
+        lastIndex = int(np.searchsorted(self.m_DayNumArray, lastDayNum, side='right')) - 1
+        if (lastIndex < firstIndex):
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        return self.GetExtremes(opCodeStr, numExtremes, firstIndex, lastIndex)
+    # End - GetExtremesInDateRange
+
+
+    #####################################################
+    #
+    # [CExtremePriceIndex::GetAllExtremes]
+    #
+    # Returns a dict of opCode to (indexArray, valueArray), for every kind of extreme.
+    #####################################################
+    def GetAllExtremes(self, numExtremes, firstIndex=0, lastIndex=-1):
+        extremesDict = {}
+        for opCodeStr in g_ExtremeTypeList:
+            extremesDict[opCodeStr] = self.GetExtremes(opCodeStr, numExtremes, firstIndex, lastIndex)
+
+        return extremesDict
+    # End - GetAllExtremes
+
+# End - CExtremePriceIndex
+
+
+
+
+
+################################################################################
+#
+# [MakeExtremePriceIndex]
+#
+################################################################################
+def MakeExtremePriceIndex(priceStore):
+    extremeIndex = CExtremePriceIndex()
+    extremeIndex.Build(priceStore)
+    return extremeIndex
+# End - MakeExtremePriceIndex
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+################################################################################
+#
+# Price Info Converter
+#
+# This converts the stockInfo_* Python data modules into price files.
+# A data module like stockInfo_SP500.py holds one big list of dicts, named
+# like g_PriceInfo_SP500, which Python has to parse and run on every import.
+# The price file for it, SP500.prices, is opened with mmap instead.
+#
+# Usage:
+#   python3 stockInfoConverter.py [--warehouse] stockInfo_SP500 [stockInfo_XXX ...]
+#
+# The price files are written to the same directory as the data modules.
+# With --warehouse, the prices are also saved in the price warehouse database
+# in that directory.
+#
+################################################################################
+import os
+import sys
+import importlib
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+g_DirPath = os.path.dirname(os.path.realpath(__file__))
+if g_DirPath not in sys.path:
+    sys.path.insert(0, g_DirPath)
+
+import stockTicker as StockTicker
+import stockPriceFile as StockPriceFile
+import stockWarehouse as StockWarehouse
+
+STOCK_INFO_MODULE_PREFIX = "stockInfo_"
+PRICE_INFO_VARIABLE_PREFIX = "g_PriceInfo_"
+
+# The ticker symbols of data modules whose name is not the symbol.
+g_StockInfoSymbolDict = {'SP500': StockTicker.SP500_TICKER}
+
+
+
+################################################################################
+#
+# [GetPriceFilePathForStockInfo]
+#
+# stockInfo_SP500 --> <dir>/SP500.prices
+################################################################################
+def GetPriceFilePathForStockInfo(dirPath, moduleName):
+    infoName = moduleName[len(STOCK_INFO_MODULE_PREFIX):]
+    return os.path.join(dirPath, infoName + StockPriceFile.PRICE_FILE_SUFFIX)
+# End - GetPriceFilePathForStockInfo
+
+
+
+################################################################################
+#
+# [ConvertStockInfoModule]
+#
+################################################################################
+def ConvertStockInfoModule(moduleName, dirPath, warehouse=None):
+    if (not moduleName.startswith(STOCK_INFO_MODULE_PREFIX)):
+        print("ConvertStockInfoModule. Not a stockInfo module: " + moduleName)
+        return False
+
+    infoName = moduleName[len(STOCK_INFO_MODULE_PREFIX):]
+    stockInfoModule = importlib.import_module(moduleName)
+    valueDictList = getattr(stockInfoModule, PRICE_INFO_VARIABLE_PREFIX + infoName, None)
+    if (not valueDictList):
+        print("ConvertStockInfoModule. No " + PRICE_INFO_VARIABLE_PREFIX + infoName + " in " + moduleName)
+        return False
+
+    # Keep every year. The reader can skip the early years when it opens the file.
+    tickerSymbol = g_StockInfoSymbolDict.get(infoName, infoName)
+    stockTicker = StockTicker.LoadTickerFromValueDict(tickerSymbol, valueDictList, 0)
+    filePath = GetPriceFilePathForStockInfo(dirPath, moduleName)
+    StockTicker.WriteTickerToPriceFile(stockTicker, filePath)
+    print("Wrote " + filePath + ". " + str(stockTicker.PastPrices.GetNumRows()) + " days")
+
+    if (warehouse is not None):
+        numDays = warehouse.WriteTicker(stockTicker)
+        print("Wrote " + tickerSymbol + " to " + warehouse.m_DBFilePath + ". " + str(numDays) + " days")
+    return True
+# End - ConvertStockInfoModule
+
+
+
+################################################################################
+#
+# Main
+#
+################################################################################
+if __name__ == "__main__":
+    argList = sys.argv[1:]
+    warehouse = None
+    if ("--warehouse" in argList):
+        argList.remove("--warehouse")
+        warehouse = StockWarehouse.CStockWarehouse(os.path.join(g_DirPath, StockWarehouse.WAREHOUSE_FILE_NAME))
+        if (not warehouse.Open()):
+            sys.exit(1)
+    if (len(argList) < 1):
+        print("Usage: python3 stockInfoConverter.py [--warehouse] stockInfo_SP500 [stockInfo_XXX ...]")
+        sys.exit(1)
+
+    fAllConverted = True
+    for moduleName in argList:
+        # Allow a file name, like stockInfo_SP500.py
+        moduleName = os.path.splitext(os.path.basename(moduleName))[0]
+        if (not ConvertStockInfoModule(moduleName, g_DirPath, warehouse)):
+            fAllConverted = False
+    # End - for moduleName in argList:
+
+    if (warehouse is not None):
+        warehouse.Close()
+
+    sys.exit(0 if fAllConverted else 1)
+# End - if __name__ == "__main__":
+
@@ -51,6 +51,8 @@
 import sys
 from datetime import datetime
 
+import numpy as np
+
 # Apache will not let you set the lib from an imported library.
 # So, this *assumes* that it can import all other libraries from the same directory.
 import stockTicker as StockTicker
@@ -60,26 +62,52 @@ import stockRobot as StockRobot
 
 ################################################################################
 #
-# [RunRobot]
+# [GotoRunStartDate]
 #
+# Move the ticker's iterator to the first day of a run. If fCountTradingDays
+# is True, then numDaysToScan is a number of trading days in the ticker's
+# trading calendar, rather than calendar days.
+# Returns False if there is no start day.
 ################################################################################
-def RunRobot(stockTicker, robot, account, numDaysToScan):
+def GotoRunStartDate(stockTicker, numDaysToScan, fCountTradingDays):
     fDebug = False
 
-    if (fDebug):
-        print("RunRobot. ")
-        print("     numDaysToScan=" + str(numDaysToScan))
-
-    if (numDaysToScan > 0):
+    if ((numDaysToScan > 0) and (fCountTradingDays)):
+        tradingCalendar = stockTicker.GetTradingCalendar()
+        currentYear, currentMonth, currentDay = stockTicker.GetLatestDate()
+        latestSession = tradingCalendar.GetSessionForDate(currentYear, currentMonth, currentDay)
+        fFoundIt = stockTicker.GotoSessionIndex(max(0, latestSession - numDaysToScan))
+    elif (numDaysToScan > 0):
         currentYear, currentMonth, currentDay = stockTicker.GetLatestDate()
         year, month, day = StockTicker.GetDateForNumDaysOffset(currentYear, currentMonth, currentDay, numDaysToScan)
         if (fDebug):
-            print("RunRobot. ")
+            print("GotoRunStartDate. ")
             print("     currentYear=" + str(currentYear) + ", currentMonth=" + str(currentMonth) + ", currentDay=" + str(currentDay))
             print("     year=" + str(year) + ", month=" + str(month) + ", day=" + str(day))
         fFoundIt = stockTicker.GotoDate(year, month, day)
     else:
         fFoundIt = stockTicker.GotoFirstDate()
+
+    return fFoundIt
+# End - GotoRunStartDate
+
+
+
+################################################################################
+#
+# [RunRobot]
+#
+# If fCountTradingDays is True, then numDaysToScan is a number of trading
+# days in the ticker's trading calendar, rather than calendar days.
+################################################################################
+def RunRobot(stockTicker, robot, account, numDaysToScan, fCountTradingDays=False):
+    fDebug = False
+
+    if (fDebug):
+        print("RunRobot. ")
+        print("     numDaysToScan=" + str(numDaysToScan) + ", fCountTradingDays=" + str(fCountTradingDays))
+
+    fFoundIt = GotoRunStartDate(stockTicker, numDaysToScan, fCountTradingDays)
     if (fDebug):
         print("RunRobot. fFoundIt=" + str(fFoundIt))
     if (not fFoundIt):
@@ -108,3 +136,140 @@ def RunRobot(stockTicker, robot, account, numDaysToScan):
 
 
 
+################################################################################
+#
+# [RunRobotVectorized]
+#
+# This is RunRobot, but for a robot whose GetTradeSignals says which days it
+# buys and sells. The position and the account value of every day are then
+# computed with array operations, rather than calling the robot and the
+# account once per day. The final value and the daily value list are the same
+# as RunRobot's, up to floating point rounding.
+#
+# The robot buys and sells everything at the close. So, while it holds stock,
+# the value is the shares bought times each day's close, and while it is in
+# cash the value does not change. Each holding period turns the cash it started
+# with into cash * (sell close / buy close).
+#
+# Returns the number of trades, buys plus sells. If the robot cannot give its
+# trade signals, or the account already holds this stock, then this just calls
+# RunRobot, and returns None.
+################################################################################
+def RunRobotVectorized(stockTicker, robot, account, numDaysToScan, fCountTradingDays=False):
+    if (account.GetStockHolding(stockTicker, False) is not None):
+        RunRobot(stockTicker, robot, account, numDaysToScan, fCountTradingDays)
+        return None
+
+    fFoundIt = GotoRunStartDate(stockTicker, numDaysToScan, fCountTradingDays)
+    if (not fFoundIt):
+        print("Error! RunRobotVectorized could not find start date")
+        return 0
+
+    firstIndex = stockTicker.IteratorIndex
+    closeArray = stockTicker.PastPrices.GetColumn('Cl')[firstIndex:]
+    dayArray = stockTicker.PastPrices.GetColumn('d')[firstIndex:]
+    rsiArray = stockTicker.PastPrices.GetColumn('RSI')[firstIndex:]
+    buyArray, sellArray = robot.GetTradeSignals(dayArray, closeArray, rsiArray)
+    if (buyArray is None):
+        RunRobot(stockTicker, robot, account, numDaysToScan, fCountTradingDays)
+        return None
+    # Leave the iterator where RunRobot would.
+    stockTicker.IteratorIndex = stockTicker.PastPrices.GetNumRows() - 1
+
+    account.StartRun()
+    numDays = len(closeArray)
+    dayIndexArray = np.arange(numDays)
+
+    # After each day's trade, the robot holds stock if its last trade was a buy.
+    lastTradeIndexArray = np.maximum.accumulate(np.where(buyArray | sellArray, dayIndexArray, -1))
+    fHoldArray = (lastTradeIndexArray >= 0) & buyArray[np.maximum(lastTradeIndexArray, 0)]
+    fPrevHoldArray = np.concatenate(([False], fHoldArray[:-1]))
+    buyIndexArray = np.flatnonzero(fHoldArray & np.logical_not(fPrevHoldArray))
+    sellIndexArray = np.flatnonzero(np.logical_not(fHoldArray) & fPrevHoldArray)
+
+    # The cash before each holding period, and after the last one that was sold.
+    periodReturnArray = closeArray[sellIndexArray] / closeArray[buyIndexArray[:len(sellIndexArray)]]
+    cashArray = account.CashTotal * np.concatenate(([1.0], np.cumprod(periodReturnArray)))
+    sharesArray = cashArray[:len(buyIndexArray)] / closeArray[buyIndexArray]
+
+    # The holding period of each day. This is -1 before the first buy, and then
+    # the day's value is the starting cash, which is cashArray[0].
+    # sharesArray has an extra 0 at the end, so it can be indexed if there are no buys.
+    periodIndexArray = np.cumsum(fHoldArray & np.logical_not(fPrevHoldArray)) - 1
+    valueArray = np.where(fHoldArray, np.append(sharesArray, 0.0)[np.maximum(periodIndexArray, 0)] * closeArray, 
+                            cashArray[np.minimum(periodIndexArray + 1, len(cashArray) - 1)])
+
+    numShares = None
+    cashTotal = float(cashArray[-1])
+    if (len(buyIndexArray) > 0):
+        numShares = 0.0
+        if (fHoldArray[-1]):
+            numShares = float(sharesArray[-1])
+            cashTotal = 0.0
+    # End - if (len(buyIndexArray) > 0):
+
+    account.FinishVectorizedRun(stockTicker, cashTotal, numShares, valueArray)
+    account.FinishRun()
+
+    return len(buyIndexArray) + len(sellIndexArray)
+# End - RunRobotVectorized
+
+
+
+
+
+
+################################################################################
+#
+# [GetSkipExtremeDaysCurves]
+#
+# This is "what if I missed the N best or worst days", for every N at once,
+# without running CStockRobotSkipDays once per N.
+#
+# That robot sells at the close of the day before a skipped day, and buys back
+# at the close of the skipped day, so it misses exactly that day's return.
+# Otherwise it holds from the first day. So, its final value is the buy and hold
+# value divided by the return of each skipped day. The daily log returns are
+# sorted once, and a cumulative sum gives the value for every N.
+#
+# The days are ranked by their log return. If fRankByPriceChange is True, then
+# they are ranked by close - previous close instead, like GetDaysWithExtremePrices.
+#
+# Returns 3 arrays of final values, where index N is the value after skipping
+# N days: the N best days, the N worst days, and both the N best and the N
+# worst days. Index 0 is the buy and hold value. N goes up to maxNumDaysToSkip,
+# or the number of days in the run. skipBothArray is NaN where the best and
+# worst days would overlap.
+# Returns None, None, None if there is no start date.
+################################################################################
+def GetSkipExtremeDaysCurves(stockTicker, maxNumDaysToSkip, numDaysToScan=-1, fCountTradingDays=False, 
+                            initialValue=10000, fRankByPriceChange=False):
+    fFoundIt = GotoRunStartDate(stockTicker, numDaysToScan, fCountTradingDays)
+    if (not fFoundIt):
+        print("Error! GetSkipExtremeDaysCurves could not find start date")
+        return None, None, None
+
+    closeArray = stockTicker.PastPrices.GetColumn('Cl')[stockTicker.IteratorIndex:]
+    # The first day of the run only buys, so it has no return to skip.
+    logReturnArray = np.diff(np.log(closeArray))
+    buyAndHoldValue = initialValue * (closeArray[-1] / closeArray[0])
+
+    rankArray = logReturnArray
+    if (fRankByPriceChange):
+        rankArray = np.diff(closeArray)
+    # Best first, and worst first. Each has its own stable sort, so ties are the
+    # earlier day first in both, like GetDaysWithExtremePrices.
+    bestLogReturnArray = logReturnArray[np.argsort(-rankArray, kind='stable')]
+    worstLogReturnArray = logReturnArray[np.argsort(rankArray, kind='stable')]
+
+    numDaysToSkip = max(0, min(maxNumDaysToSkip, len(logReturnArray)))
+    bestLogReturnSumArray = np.concatenate(([0.0], np.cumsum(bestLogReturnArray[:numDaysToSkip])))
+    worstLogReturnSumArray = np.concatenate(([0.0], np.cumsum(worstLogReturnArray[:numDaysToSkip])))
+
+    skipBestArray = buyAndHoldValue * np.exp(-bestLogReturnSumArray)
+    skipWorstArray = buyAndHoldValue * np.exp(-worstLogReturnSumArray)
+    skipBothArray = buyAndHoldValue * np.exp(-(bestLogReturnSumArray + worstLogReturnSumArray))
+    skipBothArray[2 * np.arange(numDaysToSkip + 1) > len(logReturnArray)] = np.nan
+
+    return skipBestArray, skipWorstArray, skipBothArray
+# End - GetSkipExtremeDaysCurves
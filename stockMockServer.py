@@ -0,0 +1,405 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+################################################################################
+#
+# Mock Server
+#
+# This is a local stand-in for the Yahoo quote and chart servers, for tests and
+# benchmarks that should not use the network. It runs an HTTP server on a background
+# thread, and answers the same URL paths with made-up values. The values only depend
+# on the symbol, so every request for a symbol gets the same answer.
+#
+# The server can also act slow, by waiting latencySecs before each reply, and can
+# throttle, by answering 429 to requests over maxRequestsPerSec.
+#
+# Usage:
+#   mockServer = CMockServer()
+#   mockServer.Start()
+#   quoteUrl = mockServer.GetBaseUrl() + QUOTE_PATH
+#   ...
+#   mockServer.Stop()
+#
+################################################################################
+import sys
+import time
+import zlib
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+
+QUOTE_PATH = "/v7/finance/quote"
+CHART_PATH = "/v8/finance/chart/"
+
+# The made-up history has this many weekdays, starting on Jan 4 1960.
+FAKE_HISTORY_NUM_DAYS = 15000
+FAKE_HISTORY_FIRST_EPOCH_DAY = -3650
+# Bars are stamped at 14:30 UTC, and the exchange is 5 hours behind UTC.
+FAKE_BAR_TIME_SECS = (14 * 3600) + (30 * 60)
+FAKE_GMT_OFFSET_SECS = -5 * 3600
+
+# A symbol that starts with this is unknown to the server, and is left out of replies.
+UNKNOWN_SYMBOL_PREFIX = "NOSUCH"
+
+
+
+
+
+################################################################################
+#
+# [MakeFakeQuote]
+#
+################################################################################
+def MakeFakeQuote(tickerSymbol):
+    randomGenerator = np.random.default_rng(zlib.crc32(tickerSymbol.encode('utf-8')))
+    price = round(float(randomGenerator.uniform(5.0, 500.0)), 2)
+    spread = round(price * 0.0005, 2)
+    return {'symbol': tickerSymbol,
+            'shortName': tickerSymbol + " Inc",
+            'regularMarketPrice': price,
+            'regularMarketPreviousClose': round(price * float(randomGenerator.uniform(0.97, 1.03)), 2),
+            'regularMarketOpen': round(price * float(randomGenerator.uniform(0.98, 1.02)), 2),
+            'regularMarketDayLow': round(price * 0.98, 2),
+            'regularMarketDayHigh': round(price * 1.02, 2),
+            'regularMarketVolume': int(randomGenerator.integers(100000, 10000000)),
+            'bid': price - spread,
+            'ask': price + spread,
+            'trailingPE': round(float(randomGenerator.uniform(5.0, 60.0)), 2),
+            'forwardPE': round(float(randomGenerator.uniform(5.0, 60.0)), 2),
+            'fiftyTwoWeekLow': round(price * 0.7, 2),
+            'fiftyTwoWeekHigh': round(price * 1.3, 2),
+            'fiftyDayAverage': round(price * 0.99, 2),
+            'twoHundredDayAverage': round(price * 0.95, 2),
+            'averageDailyVolume3Month': int(randomGenerator.integers(100000, 10000000))}
+# End - MakeFakeQuote
+
+
+
+
+
+################################################################################
+#
+# [MakeFakeChart]
+#
+# Returns the chart reply for the bars from startSecs to stopSecs.
+################################################################################
+def MakeFakeChart(tickerSymbol, startSecs, stopSecs):
+    randomGenerator = np.random.default_rng(zlib.crc32(tickerSymbol.encode('utf-8')))
+    numDays = FAKE_HISTORY_NUM_DAYS
+    dayIndexArray = np.arange(numDays)
+    epochDayArray = FAKE_HISTORY_FIRST_EPOCH_DAY + ((dayIndexArray // 5) * 7) + (dayIndexArray % 5)
+    timeArray = (epochDayArray * 86400) + FAKE_BAR_TIME_SECS
+
+    closeArray = np.round(50.0 * np.exp(np.cumsum(randomGenerator.normal(0.0003, 0.012, numDays))), 2)
+    openArray = np.round(closeArray * (1.0 + randomGenerator.normal(0.0, 0.003, numDays)), 2)
+    highArray = np.round(np.maximum(openArray, closeArray) * 1.004, 2)
+    lowArray = np.round(np.minimum(openArray, closeArray) * 0.996, 2)
+    volumeArray = randomGenerator.integers(1000000, 5000000, numDays)
+
+    fInRangeArray = (timeArray >= startSecs) & (timeArray <= stopSecs)
+    quoteDict = {'open': openArray[fInRangeArray].tolist(), 
+                'high': highArray[fInRangeArray].tolist(),
+                'low': lowArray[fInRangeArray].tolist(), 
+                'close': closeArray[fInRangeArray].tolist(),
+                'volume': volumeArray[fInRangeArray].tolist()}
+    chartResult = {'meta': {'symbol': tickerSymbol, 'gmtoffset': FAKE_GMT_OFFSET_SECS},
+                    'timestamp': timeArray[fInRangeArray].tolist(),
+                    'indicators': {'quote': [quoteDict]}}
+    return {'chart': {'result': [chartResult], 'error': None}}
+# End - MakeFakeChart
+
+
+
+
+
+################################################################################
+#
+# class CMockRequestHandler
+#
+################################################################################
+class CMockRequestHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, like the real server.
+    protocol_version = "HTTP/1.1"
+
+    #####################################################
+    # [CMockRequestHandler::do_GET]
+    #####################################################
+    def do_GET(self):
+        mockServer = self.server.m_MockServer
+        urlParts = urllib.parse.urlsplit(self.path)
+        queryDict = urllib.parse.parse_qs(urlParts.query)
+        requestKind = CHART_PATH if (urlParts.path.startswith(CHART_PATH)) else urlParts.path
+        mockServer.CountRequest(requestKind)
+
+        if (not mockServer.TakeRequestToken()):
+            mockServer.CountRequest('429')
+            self.SendJson(429, {'error': 'Too Many Requests'})
+            return
+
+        mockServer.StartRequest()
+        try:
+            if (mockServer.m_LatencySecs > 0):
+                time.sleep(mockServer.m_LatencySecs)
+            self.SendReply(urlParts, queryDict)
+        finally:
+            mockServer.StopRequest()
+    # End - do_GET
+
+
+    #####################################################
+    # [CMockRequestHandler::SendReply]
+    #####################################################
+    def SendReply(self, urlParts, queryDict):
+        if (urlParts.path.startswith(CHART_PATH)):
+            tickerSymbol = urllib.parse.unquote(urlParts.path[len(CHART_PATH):])
+            if (tickerSymbol.startswith(UNKNOWN_SYMBOL_PREFIX)):
+                self.SendJson(404, {'chart': {'result': None, 'error': {'code': 'Not Found'}}})
+                return
+            startSecs = int(queryDict.get('period1', ['0'])[0])
+            stopSecs = int(queryDict.get('period2', ['9999999999'])[0])
+            self.SendBody(200, self.server.m_MockServer.GetChartBody(tickerSymbol, startSecs, stopSecs))
+            return
+        # End - if (urlParts.path.startswith(CHART_PATH)):
+
+        if (urlParts.path == QUOTE_PATH):
+            symbolList = []
+            for symbolsStr in queryDict.get('symbols', []):
+                symbolList.extend([symbol for symbol in symbolsStr.split(',') if (symbol != '')])
+            resultList = [MakeFakeQuote(symbol) for symbol in symbolList if (not symbol.startswith(UNKNOWN_SYMBOL_PREFIX))]
+            self.SendJson(200, {'quoteResponse': {'result': resultList, 'error': None}})
+            return
+        # End - if (urlParts.path == QUOTE_PATH):
+
+        self.SendJson(404, {'error': 'Not Found'})
+    # End - SendReply
+
+
+    #####################################################
+    # [CMockRequestHandler::SendJson]
+    #####################################################
+    def SendJson(self, statusCode, replyValue):
+        self.SendBody(statusCode, json.dumps(replyValue).encode('utf-8'))
+    # End - SendJson
+
+
+    #####################################################
+    # [CMockRequestHandler::SendBody]
+    #####################################################
+    def SendBody(self, statusCode, bodyBytes):
+        self.send_response(statusCode)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(bodyBytes)))
+        self.end_headers()
+        self.wfile.write(bodyBytes)
+    # End - SendBody
+
+
+    #####################################################
+    # [CMockRequestHandler::log_message]
+    # Do not print a line for every request.
+    #####################################################
+    def log_message(self, format, *args):
+        return
+
+# End - CMockRequestHandler
+
+
+
+
+
+################################################################################
+#
+# class CMockHttpServer
+#
+# The default listen queue is only 5 connections, which is too few for
+# a client with hundreds of requests at once.
+################################################################################
+class CMockHttpServer(ThreadingHTTPServer):
+    request_queue_size = 512
+    daemon_threads = True
+
+    #####################################################
+    # [CMockHttpServer::handle_error]
+    # A client that drops its connection is not an error for a test server.
+    #####################################################
+    def handle_error(self, request, client_address):
+        if (isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError))):
+            return
+        ThreadingHTTPServer.handle_error(self, request, client_address)
+
+# End - CMockHttpServer
+
+
+
+
+
+################################################################################
+#
+# class CMockServer
+#
+################################################################################
+class CMockServer(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    # A port of 0 picks any free port.
+    # A maxRequestsPerSec of 0 means there is no limit.
+    #####################################################
+    def __init__(self, port=0, latencySecs=0.0, maxRequestsPerSec=0):
+        self.m_Port = port
+        self.m_LatencySecs = latencySecs
+        self.m_MaxRequestsPerSec = maxRequestsPerSec
+        self.m_HttpServer = None
+        self.m_ServerThread = None
+        self.m_Lock = threading.Lock()
+        self.m_RequestCountDict = {}
+
+        # The server's own token bucket, which allows a burst of one second of requests.
+        self.m_NumTokens = float(maxRequestsPerSec)
+        self.m_LastFillTime = time.monotonic()
+
+        self.m_NumInFlight = 0
+        self.m_MaxInFlight = 0
+
+        # Encoded chart replies. Making and encoding a 60 year history takes
+        # longer than the client takes to parse it, so only do it once.
+        self.m_ChartBodyDict = {}
+    # End -  __init__
+
+
+    #####################################################
+    # [CMockServer::GetChartBody]
+    #####################################################
+    def GetChartBody(self, tickerSymbol, startSecs, stopSecs):
+        chartKey = (tickerSymbol, startSecs, stopSecs)
+        with self.m_Lock:
+            bodyBytes = self.m_ChartBodyDict.get(chartKey)
+        if (bodyBytes is None):
+            bodyBytes = json.dumps(MakeFakeChart(tickerSymbol, startSecs, stopSecs)).encode('utf-8')
+            with self.m_Lock:
+                self.m_ChartBodyDict[chartKey] = bodyBytes
+        return bodyBytes
+    # End - GetChartBody
+
+
+    #####################################################
+    # [CMockServer::Start]
+    #####################################################
+    def Start(self):
+        self.m_HttpServer = CMockHttpServer(('127.0.0.1', self.m_Port), CMockRequestHandler)
+        self.m_HttpServer.m_MockServer = self
+        self.m_Port = self.m_HttpServer.server_address[1]
+        self.m_ServerThread = threading.Thread(target=self.m_HttpServer.serve_forever, daemon=True)
+        self.m_ServerThread.start()
+    # End - Start
+
+
+    #####################################################
+    # [CMockServer::Stop]
+    #####################################################
+    def Stop(self):
+        if (self.m_HttpServer is None):
+            return
+        self.m_HttpServer.shutdown()
+        self.m_HttpServer.server_close()
+        self.m_ServerThread.join()
+        self.m_HttpServer = None
+        self.m_ServerThread = None
+    # End - Stop
+
+
+    #####################################################
+    # [CMockServer::GetBaseUrl]
+    #####################################################
+    def GetBaseUrl(self):
+        return "http://127.0.0.1:" + str(self.m_Port)
+
+
+    #####################################################
+    # [CMockServer::CountRequest]
+    #####################################################
+    def CountRequest(self, urlPath):
+        with self.m_Lock:
+            self.m_RequestCountDict[urlPath] = self.m_RequestCountDict.get(urlPath, 0) + 1
+
+
+    #####################################################
+    # [CMockServer::GetNumRequests]
+    # Pass '429' for the number of throttled requests.
+    #####################################################
+    def GetNumRequests(self, urlPath):
+        with self.m_Lock:
+            return self.m_RequestCountDict.get(urlPath, 0)
+
+
+    #####################################################
+    #
+    # [CMockServer::TakeRequestToken]
+    #
+    # Returns False if this request is over the rate limit.
+    #####################################################
+    def TakeRequestToken(self):
+        if (self.m_MaxRequestsPerSec <= 0):
+            return True
+
+        with self.m_Lock:
+            currentTime = time.monotonic()
+            self.m_NumTokens = min(float(self.m_MaxRequestsPerSec), 
+                                self.m_NumTokens + ((currentTime - self.m_LastFillTime) * self.m_MaxRequestsPerSec))
+            self.m_LastFillTime = currentTime
+            if (self.m_NumTokens < 1.0):
+                return False
+            self.m_NumTokens -= 1.0
+            return True
+    # End - TakeRequestToken
+
+
+    #####################################################
+    # [CMockServer::StartRequest]
+    #####################################################
+    def StartRequest(self):
+        with self.m_Lock:
+            self.m_NumInFlight += 1
+            self.m_MaxInFlight = max(self.m_MaxInFlight, self.m_NumInFlight)
+
+    #####################################################
+    # [CMockServer::StopRequest]
+    #####################################################
+    def StopRequest(self):
+        with self.m_Lock:
+            self.m_NumInFlight -= 1
+
+    #####################################################
+    # [CMockServer::GetMaxInFlight]
+    # The most requests that the server was answering at once.
+    #####################################################
+    def GetMaxInFlight(self):
+        with self.m_Lock:
+            return self.m_MaxInFlight
+
+# End - CMockServer
+
@@ -0,0 +1,442 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Options
+#
+# An option chain has the calls and puts of one ticker, for every expiration date.
+# Each of calls and puts is stored in columns, one typed array per field, sorted
+# by expiration date and then by strike price. So all options for one expiration
+# are one contiguous slice, and a query across every expiration, like all
+# strikes near the current price, is one array operation.
+#
+# A chain is loaded from an option provider, which is any object with:
+#   GetExpiryDates(tickerSymbol) - The list of expiration dates as 'YYYY-MM-DD' strings
+#   GetChainColumns(tickerSymbol, expiryDateStr) - The calls and puts for one date,
+#       as two dicts of arrays with the names in g_ProviderColumnNameList.
+#
+################################################################################
+import sys
+import time
+import zlib
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockTicker as StockTicker
+
+DEFAULT_OPTION_THREADS = 8
+
+# The columns of each option in a chain.
+g_OptionColumnList = [
+    ('ExpiryDayNum', np.int32),
+    ('Strike', np.float64),
+    ('Bid', np.float64),
+    ('Ask', np.float64),
+    ('Volume', np.int64),
+    ('OpenInterest', np.int64),
+    ('LastTradeDayNum', np.int32)
+]
+
+# The columns that a provider returns for one expiration date.
+g_ProviderColumnNameList = ['Strike', 'Bid', 'Ask', 'Volume', 'OpenInterest', 'LastTradeDayNum']
+
+
+
+
+
+################################################################################
+#
+# class CStockOptionChain
+#
+################################################################################
+class CStockOptionChain(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, tickerSymbol):
+        self.m_TickerSymbol = tickerSymbol
+        self.m_ExpiryDayNums = np.zeros(0, dtype=np.int32)
+
+        # For calls and puts, a dict of columns, and the start of each expiration's slice.
+        # The slice for expiration i is [starts[i], starts[i + 1]).
+        self.m_ColumnsDict = {True: MakeEmptyOptionColumns(), False: MakeEmptyOptionColumns()}
+        self.m_ExpiryStartsDict = {True: np.zeros(1, dtype=np.int64), False: np.zeros(1, dtype=np.int64)}
+    # End -  __init__
+
+
+    #####################################################
+    # [CStockOptionChain::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    #
+    # [CStockOptionChain::SetOptions]
+    #
+    # columnDict has every name in g_OptionColumnList. The rows may be in any order.
+    #####################################################
+    def SetOptions(self, fCalls, columnDict):
+        # Sort by expiration, then strike
+        sortOrder = np.lexsort((columnDict['Strike'], columnDict['ExpiryDayNum']))
+        sortedColumnDict = {}
+        for columnName, columnType in g_OptionColumnList:
+            sortedColumnDict[columnName] = np.asarray(columnDict[columnName], dtype=columnType)[sortOrder]
+
+        self.m_ColumnsDict[fCalls] = sortedColumnDict
+        self.m_ExpiryDayNums = np.union1d(self.m_ExpiryDayNums, sortedColumnDict['ExpiryDayNum']).astype(np.int32)
+        for fOptionType in (True, False):
+            expiryColumn = self.m_ColumnsDict[fOptionType]['ExpiryDayNum']
+            self.m_ExpiryStartsDict[fOptionType] = np.searchsorted(expiryColumn, 
+                                                    np.append(self.m_ExpiryDayNums, np.iinfo(np.int32).max), side='left')
+        # End - for fOptionType in (True, False):
+    # End - SetOptions
+
+
+    #####################################################
+    # [CStockOptionChain::GetTickerSymbol]
+    #####################################################
+    def GetTickerSymbol(self):
+        return self.m_TickerSymbol
+
+    #####################################################
+    # [CStockOptionChain::GetNumOptions]
+    #####################################################
+    def GetNumOptions(self, fCalls):
+        return len(self.m_ColumnsDict[fCalls]['Strike'])
+
+    #####################################################
+    # [CStockOptionChain::GetExpiryDayNums]
+    #####################################################
+    def GetExpiryDayNums(self):
+        return self.m_ExpiryDayNums
+
+    #####################################################
+    # [CStockOptionChain::GetExpiryDates]
+    # Returns a list of (year, month, day)
+    #####################################################
+    def GetExpiryDates(self):
+        yearArray, monthArray, dayArray = StockTicker.DayNumsToDates(self.m_ExpiryDayNums)
+        return list(zip(yearArray.tolist(), monthArray.tolist(), dayArray.tolist()))
+
+    #####################################################
+    #
+    # [CStockOptionChain::GetColumn]
+    #
+    # The column for every expiration. This is a view, so do not change it.
+    #####################################################
+    def GetColumn(self, columnName, fCalls):
+        return self.m_ColumnsDict[fCalls][columnName]
+
+
+    #####################################################
+    #
+    # [CStockOptionChain::GetOptionsForExpiry]
+    #
+    # Returns a dict of column views for one expiration, sorted by strike.
+    # The columns are empty if there is no such expiration.
+    #####################################################
+    def GetOptionsForExpiry(self, expiryDayNum, fCalls):
+        expiryIndex = int(np.searchsorted(self.m_ExpiryDayNums, expiryDayNum, side='left'))
+        if ((expiryIndex >= len(self.m_ExpiryDayNums)) or (self.m_ExpiryDayNums[expiryIndex] != expiryDayNum)):
+            return MakeEmptyOptionColumns()
+
+        expiryStarts = self.m_ExpiryStartsDict[fCalls]
+        firstIndex = expiryStarts[expiryIndex]
+        stopIndex = expiryStarts[expiryIndex + 1]
+        resultDict = {}
+        for columnName, column in self.m_ColumnsDict[fCalls].items():
+            resultDict[columnName] = column[firstIndex:stopIndex]
+        return resultDict
+    # End - GetOptionsForExpiry
+
+
+    #####################################################
+    #
+    # [CStockOptionChain::FindOption]
+    #
+    # Returns the row index of one option, or -1 if it is not in the chain.
+    #####################################################
+    def FindOption(self, expiryDayNum, strikePrice, fCalls):
+        expiryIndex = int(np.searchsorted(self.m_ExpiryDayNums, expiryDayNum, side='left'))
+        if ((expiryIndex >= len(self.m_ExpiryDayNums)) or (self.m_ExpiryDayNums[expiryIndex] != expiryDayNum)):
+            return -1
+
+        expiryStarts = self.m_ExpiryStartsDict[fCalls]
+        firstIndex = int(expiryStarts[expiryIndex])
+        stopIndex = int(expiryStarts[expiryIndex + 1])
+        strikeColumn = self.m_ColumnsDict[fCalls]['Strike']
+        rowIndex = firstIndex + int(np.searchsorted(strikeColumn[firstIndex:stopIndex], strikePrice, side='left'))
+        if ((rowIndex >= stopIndex) or (strikeColumn[rowIndex] != strikePrice)):
+            return -1
+        return rowIndex
+    # End - FindOption
+
+
+    #####################################################
+    #
+    # [CStockOptionChain::GetOptionsNearPrice]
+    #
+    # Returns a dict of columns with every option whose strike is within
+    # maxFraction of spotPrice, like 0.05 for 5%, across every expiration
+    # from firstExpiryDayNum to lastExpiryDayNum. The rows are still sorted
+    # by expiration, then strike.
+    #####################################################
+    def GetOptionsNearPrice(self, spotPrice, maxFraction, fCalls, firstExpiryDayNum=None, lastExpiryDayNum=None):
+        columnDict = self.m_ColumnsDict[fCalls]
+        fMatchArray = (np.abs(columnDict['Strike'] - spotPrice) <= (maxFraction * spotPrice))
+        if (firstExpiryDayNum is not None):
+            fMatchArray &= (columnDict['ExpiryDayNum'] >= firstExpiryDayNum)
+        if (lastExpiryDayNum is not None):
+            fMatchArray &= (columnDict['ExpiryDayNum'] <= lastExpiryDayNum)
+
+        resultDict = {}
+        for columnName, column in columnDict.items():
+            resultDict[columnName] = column[fMatchArray]
+        return resultDict
+    # End - GetOptionsNearPrice
+
+# End - CStockOptionChain
+
+
+
+
+
+################################################################################
+#
+# [MakeEmptyOptionColumns]
+#
+################################################################################
+def MakeEmptyOptionColumns():
+    columnDict = {}
+    for columnName, columnType in g_OptionColumnList:
+        columnDict[columnName] = np.zeros(0, dtype=columnType)
+    return columnDict
+# End - MakeEmptyOptionColumns
+
+
+
+################################################################################
+#
+# [ParseExpiryDate]
+#
+# 'YYYY-MM-DD' --> day number
+################################################################################
+def ParseExpiryDate(expiryDateStr):
+    dateStrParts = expiryDateStr.split('-')
+    return StockTicker.DateToDayNum(int(dateStrParts[0]), int(dateStrParts[1]), int(dateStrParts[2]))
+# End - ParseExpiryDate
+
+
+
+################################################################################
+#
+# [LoadOptionChain]
+#
+# Get every expiration from the provider, numThreads at a time, and put them
+# all in one chain. An expiration that cannot be fetched is left out.
+# Returns None if the provider does not have any expiration dates.
+################################################################################
+def LoadOptionChain(tickerSymbol, optionProvider, numThreads=DEFAULT_OPTION_THREADS):
+    fDebug = False
+    expiryDateStrList = optionProvider.GetExpiryDates(tickerSymbol)
+    if (not expiryDateStrList):
+        return None
+    if (fDebug):
+        print("LoadOptionChain. tickerSymbol=" + tickerSymbol + ", numExpiries=" + str(len(expiryDateStrList)))
+
+    with ThreadPoolExecutor(max_workers=max(1, numThreads)) as optionPool:
+        futureList = [optionPool.submit(optionProvider.GetChainColumns, tickerSymbol, expiryDateStr) 
+                        for expiryDateStr in expiryDateStrList]
+
+        # For each of calls and puts, a list of column dicts, one per expiration.
+        expiryColumnsDict = {True: [], False: []}
+        for expiryDateStr, future in zip(expiryDateStrList, futureList):
+            try:
+                callColumnDict, putColumnDict = future.result()
+            except Exception as err:
+                print("LoadOptionChain. Cannot get " + tickerSymbol + " options for " + expiryDateStr + ": " + str(err))
+                continue
+
+            expiryDayNum = ParseExpiryDate(expiryDateStr)
+            for fCalls, columnDict in ((True, callColumnDict), (False, putColumnDict)):
+                columnDict = dict(columnDict)
+                columnDict['ExpiryDayNum'] = np.full(len(columnDict['Strike']), expiryDayNum, dtype=np.int32)
+                expiryColumnsDict[fCalls].append(columnDict)
+            # End - for fCalls, columnDict in ((True, callColumnDict), (False, putColumnDict)):
+        # End - for expiryDateStr, future in zip(expiryDateStrList, futureList):
+    # End - with ThreadPoolExecutor(max_workers=max(1, numThreads)) as optionPool:
+
+    optionChain = CStockOptionChain(tickerSymbol)
+    for fCalls, columnDictList in expiryColumnsDict.items():
+        allColumnDict = MakeEmptyOptionColumns()
+        for columnName, columnType in g_OptionColumnList:
+            allColumnDict[columnName] = np.concatenate([allColumnDict[columnName]] 
+                                                        + [np.asarray(columnDict[columnName], dtype=columnType) 
+                                                            for columnDict in columnDictList])
+        optionChain.SetOptions(fCalls, allColumnDict)
+    # End - for fCalls, columnDictList in expiryColumnsDict.items():
+
+    return optionChain
+# End - LoadOptionChain
+
+
+
+
+
+################################################################################
+#
+# class CYahooOptionProvider
+#
+# Get options from the Yahoo client in stockTickerYahoo, which is yfinance or a
+# stand-in with the same Ticker(symbol).options and option_chain(date) calls.
+################################################################################
+class CYahooOptionProvider(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, yahooClient):
+        self.m_YahooClient = yahooClient
+    # End -  __init__
+
+
+    #####################################################
+    # [CYahooOptionProvider::GetExpiryDates]
+    #####################################################
+    def GetExpiryDates(self, tickerSymbol):
+        return list(self.m_YahooClient.Ticker(tickerSymbol).options)
+
+
+    #####################################################
+    # [CYahooOptionProvider::GetChainColumns]
+    #####################################################
+    def GetChainColumns(self, tickerSymbol, expiryDateStr):
+        totalOptionInfo = self.m_YahooClient.Ticker(tickerSymbol).option_chain(expiryDateStr)
+        return GetOptionFrameColumns(totalOptionInfo.calls), GetOptionFrameColumns(totalOptionInfo.puts)
+
+# End - CYahooOptionProvider
+
+
+
+################################################################################
+#
+# [GetOptionFrameColumns]
+#
+# Convert one calls or puts DataFrame from option_chain() into columns.
+################################################################################
+def GetOptionFrameColumns(optionFrame):
+    # The last trade time is a time zone aware column. to_numpy gives it in UTC.
+    lastTradeArray = np.asarray(optionFrame['lastTradeDate'].to_numpy(dtype='datetime64[ns]'))
+    columnDict = {'Strike': optionFrame['strike'].to_numpy(dtype=np.float64),
+                'Bid': np.nan_to_num(optionFrame['bid'].to_numpy(dtype=np.float64)),
+                'Ask': np.nan_to_num(optionFrame['ask'].to_numpy(dtype=np.float64)),
+                'Volume': np.nan_to_num(optionFrame['volume'].to_numpy(dtype=np.float64)).astype(np.int64),
+                'OpenInterest': np.nan_to_num(optionFrame['openInterest'].to_numpy(dtype=np.float64)).astype(np.int64),
+                'LastTradeDayNum': (lastTradeArray.astype('datetime64[D]').astype(np.int64) + StockTicker.EPOCH_DAY_NUM).astype(np.int32)}
+    return columnDict
+# End - GetOptionFrameColumns
+
+
+
+
+
+################################################################################
+#
+# class CFakeOptionProvider
+#
+# Made-up option chains, for tests and benchmarks without a network.
+# The chain only depends on the symbol. There are numExpiries weekly expirations,
+# each with numStrikes strikes around a made-up spot price.
+################################################################################
+class CFakeOptionProvider(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, numExpiries=12, numStrikes=80, latencySecs=0.0, firstExpiryDate=date(2024, 1, 5)):
+        self.m_NumExpiries = numExpiries
+        self.m_NumStrikes = numStrikes
+        self.m_LatencySecs = latencySecs
+        self.m_FirstExpiryDayNum = firstExpiryDate.toordinal()
+    # End -  __init__
+
+
+    #####################################################
+    # [CFakeOptionProvider::GetSpotPrice]
+    #####################################################
+    def GetSpotPrice(self, tickerSymbol):
+        randomGenerator = np.random.default_rng(zlib.crc32(tickerSymbol.encode('utf-8')))
+        return round(float(randomGenerator.uniform(20.0, 500.0)), 2)
+
+
+    #####################################################
+    # [CFakeOptionProvider::GetExpiryDates]
+    #####################################################
+    def GetExpiryDates(self, tickerSymbol):
+        expiryDateStrList = []
+        for expiryIndex in range(self.m_NumExpiries):
+            expiryDate = date.fromordinal(self.m_FirstExpiryDayNum + (7 * expiryIndex))
+            expiryDateStrList.append(expiryDate.isoformat())
+        return expiryDateStrList
+    # End - GetExpiryDates
+
+
+    #####################################################
+    # [CFakeOptionProvider::GetChainColumns]
+    #####################################################
+    def GetChainColumns(self, tickerSymbol, expiryDateStr):
+        if (self.m_LatencySecs > 0):
+            time.sleep(self.m_LatencySecs)
+
+        spotPrice = self.GetSpotPrice(tickerSymbol)
+        randomGenerator = np.random.default_rng(zlib.crc32((tickerSymbol + expiryDateStr).encode('utf-8')))
+        strikeStep = max(0.5, round(spotPrice / 100.0, 0))
+        firstStrike = (round(spotPrice / strikeStep) - (self.m_NumStrikes // 2)) * strikeStep
+        strikeArray = firstStrike + (strikeStep * np.arange(self.m_NumStrikes))
+        strikeArray = strikeArray[strikeArray > 0]
+        numStrikes = len(strikeArray)
+        lastTradeDayNum = ParseExpiryDate(expiryDateStr) - 7
+
+        columnDictList = []
+        for intrinsicArray in (np.maximum(spotPrice - strikeArray, 0), np.maximum(strikeArray - spotPrice, 0)):
+            midArray = intrinsicArray + (spotPrice * 0.02 * randomGenerator.uniform(0.5, 1.5, numStrikes))
+            columnDictList.append({'Strike': strikeArray,
+                                'Bid': np.round(midArray * 0.98, 2),
+                                'Ask': np.round(midArray * 1.02, 2),
+                                'Volume': randomGenerator.integers(0, 5000, numStrikes),
+                                'OpenInterest': randomGenerator.integers(0, 50000, numStrikes),
+                                'LastTradeDayNum': np.full(numStrikes, lastTradeDayNum, dtype=np.int32)})
+        # End - for intrinsicArray in ...
+
+        return columnDictList[0], columnDictList[1]
+    # End - GetChainColumns
+
+# End - CFakeOptionProvider
+
@@ -0,0 +1,495 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Nightly Pipeline
+#
+# This does all of the slow work ahead of time, so the web server only has to
+# send a file. For each ticker in the universe, it runs these stages:
+#
+#   fetch       Download the quote and price history, on a thread pool
+#   ingest      Drop tickers without enough history, trim the columns, and
+#               give every ticker one shared trading calendar
+#   stats       ComputeAllStats
+#   extremes    The days with the biggest prices and price changes
+#   backtests   The standard robots, buy and hold and skip the biggest declines
+#   report      The HTML page, and a JSON summary of every result
+#   publish     Write the price warehouse, publish the tickers to the shared
+#               ticker store, then make this version the current one
+#
+# Each run writes a new version directory, and only then swaps the "current"
+# symlink to point to it. A reader that opens current/<file> always gets a
+# complete set of files from one run, never a mix of two runs.
+#
+#   <outputDir>/versions/<version>/report.html
+#   <outputDir>/versions/<version>/summary.json
+#   <outputDir>/versions/<version>/timings.json
+#   <outputDir>/current -> versions/<version>
+#   <outputDir>/stockPrices.db
+#   <outputDir>/shared/         The stockSharedStore files, which have their own generations
+#
+# Usage:
+#   python3 stockPipeline.py [--source yahoo|fake] [--out dirPath] [symbol ...]
+#
+################################################################################
+import os
+import sys
+import time
+import json
+import shutil
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+g_DirPath = os.path.dirname(os.path.realpath(__file__))
+if g_DirPath not in sys.path:
+    sys.path.insert(0, g_DirPath)
+
+import fileTemplate as FileTemplate
+import stockTicker as StockTicker
+import stockTickerYahoo as StockTickerYahoo
+import stockCalendar as StockCalendar
+import stockAccount as StockAccount
+import stockRobot as StockRobot
+import stockMarket as StockMarket
+import stockSharedStore as StockSharedStore
+import stockWarehouse as StockWarehouse
+
+# The names of the files and directories in the output directory.
+# stockWebServer.py reads CURRENT_LINK_NAME/REPORT_FILE_NAME.
+PIPELINE_OUTPUT_DIR_NAME = "nightly"
+VERSIONS_DIR_NAME = "versions"
+CURRENT_LINK_NAME = "current"
+SHARED_STORE_DIR_NAME = "shared"
+REPORT_FILE_NAME = "report.html"
+SUMMARY_FILE_NAME = "summary.json"
+TIMINGS_FILE_NAME = "timings.json"
+REPORT_TEMPLATE_FILE_NAME = "finTech.html"
+
+DEFAULT_FETCH_THREADS = 8
+DEFAULT_NUM_VERSIONS_TO_KEEP = 3
+
+# A ticker with fewer days than this is left out of the report.
+MIN_DAYS_OF_HISTORY = 30
+
+# The universe when none is given on the command line.
+g_DefaultUniverseList = [StockTicker.SP500_TICKER]
+
+NUM_EXTREME_PRICES = 10
+INITIAL_ACCOUNT_VALUE = 10000
+
+g_ExtremeTypeList = [StockTicker.EXTREMES_MAX_PRICES, StockTicker.EXTREMES_MIN_PRICES,
+                    StockTicker.EXTREMES_MAX_PRICE_CHANGES, StockTicker.EXTREMES_MAX_PRICE_INCREASES,
+                    StockTicker.EXTREMES_MAX_PRICE_DECLINES]
+
+
+
+
+
+################################################################################
+#
+# class CPipelineTimer
+#
+# The elapsed time of each stage, in the order they ran.
+################################################################################
+class CPipelineTimer(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self):
+        self.m_StageTimeList = []
+        self.m_CurrentStageName = None
+        self.m_CurrentStageStartTime = 0.0
+    # End -  __init__
+
+
+    #####################################################
+    # [CPipelineTimer::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CPipelineTimer::StartStage]
+    #####################################################
+    def StartStage(self, stageName):
+        self.FinishStage()
+        self.m_CurrentStageName = stageName
+        self.m_CurrentStageStartTime = time.perf_counter()
+    # End - StartStage
+
+
+    #####################################################
+    # [CPipelineTimer::FinishStage]
+    #####################################################
+    def FinishStage(self):
+        if (self.m_CurrentStageName is None):
+            return
+
+        elapsedSecs = time.perf_counter() - self.m_CurrentStageStartTime
+        self.m_StageTimeList.append((self.m_CurrentStageName, elapsedSecs))
+        print("Pipeline. " + self.m_CurrentStageName + ": " + ("%.3f" % elapsedSecs) + " secs")
+        self.m_CurrentStageName = None
+    # End - FinishStage
+
+
+    #####################################################
+    # [CPipelineTimer::GetTimingDict]
+    #####################################################
+    def GetTimingDict(self):
+        timingDict = {}
+        for stageName, elapsedSecs in self.m_StageTimeList:
+            timingDict[stageName] = round(elapsedSecs, 6)
+        timingDict['total'] = round(sum(elapsedSecs for _, elapsedSecs in self.m_StageTimeList), 6)
+        return timingDict
+    # End - GetTimingDict
+
+# End - CPipelineTimer
+
+
+
+
+
+################################################################################
+#
+# [MakeVersionDir]
+#
+# Returns the path of a new, empty, version directory.
+################################################################################
+def MakeVersionDir(outputDirPath):
+    versionsDirPath = os.path.join(outputDirPath, VERSIONS_DIR_NAME)
+    os.makedirs(versionsDirPath, exist_ok=True)
+
+    versionNameBase = datetime.now().strftime("%Y%m%d-%H%M%S")
+    versionName = versionNameBase
+    versionNum = 1
+    while (os.path.exists(os.path.join(versionsDirPath, versionName))):
+        versionName = versionNameBase + "-" + str(versionNum)
+        versionNum += 1
+
+    versionDirPath = os.path.join(versionsDirPath, versionName)
+    os.makedirs(versionDirPath)
+    return versionDirPath
+# End - MakeVersionDir
+
+
+
+################################################################################
+#
+# [SwapCurrentVersion]
+#
+# Point the current symlink at a version directory. The new link is made under
+# a temporary name and renamed over the old one, which is atomic, so there is
+# never a moment without a current version.
+################################################################################
+def SwapCurrentVersion(outputDirPath, versionDirPath):
+    currentLinkPath = os.path.join(outputDirPath, CURRENT_LINK_NAME)
+    tempLinkPath = currentLinkPath + ".tmp" + str(os.getpid())
+    if (os.path.lexists(tempLinkPath)):
+        os.remove(tempLinkPath)
+
+    # A relative link still works if the whole output directory is moved.
+    os.symlink(os.path.relpath(versionDirPath, outputDirPath), tempLinkPath)
+    os.replace(tempLinkPath, currentLinkPath)
+# End - SwapCurrentVersion
+
+
+
+################################################################################
+#
+# [RemoveOldVersions]
+#
+# Keep the newest numVersionsToKeep versions, and always the current one.
+################################################################################
+def RemoveOldVersions(outputDirPath, numVersionsToKeep):
+    versionsDirPath = os.path.join(outputDirPath, VERSIONS_DIR_NAME)
+    currentDirPath = os.path.realpath(os.path.join(outputDirPath, CURRENT_LINK_NAME))
+
+    # The names start with the date and time, so they sort oldest first.
+    versionNameList = sorted(os.listdir(versionsDirPath))
+    for versionName in versionNameList[:max(0, len(versionNameList) - numVersionsToKeep)]:
+        versionDirPath = os.path.join(versionsDirPath, versionName)
+        if (os.path.realpath(versionDirPath) == currentDirPath):
+            continue
+        shutil.rmtree(versionDirPath, ignore_errors=True)
+    # End - for versionName in ...
+# End - RemoveOldVersions
+
+
+
+################################################################################
+#
+# [WriteJsonFile]
+#
+# Write to a temporary name and rename, so a reader never sees a partial file.
+################################################################################
+def WriteJsonFile(filePath, valueDict):
+    tempFilePath = filePath + ".tmp"
+    with open(tempFilePath, "w") as fileH:
+        json.dump(valueDict, fileH, indent=1)
+    os.replace(tempFilePath, filePath)
+# End - WriteJsonFile
+
+
+
+
+
+################################################################################
+#
+# [FetchTickers]
+#
+# Returns a dict of symbol to ticker, in the order of symbolList.
+# A ticker that cannot be fetched is left out.
+################################################################################
+def FetchTickers(tickerSourceName, symbolList, numFetchThreads):
+    with ThreadPoolExecutor(max_workers=max(1, numFetchThreads)) as fetchPool:
+        tickerList = list(fetchPool.map(lambda tickerSymbol: StockTickerYahoo.FetchTicker(tickerSourceName, tickerSymbol), 
+                                        symbolList))
+
+    stockTickerDict = {}
+    for tickerSymbol, stockTicker in zip(symbolList, tickerList):
+        if (stockTicker is None):
+            print("Pipeline. Cannot fetch " + tickerSymbol)
+            continue
+        stockTickerDict[tickerSymbol] = stockTicker
+    # End - for tickerSymbol, stockTicker in zip(symbolList, tickerList):
+
+    return stockTickerDict
+# End - FetchTickers
+
+
+
+################################################################################
+#
+# [IngestTickers]
+#
+################################################################################
+def IngestTickers(stockTickerDict):
+    for tickerSymbol in list(stockTickerDict.keys()):
+        stockTicker = stockTickerDict[tickerSymbol]
+        if (stockTicker.PastPrices.GetNumRows() < MIN_DAYS_OF_HISTORY):
+            print("Pipeline. Not enough history for " + tickerSymbol)
+            del stockTickerDict[tickerSymbol]
+            continue
+        stockTicker.PastPrices.TrimToSize()
+    # End - for tickerSymbol in list(stockTickerDict.keys()):
+
+    tradingCalendar = StockCalendar.MakeTradingCalendarForTickers(list(stockTickerDict.values()))
+    for stockTicker in stockTickerDict.values():
+        stockTicker.SetTradingCalendar(tradingCalendar)
+# End - IngestTickers
+
+
+
+################################################################################
+#
+# [GetTickerExtremes]
+#
+# Returns a dict of extreme type to a list of {'date', 'value'}
+################################################################################
+def GetTickerExtremes(stockTicker):
+    extremesDict = {}
+    for extremeType in g_ExtremeTypeList:
+        numExtremePriceDays, priceList, extremePriceDays, _ = stockTicker.GetDaysWithExtremePrices(extremeType, NUM_EXTREME_PRICES)
+        extremeList = []
+        for index in range(numExtremePriceDays):
+            dateInfo = extremePriceDays[index]
+            extremeList.append({'date': "%04d-%02d-%02d" % (dateInfo['y'], dateInfo['m'], dateInfo['d']),
+                                'value': round(float(priceList[index]), 4)})
+        extremesDict[extremeType] = extremeList
+    # End - for extremeType in g_ExtremeTypeList:
+
+    return extremesDict
+# End - GetTickerExtremes
+
+
+
+################################################################################
+#
+# [RunStandardBacktests]
+#
+# Returns a dict of robot name to the final account value.
+################################################################################
+def RunStandardBacktests(stockTicker):
+    resultDict = {}
+
+    account = StockAccount.MakeTradingAccount(INITIAL_ACCOUNT_VALUE)
+    StockMarket.RunRobot(stockTicker, StockRobot.CStockRobotBuyAndHold(), account, -1)
+    resultDict['buyAndHold'] = round(account.GetAccountValue(), 2)
+
+    # This is the same value as MakeSkipDatesRobot and RunRobot with the EXTREMES_MAX_PRICE_DECLINES
+    # days, including which of several tied days is skipped. test_stockMarket.py checks this.
+    _, skipWorstArray, _ = StockMarket.GetSkipExtremeDaysCurves(stockTicker, NUM_EXTREME_PRICES, 
+                                                initialValue=INITIAL_ACCOUNT_VALUE, fRankByPriceChange=True)
+    resultDict['skipWorstDeclines'] = round(float(skipWorstArray[-1]), 2)
+
+    return resultDict
+# End - RunStandardBacktests
+
+
+
+################################################################################
+#
+# [MakeReportPage]
+#
+# Fill in the web page template with a table of every ticker's results.
+################################################################################
+def MakeReportPage(summaryDict, collectedTimeStr):
+    reportHTML = FileTemplate.MakeTemplate()
+    tableStrList = ["<table border=1>\n<tr> <th>Ticker</th> <th>Last Day</th> <th>Close</th> <th>RSI</th>"
+                    + " <th>Buy and Hold</th> <th>Skip " + str(NUM_EXTREME_PRICES) + " Worst Days</th>"
+                    + " <th>Biggest Decline</th> </tr>\n"]
+
+    for tickerSymbol, tickerSummary in summaryDict.items():
+        backtestDict = tickerSummary['backtests']
+        biggestDeclineList = tickerSummary['extremes'][StockTicker.EXTREMES_MAX_PRICE_DECLINES]
+        biggestDeclineStr = ""
+        if (len(biggestDeclineList) > 0):
+            biggestDecline = min(biggestDeclineList, key=lambda extreme: extreme['value'])
+            biggestDeclineStr = str(biggestDecline['value']) + " on " + biggestDecline['date']
+
+        cellStrList = ["<td>" + tickerSymbol + "</td>", "<td>" + tickerSummary['lastDate'] + "</td>", 
+                        "<td>" + str(tickerSummary['close']) + "</td>", "<td>" + str(tickerSummary['rsi']) + "</td>",
+                        reportHTML.MakeColoredTableCellStr(backtestDict['buyAndHold'], FileTemplate.GREATER_THAN, 
+                                                        INITIAL_ACCOUNT_VALUE, FileTemplate.LESS_THAN, INITIAL_ACCOUNT_VALUE),
+                        reportHTML.MakeColoredTableCellStr(backtestDict['skipWorstDeclines'], FileTemplate.GREATER_THAN, 
+                                                        backtestDict['buyAndHold'], FileTemplate.LESS_THAN, backtestDict['buyAndHold']),
+                        "<td>" + biggestDeclineStr + "</td>"]
+        tableStrList.append("<tr> " + " ".join(cellStrList) + " </tr>\n")
+    # End - for tickerSymbol, tickerSummary in summaryDict.items():
+    tableStrList.append("</table>\n")
+
+    reportHTML.SetBodyStr("Collected " + collectedTimeStr + "\n<br><br>\n")
+    reportHTML.SetBodyStr("".join(tableStrList))
+    return reportHTML.ExpandTemplate(os.path.join(g_DirPath, REPORT_TEMPLATE_FILE_NAME))
+# End - MakeReportPage
+
+
+
+################################################################################
+#
+# [RunNightlyPipeline]
+#
+# Returns the path of the new current version, and a dict of stage name to
+# seconds. Returns None for the path if no ticker could be loaded, and then the
+# current version is not changed.
+################################################################################
+def RunNightlyPipeline(symbolList, outputDirPath, tickerSourceName=StockTickerYahoo.YAHOO_FINANCE,
+                        numFetchThreads=DEFAULT_FETCH_THREADS, numVersionsToKeep=DEFAULT_NUM_VERSIONS_TO_KEEP):
+    pipelineTimer = CPipelineTimer()
+    collectedTimeStr = datetime.today().strftime("%A %B %d, %Y (%H:%M:%S)")
+
+    pipelineTimer.StartStage("fetch")
+    stockTickerDict = FetchTickers(tickerSourceName, symbolList, numFetchThreads)
+
+    pipelineTimer.StartStage("ingest")
+    IngestTickers(stockTickerDict)
+    if (len(stockTickerDict) == 0):
+        pipelineTimer.FinishStage()
+        print("Pipeline. No tickers were loaded")
+        return None, pipelineTimer.GetTimingDict()
+
+    pipelineTimer.StartStage("stats")
+    for stockTicker in stockTickerDict.values():
+        stockTicker.ComputeAllStats()
+
+    pipelineTimer.StartStage("extremes")
+    summaryDict = {}
+    for tickerSymbol, stockTicker in stockTickerDict.items():
+        year, month, day = stockTicker.GetLatestDate()
+        summaryDict[tickerSymbol] = {'lastDate': "%04d-%02d-%02d" % (year, month, day), 
+                                    'close': round(float(stockTicker.PastPrices.GetColumn('Cl')[-1]), 4),
+                                    'rsi': round(float(stockTicker.PastPrices.GetColumn('RSI')[-1]), 2),
+                                    'extremes': GetTickerExtremes(stockTicker)}
+    # End - for tickerSymbol, stockTicker in stockTickerDict.items():
+
+    pipelineTimer.StartStage("backtests")
+    for tickerSymbol, stockTicker in stockTickerDict.items():
+        summaryDict[tickerSymbol]['backtests'] = RunStandardBacktests(stockTicker)
+
+    pipelineTimer.StartStage("report")
+    versionDirPath = MakeVersionDir(outputDirPath)
+    with open(os.path.join(versionDirPath, REPORT_FILE_NAME), "w") as fileH:
+        fileH.write(MakeReportPage(summaryDict, collectedTimeStr))
+    WriteJsonFile(os.path.join(versionDirPath, SUMMARY_FILE_NAME), summaryDict)
+
+    pipelineTimer.StartStage("publish")
+    warehouse = StockWarehouse.CStockWarehouse(os.path.join(outputDirPath, StockWarehouse.WAREHOUSE_FILE_NAME))
+    if (warehouse.Open()):
+        for stockTicker in stockTickerDict.values():
+            warehouse.WriteTicker(stockTicker)
+        warehouse.Close()
+    # End - if (warehouse.Open()):
+    StockSharedStore.PublishTickers(os.path.join(outputDirPath, SHARED_STORE_DIR_NAME), stockTickerDict)
+    pipelineTimer.FinishStage()
+
+    # The timings are the last file in the version, and then it is made current.
+    WriteJsonFile(os.path.join(versionDirPath, TIMINGS_FILE_NAME), pipelineTimer.GetTimingDict())
+    SwapCurrentVersion(outputDirPath, versionDirPath)
+    RemoveOldVersions(outputDirPath, numVersionsToKeep)
+
+    return versionDirPath, pipelineTimer.GetTimingDict()
+# End - RunNightlyPipeline
+
+
+
+
+
+################################################################################
+#
+# Main
+#
+################################################################################
+if __name__ == "__main__":
+    argList = sys.argv[1:]
+    tickerSourceName = StockTickerYahoo.YAHOO_FINANCE
+    outputDirPath = os.path.join(g_DirPath, PIPELINE_OUTPUT_DIR_NAME)
+    symbolList = []
+    while (len(argList) > 0):
+        argStr = argList.pop(0)
+        if ((argStr == "--source") and (len(argList) > 0)):
+            tickerSourceName = argList.pop(0)
+        elif ((argStr == "--out") and (len(argList) > 0)):
+            outputDirPath = argList.pop(0)
+        elif (argStr.startswith("--")):
+            print("Usage: python3 stockPipeline.py [--source yahoo|fake] [--out dirPath] [symbol ...]")
+            sys.exit(1)
+        else:
+            symbolList.append(argStr)
+    # End - while (len(argList) > 0):
+
+    if (len(symbolList) == 0):
+        symbolList = g_DefaultUniverseList
+
+    versionDirPath, timingDict = RunNightlyPipeline(symbolList, outputDirPath, tickerSourceName)
+    if (versionDirPath is None):
+        sys.exit(1)
+    print("Pipeline. Wrote " + versionDirPath + ". Total " + ("%.3f" % timingDict['total']) + " secs")
+    sys.exit(0)
+# End - if __name__ == "__main__":
+
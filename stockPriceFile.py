@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+################################################################################
+#
+# Price File
+#
+# This is a binary file with the price history of one ticker. The file is
+# memory-mapped, and each column of the price store is a read-only numpy view
+# straight onto the mapped pages. Opening a file only parses the header, so it
+# takes about the same time for 1 year or 60 years of prices, and every process
+# that opens the same file shares the same page-cache pages.
+#
+# The layout, all little-endian:
+#
+#   Header (FILE_HEADER_STRUCT)
+#       magic, version, number of rows, number of columns, symbol,
+#       and the current prices of the ticker (close, open, low, high, volume)
+#   Column directory. One COLUMN_ENTRY_STRUCT for each column
+#       name, numpy dtype string, byte offset in the file, byte size
+#   Column blocks. Each column is a contiguous array, starting on a
+#       COLUMN_ALIGNMENT byte boundary.
+#
+# A file is written to a temporary name and then renamed, so a reader never
+# sees a partly written file.
+#
+################################################################################
+import os
+import sys
+import mmap
+import struct
+
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockPriceStore as StockPriceStore
+
+PRICE_FILE_MAGIC = b'STKPRICE'
+PRICE_FILE_VERSION = 1
+PRICE_FILE_SUFFIX = '.prices'
+
+# magic, version, numRows, numColumns, symbol,
+# currentPrice, prevClose, todayOpen, todayLow, todayHigh, volume
+FILE_HEADER_STRUCT = struct.Struct('<8sIQI16s6d')
+# The symbol field of the header. A longer symbol cannot be saved.
+MAX_SYMBOL_BYTES = 16
+# name, dtype, offset, numBytes
+COLUMN_ENTRY_STRUCT = struct.Struct('<32s8sQQ')
+
+# Column blocks start on a cache line boundary.
+COLUMN_ALIGNMENT = 64
+
+# The current price values, in the order they are in the header.
+g_CurrentPriceNameList = ['CurrentPrice', 'PrevClose', 'TodayOpenPrice', 'TodayLowPrice', 'TodayHighPrice', 'Volume']
+
+
+
+
+
+################################################################################
+#
+# [AlignOffset]
+#
+################################################################################
+def AlignOffset(offset):
+    return ((offset + COLUMN_ALIGNMENT - 1) // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+# End - AlignOffset
+
+
+
+################################################################################
+#
+# [WritePriceFile]
+#
+# currentPriceDict has the names in g_CurrentPriceNameList. A missing name is saved as 0.
+# This raises ValueError if the symbol is over MAX_SYMBOL_BYTES bytes in UTF-8,
+# rather than saving a cut off symbol.
+################################################################################
+def WritePriceFile(filePath, tickerSymbol, currentPriceDict, priceStore):
+    fDebug = False
+    symbolBytes = tickerSymbol.encode('utf-8')
+    if (len(symbolBytes) > MAX_SYMBOL_BYTES):
+        raise ValueError("WritePriceFile. Symbol is over " + str(MAX_SYMBOL_BYTES) + " bytes: " + tickerSymbol)
+
+    numRows = priceStore.GetNumRows()
+    columnNameList = [columnName for columnName, _ in StockPriceStore.g_PriceColumnList]
+    if (fDebug):
+        print("WritePriceFile. filePath=" + filePath + ", numRows=" + str(numRows))
+
+    # Lay out the columns after the header and directory.
+    offset = FILE_HEADER_STRUCT.size + (len(columnNameList) * COLUMN_ENTRY_STRUCT.size)
+    columnArrayList = []
+    columnEntryList = []
+    for columnName in columnNameList:
+        columnArray = np.ascontiguousarray(priceStore.GetColumn(columnName))
+        columnArray = columnArray.astype(columnArray.dtype.newbyteorder('<'), copy=False)
+        offset = AlignOffset(offset)
+        columnArrayList.append((offset, columnArray))
+        columnEntryList.append(COLUMN_ENTRY_STRUCT.pack(columnName.encode('ascii'), 
+                                                        columnArray.dtype.str.encode('ascii'), 
+                                                        offset, columnArray.nbytes))
+        offset += columnArray.nbytes
+    # End - for columnName in columnNameList:
+
+    currentPriceList = [float(currentPriceDict.get(name, 0)) for name in g_CurrentPriceNameList]
+    headerBytes = FILE_HEADER_STRUCT.pack(PRICE_FILE_MAGIC, PRICE_FILE_VERSION, numRows, len(columnNameList),
+                                        symbolBytes, *currentPriceList)
+
+    # Do not leave a partly written temporary file behind if a write fails.
+    tempFilePath = filePath + ".tmp" + str(os.getpid())
+    try:
+        with open(tempFilePath, 'wb') as fileObj:
+            fileObj.write(headerBytes)
+            fileObj.write(b''.join(columnEntryList))
+            for columnOffset, columnArray in columnArrayList:
+                fileObj.write(b'\0' * (columnOffset - fileObj.tell()))
+                fileObj.write(columnArray.tobytes())
+            # End - for columnOffset, columnArray in columnArrayList:
+        # End - with open(tempFilePath, 'wb') as fileObj:
+
+        os.replace(tempFilePath, filePath)
+    except BaseException:
+        if (os.path.exists(tempFilePath)):
+            os.remove(tempFilePath)
+        raise
+    # End - try
+    return True
+# End - WritePriceFile
+
+
+
+################################################################################
+#
+# [ReadPriceFile]
+#
+# Returns tickerSymbol, currentPriceDict, priceStore.
+# The columns of priceStore are read-only views of the mapped file.
+# This returns None, None, None if the file is missing or is not a price file.
+################################################################################
+def ReadPriceFile(filePath):
+    fDebug = False
+    try:
+        with open(filePath, 'rb') as fileObj:
+            mappedFile = mmap.mmap(fileObj.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as err:
+        print("ReadPriceFile. Cannot open " + filePath + ": " + str(err))
+        return None, None, None
+
+    if (len(mappedFile) < FILE_HEADER_STRUCT.size):
+        print("ReadPriceFile. File is too short: " + filePath)
+        return None, None, None
+
+    headerValues = FILE_HEADER_STRUCT.unpack_from(mappedFile, 0)
+    magic, version, numRows, numColumns, symbolBytes = headerValues[:5]
+    if ((magic != PRICE_FILE_MAGIC) or (version != PRICE_FILE_VERSION)):
+        print("ReadPriceFile. Not a price file: " + filePath)
+        return None, None, None
+
+    if (FILE_HEADER_STRUCT.size + (numColumns * COLUMN_ENTRY_STRUCT.size) > len(mappedFile)):
+        print("ReadPriceFile. Column directory is past the end of the file: " + filePath)
+        return None, None, None
+
+    # A corrupt file can have any bytes in the symbol or the column directory.
+    try:
+        tickerSymbol = symbolBytes.rstrip(b'\0').decode('utf-8')
+        currentPriceDict = dict(zip(g_CurrentPriceNameList, headerValues[5:]))
+        if (fDebug):
+            print("ReadPriceFile. tickerSymbol=" + tickerSymbol + ", numRows=" + str(numRows))
+
+        # The views keep a reference to the map, so it stays open while any column is in use.
+        columnDict = {}
+        for columnIndex in range(numColumns):
+            entryOffset = FILE_HEADER_STRUCT.size + (columnIndex * COLUMN_ENTRY_STRUCT.size)
+            nameBytes, dtypeBytes, columnOffset, numBytes = COLUMN_ENTRY_STRUCT.unpack_from(mappedFile, entryOffset)
+            columnName = nameBytes.rstrip(b'\0').decode('ascii')
+            columnType = np.dtype(dtypeBytes.rstrip(b'\0').decode('ascii'))
+            if ((columnOffset + numBytes > len(mappedFile)) or (numBytes != numRows * columnType.itemsize)):
+                print("ReadPriceFile. Bad column " + columnName + " in " + filePath)
+                return None, None, None
+
+            columnDict[columnName] = np.frombuffer(mappedFile, dtype=columnType, count=numRows, offset=columnOffset)
+        # End - for columnIndex in range(numColumns):
+    except (struct.error, TypeError, ValueError, UnicodeDecodeError) as err:
+        print("ReadPriceFile. Bad column directory in " + filePath + ": " + str(err))
+        return None, None, None
+    # End - try
+
+    priceStore = StockPriceStore.CStockPriceStore()
+    if (not priceStore.AttachColumns(columnDict, numRows)):
+        return None, None, None
+
+    return tickerSymbol, currentPriceDict, priceStore
+# End - ReadPriceFile
+
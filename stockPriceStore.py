@@ -0,0 +1,266 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Price Store
+#
+# This is the columnar storage behind a CStockTicker. Each field of a daily bar
+# (date, open, high, low, close, volume and every derived indicator) lives in
+# its own contiguous typed numpy array, rather than in one dict per day.
+# A dict per bar costs several hundred bytes plus a boxed float per value, while
+# the columns cost about 100 bytes per bar, and an indicator can read a whole
+# column at once.
+#
+# The column names are the same keys the old per-day dicts used, so code that
+# asked for priceInfo['Cl'] now asks for GetColumn('Cl').
+#
+# A column may also be a read-only view on a memory-mapped price file. Those are
+# copied the first time the store grows or a caller asks for a writable column.
+#
+################################################################################
+import sys
+
+import numpy as np
+
+# The minimum number of rows allocated when a column first grows.
+MIN_COLUMN_CAPACITY = 256
+
+# Every column in the store, in the order that AppendRow takes its values.
+g_PriceColumnList = [
+    ('y', np.int16),
+    ('m', np.int8),
+    ('d', np.int8),
+    ('Cl', np.float64),
+    ('Op', np.float64),
+    ('Hi', np.float64),
+    ('Lo', np.float64),
+    ('Vo', np.int64),
+    ('RSI', np.float64),
+    ('EMA12', np.float64),
+    ('EMA26', np.float64),
+    ('MACD', np.float64),
+    ('KStochastic', np.float64),
+    ('DStochastic', np.float64),
+    ('BiggestRecentDropPercent', np.float64),
+    # The date as a day number, from datetime.date.toordinal(). This is sorted, so
+    # it can be binary searched, and two tickers can be joined on it.
+    ('DayNum', np.int32)
+]
+
+
+
+
+
+################################################################################
+#
+# class CStockPriceStore
+#
+################################################################################
+class CStockPriceStore(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self):
+        self.m_NumRows = 0
+        self.m_Columns = {}
+        for columnName, columnType in g_PriceColumnList:
+            self.m_Columns[columnName] = np.zeros(0, dtype=columnType)
+    # End -  __init__
+
+
+    #####################################################
+    # [CStockPriceStore::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CStockPriceStore::GetNumRows]
+    #####################################################
+    def GetNumRows(self):
+        return self.m_NumRows
+
+    #####################################################
+    # [CStockPriceStore::GetColumnNames]
+    #####################################################
+    def GetColumnNames(self):
+        return list(self.m_Columns.keys())
+
+    #####################################################
+    # [CStockPriceStore::HasColumn]
+    #####################################################
+    def HasColumn(self, columnName):
+        return (columnName in self.m_Columns)
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::GetColumn]
+    #
+    # This returns a view, not a copy, so writing into the result
+    # writes into the store. The oldest price is index 0.
+    #####################################################
+    def GetColumn(self, columnName):
+        return self.m_Columns[columnName][:self.m_NumRows]
+    # End - GetColumn
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::GetWritableColumn]
+    #
+    # This is GetColumn, but first copies the column if it is
+    # read-only, such as a view on a memory-mapped file.
+    #####################################################
+    def GetWritableColumn(self, columnName):
+        column = self.m_Columns[columnName]
+        if (not column.flags.writeable):
+            column = column.copy()
+            self.m_Columns[columnName] = column
+
+        return column[:self.m_NumRows]
+    # End - GetWritableColumn
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::AttachColumns]
+    #
+    # Use existing arrays as the columns, without copying them.
+    # The arrays may be read-only. A column that is not in columnDict
+    # is filled with zeros.
+    #####################################################
+    def AttachColumns(self, columnDict, numRows):
+        for columnName, columnType in g_PriceColumnList:
+            if (columnName in columnDict):
+                column = columnDict[columnName]
+                if ((column.dtype != columnType) or (len(column) < numRows)):
+                    print("AttachColumns. Bad column: " + columnName)
+                    return False
+            else:
+                column = np.zeros(numRows, dtype=columnType)
+            self.m_Columns[columnName] = column
+        # End - for columnName, columnType in g_PriceColumnList:
+
+        self.m_NumRows = numRows
+        return True
+    # End - AttachColumns
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::Reserve]
+    #
+    # Make sure every column can hold numRows without reallocating.
+    #####################################################
+    def Reserve(self, numRows):
+        for columnName, column in self.m_Columns.items():
+            if (len(column) >= numRows):
+                continue
+
+            newColumn = np.zeros(numRows, dtype=column.dtype)
+            newColumn[:self.m_NumRows] = column[:self.m_NumRows]
+            self.m_Columns[columnName] = newColumn
+        # End - for columnName, column in self.m_Columns.items():
+
+        # A read-only column may be long enough, but still cannot be appended to.
+        for columnName, column in self.m_Columns.items():
+            if (not column.flags.writeable):
+                self.m_Columns[columnName] = column.copy()
+        # End - for columnName, column in self.m_Columns.items():
+    # End - Reserve
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::AppendRow]
+    #
+    # rowValues is in the same order as g_PriceColumnList.
+    #####################################################
+    def AppendRow(self, rowValues):
+        rowIndex = self.m_NumRows
+        numRows = rowIndex + 1
+
+        # Double the capacity, so appending one row at a time is amortized O(1)
+        if ((len(self.m_Columns['y']) < numRows) or (not self.m_Columns['y'].flags.writeable)):
+            self.Reserve(max(MIN_COLUMN_CAPACITY, 2 * numRows))
+
+        for (columnName, _), value in zip(g_PriceColumnList, rowValues):
+            self.m_Columns[columnName][rowIndex] = value
+
+        self.m_NumRows = numRows
+    # End - AppendRow
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::TrimToSize]
+    #
+    # Release the spare capacity left over from appending.
+    #####################################################
+    def TrimToSize(self):
+        for columnName, column in self.m_Columns.items():
+            if (len(column) > self.m_NumRows):
+                self.m_Columns[columnName] = column[:self.m_NumRows].copy()
+        # End - for columnName, column in self.m_Columns.items():
+    # End - TrimToSize
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::GetMemoryUsage]
+    #
+    # Returns the total bytes allocated, and the bytes per row actually used.
+    #####################################################
+    def GetMemoryUsage(self):
+        totalBytes = 0
+        bytesPerRow = 0
+        for column in self.m_Columns.values():
+            totalBytes += column.nbytes
+            bytesPerRow += column.itemsize
+
+        return totalBytes, bytesPerRow
+    # End - GetMemoryUsage
+
+
+    #####################################################
+    #
+    # [CStockPriceStore::GetRowDict]
+    #
+    # This makes the same dict that used to be stored for each day.
+    # It is slow, and is only meant for debugging.
+    #####################################################
+    def GetRowDict(self, rowIndex):
+        rowDict = {}
+        for columnName, column in self.m_Columns.items():
+            rowDict[columnName] = column[rowIndex].item()
+
+        return rowDict
+    # End - GetRowDict
+
+# End - CStockPriceStore
+
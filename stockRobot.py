@@ -29,6 +29,8 @@
 import sys
 from datetime import datetime
 
+import numpy as np
+
 # Apache will not let you set the lib from an imported library.
 # So, this *assumes* that it can import all other libraries from the same directory.
 import stockAccount as StockAccount
@@ -76,6 +78,21 @@ class CStockRobot(object):
     # End - ProcessNewPrice
 
 
+    #####################################################
+    #
+    # [CStockRobotRule::GetTradeSignals]
+    #
+    # A robot whose trades only depend on each day's prices can say which days
+    # it buys and sells for a whole run at once, so stockMarket.RunRobotVectorized
+    # does not have to call ProcessNewPrice for each day. The arrays are for every
+    # day of the run. Returns two bool arrays, buy and sell, which are never both
+    # True on one day, or (None, None) if the robot must be run one day at a time.
+    #####################################################
+    def GetTradeSignals(self, dayArray, closeArray, rsiArray):
+        return None, None
+    # End - GetTradeSignals
+
+
     #####################################################
     # [CStockRobotRule::WriteToXML]
     #####################################################
@@ -146,6 +163,20 @@ class CStockRobotBuyAndHold(CStockRobot):
         # End - elif (self.InCash):
     # End - ProcessNewPrice
 
+
+    #####################################################
+    # [CStockRobotBuyAndHold::GetTradeSignals]
+    #####################################################
+    def GetTradeSignals(self, dayArray, closeArray, rsiArray):
+        buyArray = np.zeros(len(closeArray), dtype=bool)
+        sellArray = np.zeros(len(closeArray), dtype=bool)
+        if ((self.InCash) and (len(closeArray) > 0)):
+            buyArray[0] = True
+            self.InCash = False
+
+        return buyArray, sellArray
+    # End - GetTradeSignals
+
 # End - CStockRobotBuyAndHold
 
 
@@ -170,6 +201,8 @@ class CStockRobotSkipDays(CStockRobot):
 
         self.DatesToBeInCash = []
         self.NumDatesToBeInCash = 0
+        # (year, month, day) of each of the first NumDatesToBeInCash dates.
+        self.DateSetToBeInCash = set()
     # End -  __init__
 
 
@@ -188,6 +221,7 @@ class CStockRobotSkipDays(CStockRobot):
     def SetDatesForCash(self, numDates, dateList):
         self.DatesToBeInCash = dateList
         self.NumDatesToBeInCash = numDates
+        self.DateSetToBeInCash = set((date['y'], date['m'], date['d']) for date in dateList[:numDates])
     # End - SetDatesForCash
 
 
@@ -206,14 +240,8 @@ class CStockRobotSkipDays(CStockRobot):
             print("     lowPrice=" + str(lowPrice) + ", highPrice=" + str(highPrice) + ", volume=" + str(volume) + ", rsi=" + str(rsi))
             print("     self.DatesToBeInCash=" + str(self.DatesToBeInCash))
 
-        for index in range(self.NumDatesToBeInCash):
-            currentDate = self.DatesToBeInCash[index]
-            if (fDebug):
-                print("CStockRobotSkipDays::ProcessNewPrice. currentDate=" + str(currentDate))
-            if ((year == currentDate['y']) and (month == currentDate['m']) and (day == currentDate['d'])):
-                fSellEverything = True
-                break
-        # for index in range(self.NumDatesToBeInCash):
+        if ((year, month, day) in self.DateSetToBeInCash):
+            fSellEverything = True
 
         if (fDebug):
             print("CStockRobotSkipDays::ProcessNewPrice fSellEverything=" + str(fSellEverything))
@@ -371,6 +399,57 @@ class CStockRobotValueThreshold(CStockRobot):
             account.SellStock(stockTicker, StockAccount.TRADE_TYPE_ALL, closePrice, -1)
     # End - ProcessNewPrice
 
+
+
+    #####################################################
+    #
+    # [CStockRobotValueThreshold::GetTradeSignals]
+    #
+    # This is ProcessNewPrice for every day at once. It makes the same
+    # decisions, including that the sell value is the day of the month
+    # when the buy value type is ROBOT_VALUE_DATE.
+    #####################################################
+    def GetTradeSignals(self, dayArray, closeArray, rsiArray):
+        numDays = len(closeArray)
+
+        ######################################################
+        buyArray = np.zeros(numDays, dtype=bool)
+        if (self.BuyStockValueType != ROBOT_VALUE_NONE):
+            indicatorArray = np.zeros(numDays)
+            if (self.BuyStockValueType == ROBOT_VALUE_RSI):
+                indicatorArray = rsiArray
+            elif (self.BuyStockValueType == ROBOT_VALUE_DATE):
+                indicatorArray = dayArray
+
+            buyArray = CompareWithThreshold(indicatorArray, self.BuyStockRelation, self.BuyStockThreshold)
+
+            # Only buy at the end of the month
+            if (self.BuyStockValueType == ROBOT_VALUE_DATE):
+                buyArray &= (indicatorArray >= 15)
+        # End - if (self.BuyStockValueType != ROBOT_VALUE_NONE)
+
+        ######################################################
+        sellArray = np.zeros(numDays, dtype=bool)
+        if (self.SellStockValueType != ROBOT_VALUE_NONE):
+            indicatorArray = np.zeros(numDays)
+            if (self.SellStockValueType == ROBOT_VALUE_RSI):
+                indicatorArray = rsiArray
+            elif (self.BuyStockValueType == ROBOT_VALUE_DATE):
+                indicatorArray = dayArray
+
+            sellArray = CompareWithThreshold(indicatorArray, self.SellStockRelation, self.SellStockThreshold)
+
+            # Only sell at the beginning of the month
+            if (self.BuyStockValueType == ROBOT_VALUE_DATE):
+                sellArray &= (indicatorArray < 15)
+
+            # A day that buys does not also sell
+            sellArray &= np.logical_not(buyArray)
+        # End - if (self.SellStockValueType != ROBOT_VALUE_NONE)
+
+        return buyArray, sellArray
+    # End - GetTradeSignals
+
 # End - CStockRobotValueThreshold
 
 
@@ -384,6 +463,29 @@ class CStockRobotValueThreshold(CStockRobot):
 ################################################################################
 
 
+################################################################################
+#
+# [CompareWithThreshold]
+#
+# Returns a bool array of (valueArray <relation> threshold).
+################################################################################
+def CompareWithThreshold(valueArray, relation, threshold):
+    if (relation == RELATION_EQUAL):
+        return (valueArray == threshold)
+    elif (relation == RELATION_LESS_THAN):
+        return (valueArray < threshold)
+    elif (relation == RELATION_LESS_THAN_EQUAL):
+        return (valueArray <= threshold)
+    elif (relation == RELATION_GREATER_THAN):
+        return (valueArray > threshold)
+    elif (relation == RELATION_GREATER_THAN_EQUAL):
+        return (valueArray >= threshold)
+
+    return np.zeros(len(valueArray), dtype=bool)
+# End - CompareWithThreshold
+
+
+
 ################################################################################
 #
 # [MakeSkipDatesRobot]
@@ -0,0 +1,333 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Shared Ticker Store
+#
+# This lets every web server worker process use one copy of the price history.
+# A loader process publishes every ticker as a price file, and each worker opens
+# the files with mmap. The columns of a CStockTicker are then read-only views on
+# the mapped pages, which are the same page-cache pages in every process, so
+# adding a worker does not add another copy of the prices.
+#
+# The loader publishes a new day's data as a new generation, in its own directory:
+#
+#   <storeDir>/generation       The current generation number
+#   <storeDir>/gen-<N>/index.json   A dict of symbol to file name
+#   <storeDir>/gen-<N>/<symbol>.prices
+#
+# The generation file is also mapped by each worker, so checking for a new
+# generation is one memory read, not a system call. The loader writes the new
+# number only after every file of the generation is complete. A worker that sees
+# a new number drops its tickers and opens the new files the next time they are
+# asked for. The old generation is removed later. A worker that still has the
+# old files mapped keeps using them, since an unlinked file stays valid while
+# it is mapped.
+#
+################################################################################
+import os
+import sys
+import mmap
+import json
+import shutil
+import struct
+import urllib.parse
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockTicker as StockTicker
+import stockPriceFile as StockPriceFile
+
+GENERATION_FILE_NAME = "generation"
+GENERATION_DIR_PREFIX = "gen-"
+INDEX_FILE_NAME = "index.json"
+
+# magic, generation number. The generation is 8-byte aligned, so it is written
+# and read in one access.
+GENERATION_FILE_MAGIC = b'STKGENER'
+GENERATION_STRUCT = struct.Struct('<8sQ')
+GENERATION_OFFSET = 8
+
+# The loader keeps this many generations before the current one.
+NUM_OLD_GENERATIONS_TO_KEEP = 1
+
+
+
+
+
+################################################################################
+#
+# [GetGenerationDirPath]
+#
+################################################################################
+def GetGenerationDirPath(storeDirPath, generationNum):
+    return os.path.join(storeDirPath, GENERATION_DIR_PREFIX + ("%08d" % generationNum))
+# End - GetGenerationDirPath
+
+
+
+################################################################################
+#
+# [GetPriceFileName]
+#
+# A ticker symbol like ^GSPC is not a good file name, so it is percent-encoded,
+# as %5EGSPC. Two different symbols never get the same file name.
+################################################################################
+def GetPriceFileName(tickerSymbol):
+    return urllib.parse.quote(tickerSymbol, safe="-.") + StockPriceFile.PRICE_FILE_SUFFIX
+# End - GetPriceFileName
+
+
+
+################################################################################
+#
+# [ReadGenerationNum]
+#
+# Returns 0 if nothing has been published.
+################################################################################
+def ReadGenerationNum(storeDirPath):
+    try:
+        with open(os.path.join(storeDirPath, GENERATION_FILE_NAME), 'rb') as fileObj:
+            fileBytes = fileObj.read(GENERATION_STRUCT.size)
+    except OSError:
+        return 0
+
+    if (len(fileBytes) < GENERATION_STRUCT.size):
+        return 0
+    magic, generationNum = GENERATION_STRUCT.unpack(fileBytes)
+    if (magic != GENERATION_FILE_MAGIC):
+        return 0
+
+    return generationNum
+# End - ReadGenerationNum
+
+
+
+################################################################################
+#
+# [PublishTickers]
+#
+# Write every ticker in stockTickerDict as a new generation, and then make it
+# the current generation. This is called by the one loader process.
+# Returns the new generation number.
+################################################################################
+def PublishTickers(storeDirPath, stockTickerDict):
+    os.makedirs(storeDirPath, exist_ok=True)
+    generationNum = ReadGenerationNum(storeDirPath) + 1
+    generationDirPath = GetGenerationDirPath(storeDirPath, generationNum)
+    shutil.rmtree(generationDirPath, ignore_errors=True)
+    os.makedirs(generationDirPath)
+
+    indexDict = {}
+    for tickerSymbol, stockTicker in stockTickerDict.items():
+        fileName = GetPriceFileName(tickerSymbol)
+        StockTicker.WriteTickerToPriceFile(stockTicker, os.path.join(generationDirPath, fileName))
+        indexDict[tickerSymbol] = fileName
+    # End - for tickerSymbol, stockTicker in stockTickerDict.items():
+
+    indexFilePath = os.path.join(generationDirPath, INDEX_FILE_NAME)
+    with open(indexFilePath + ".tmp", "w") as fileH:
+        json.dump(indexDict, fileH)
+    os.replace(indexFilePath + ".tmp", indexFilePath)
+
+    # The first time, make the generation file. After that, it is changed in place, so the
+    # workers that have it mapped see the new number.
+    generationFilePath = os.path.join(storeDirPath, GENERATION_FILE_NAME)
+    if (ReadGenerationNum(storeDirPath) == 0):
+        with open(generationFilePath + ".tmp", "wb") as fileObj:
+            fileObj.write(GENERATION_STRUCT.pack(GENERATION_FILE_MAGIC, 0))
+        os.replace(generationFilePath + ".tmp", generationFilePath)
+    # End - if (ReadGenerationNum(storeDirPath) == 0):
+
+    with open(generationFilePath, 'r+b') as fileObj:
+        mappedFile = mmap.mmap(fileObj.fileno(), GENERATION_STRUCT.size, access=mmap.ACCESS_WRITE)
+    struct.pack_into('<Q', mappedFile, GENERATION_OFFSET, generationNum)
+    mappedFile.flush()
+    mappedFile.close()
+
+    # Remove the generations that no worker should still be opening.
+    for dirName in os.listdir(storeDirPath):
+        if (not dirName.startswith(GENERATION_DIR_PREFIX)):
+            continue
+        oldGenerationNum = int(dirName[len(GENERATION_DIR_PREFIX):])
+        if (oldGenerationNum < generationNum - NUM_OLD_GENERATIONS_TO_KEEP):
+            shutil.rmtree(os.path.join(storeDirPath, dirName), ignore_errors=True)
+    # End - for dirName in os.listdir(storeDirPath):
+
+    return generationNum
+# End - PublishTickers
+
+
+
+
+
+################################################################################
+#
+# class CSharedTickerStore
+#
+# The worker side of the store. Each worker process has one of these.
+################################################################################
+class CSharedTickerStore(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, storeDirPath):
+        self.m_StoreDirPath = storeDirPath
+        self.m_GenerationMap = None
+        self.m_GenerationNum = 0
+        self.m_IndexDict = {}
+        # (symbol, firstYear) --> ticker, all from m_GenerationNum
+        self.m_TickerDict = {}
+    # End -  __init__
+
+
+    #####################################################
+    # [CSharedTickerStore::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    #
+    # [CSharedTickerStore::Open]
+    #
+    # Returns False if nothing has been published yet.
+    #####################################################
+    def Open(self):
+        if (ReadGenerationNum(self.m_StoreDirPath) == 0):
+            return False
+
+        try:
+            with open(os.path.join(self.m_StoreDirPath, GENERATION_FILE_NAME), 'rb') as fileObj:
+                self.m_GenerationMap = mmap.mmap(fileObj.fileno(), GENERATION_STRUCT.size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as err:
+            print("CSharedTickerStore::Open. Cannot open " + self.m_StoreDirPath + ": " + str(err))
+            return False
+
+        return True
+    # End - Open
+
+
+    #####################################################
+    # [CSharedTickerStore::GetGenerationNum]
+    #####################################################
+    def GetGenerationNum(self):
+        if (self.m_GenerationMap is None):
+            return 0
+        return struct.unpack_from('<Q', self.m_GenerationMap, GENERATION_OFFSET)[0]
+    # End - GetGenerationNum
+
+
+    #####################################################
+    #
+    # [CSharedTickerStore::CheckGeneration]
+    #
+    # If the loader published a new generation, then drop every ticker
+    # of the old one, and read the new index.
+    #####################################################
+    def CheckGeneration(self):
+        generationNum = self.GetGenerationNum()
+        if (generationNum == self.m_GenerationNum):
+            return
+
+        indexFilePath = os.path.join(GetGenerationDirPath(self.m_StoreDirPath, generationNum), INDEX_FILE_NAME)
+        try:
+            with open(indexFilePath, "r") as fileH:
+                indexDict = json.load(fileH)
+        except (OSError, ValueError) as err:
+            print("CSharedTickerStore::CheckGeneration. Cannot read " + indexFilePath + ": " + str(err))
+            return
+
+        self.m_IndexDict = indexDict
+        self.m_TickerDict = {}
+        self.m_GenerationNum = generationNum
+    # End - CheckGeneration
+
+
+    #####################################################
+    # [CSharedTickerStore::GetTickerSymbols]
+    #####################################################
+    def GetTickerSymbols(self):
+        self.CheckGeneration()
+        return list(self.m_IndexDict.keys())
+    # End - GetTickerSymbols
+
+
+    #####################################################
+    #
+    # [CSharedTickerStore::GetTicker]
+    #
+    # Returns the ticker from the current generation, with prices from
+    # firstYear on. Its past prices are read-only views on the shared files.
+    # Returns None if the ticker was not published.
+    #####################################################
+    def GetTicker(self, tickerSymbol, firstYear=0):
+        self.CheckGeneration()
+
+        tickerKey = (tickerSymbol, firstYear)
+        stockTicker = self.m_TickerDict.get(tickerKey, None)
+        if (stockTicker is not None):
+            return stockTicker
+
+        stockTicker = self.OpenTickerFile(tickerSymbol, firstYear)
+        if (stockTicker is None):
+            # The loader may have published twice since the last check, and removed this
+            # generation. Then try again once, but only if there really is a newer one.
+            # CheckGeneration keeps the old generation if it cannot read the new index.
+            oldGenerationNum = self.m_GenerationNum
+            self.CheckGeneration()
+            if (self.m_GenerationNum == oldGenerationNum):
+                return None
+            stockTicker = self.OpenTickerFile(tickerSymbol, firstYear)
+            if (stockTicker is None):
+                return None
+        # End - if (stockTicker is None):
+
+        self.m_TickerDict[tickerKey] = stockTicker
+
+        return stockTicker
+    # End - GetTicker
+
+
+    #####################################################
+    #
+    # [CSharedTickerStore::OpenTickerFile]
+    #
+    # Open the ticker's file in the current generation.
+    # Returns None if it was not published, or the file cannot be read.
+    #####################################################
+    def OpenTickerFile(self, tickerSymbol, firstYear):
+        fileName = self.m_IndexDict.get(tickerSymbol, None)
+        if (fileName is None):
+            return None
+
+        filePath = os.path.join(GetGenerationDirPath(self.m_StoreDirPath, self.m_GenerationNum), fileName)
+        return StockTicker.OpenTickerFromPriceFile(filePath, firstYear)
+    # End - OpenTickerFile
+
+# End - CSharedTickerStore
+
@@ -0,0 +1,573 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Parameter Sweep
+#
+# This runs one threshold robot for every point of a parameter grid, on a
+# process pool. For example, every RSI buy threshold from 10 to 50, against
+# every RSI sell threshold from 50 to 90, with several relations.
+#
+# The ticker is written once to a price file, and each worker process opens it
+# with mmap. So, the workers read the same page-cache pages, and no task has to
+# pickle the price history. A task is only a slice of the grid, and it sends
+# back only the final value and the number of trades of each point.
+#
+# The results are one numpy record array, with a row for each grid point. If a
+# daily value file is given, then each worker also writes the daily values of
+# its points into that file, which is a numpy memmap of (points x days)
+# float32 values. Nothing holds the whole grid of daily values in memory.
+#
+# Only a few tasks per worker are submitted at a time, so memory stays bounded
+# for a grid of any size.
+#
+# For the RSI robots, RunThresholdSweep does not run the robot at all. Fix the
+# sell threshold Y. The sell days split the run into segments, and in each one
+# the robot buys on the first day the RSI is below the buy threshold X, then
+# holds to the end of the segment. That day is always a "record" day, where the
+# RSI makes a new low for its segment. As X rises past each record value, the
+# buy day of that segment moves to an earlier record, and the log of the final
+# value changes by a fixed amount. So the final value is a step function of X,
+# with one step for each record day. The RSI values are sorted once, each Y
+# costs O(n), and each X is one binary search. A grid costs
+# O(n log n + numY * n + grid * log n), rather than O(n * grid).
+#
+# Usage:
+#   python3 stockSweep.py [--source yahoo|fake] [--workers N] [--days N] [--sorted] [symbol]
+#
+################################################################################
+import os
+import sys
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+g_DirPath = os.path.dirname(os.path.realpath(__file__))
+if g_DirPath not in sys.path:
+    sys.path.insert(0, g_DirPath)
+
+import stockTicker as StockTicker
+import stockTickerYahoo as StockTickerYahoo
+import stockPriceFile as StockPriceFile
+import stockAccount as StockAccount
+import stockRobot as StockRobot
+import stockMarket as StockMarket
+
+INITIAL_ACCOUNT_VALUE = 10000
+
+# The number of grid points in one task, and the number of tasks each worker
+# may have waiting. Bigger tasks cost less overhead, smaller ones give smoother progress.
+DEFAULT_POINTS_PER_TASK = 256
+TASKS_PER_WORKER = 2
+
+# Print progress at most this often.
+PROGRESS_INTERVAL_SECS = 2.0
+
+# One row of the grid. The first 6 fields are the MakeThresholdRobot parameters.
+g_SweepParamFieldList = [
+    ('BuyValueType', np.int8),
+    ('BuyRelation', np.int8),
+    ('BuyThreshold', np.float64),
+    ('SellValueType', np.int8),
+    ('SellRelation', np.int8),
+    ('SellThreshold', np.float64)
+]
+
+# One row of the results, the parameters and then what the run did.
+g_SweepResultFieldList = g_SweepParamFieldList + [
+    ('FinalValue', np.float64),
+    ('NumTrades', np.int32)
+]
+
+# The searchsorted side that counts the sorted values that pass a buy relation,
+# and the side that counts the values that do not pass a sell relation.
+g_SweepBuySideDict = {StockRobot.RELATION_LESS_THAN: 'left', StockRobot.RELATION_LESS_THAN_EQUAL: 'right'}
+g_SweepNotSellSideDict = {StockRobot.RELATION_GREATER_THAN: 'right', StockRobot.RELATION_GREATER_THAN_EQUAL: 'left'}
+
+# The state of a worker process, set by InitSweepWorker.
+g_WorkerTicker = None
+g_WorkerDailyValueMap = None
+g_WorkerNumDaysToScan = -1
+g_WorkerCountTradingDays = False
+
+
+
+
+
+################################################################################
+#
+# [MakeParameterGrid]
+#
+# Returns a record array with one row for every combination of the lists.
+# The rows are in order of the buy relation, then buy threshold, then sell
+# relation, then sell threshold.
+################################################################################
+def MakeParameterGrid(buyValueType, buyRelationList, buyThresholdList, sellValueType, sellRelationList, sellThresholdList):
+    buyRelationArray, buyThresholdArray, sellRelationArray, sellThresholdArray = np.meshgrid(
+                            np.asarray(buyRelationList), np.asarray(buyThresholdList, dtype=np.float64), 
+                            np.asarray(sellRelationList), np.asarray(sellThresholdList, dtype=np.float64), 
+                            indexing='ij')
+
+    paramGrid = np.zeros(buyRelationArray.size, dtype=g_SweepParamFieldList)
+    paramGrid['BuyValueType'] = buyValueType
+    paramGrid['BuyRelation'] = buyRelationArray.ravel()
+    paramGrid['BuyThreshold'] = buyThresholdArray.ravel()
+    paramGrid['SellValueType'] = sellValueType
+    paramGrid['SellRelation'] = sellRelationArray.ravel()
+    paramGrid['SellThreshold'] = sellThresholdArray.ravel()
+
+    return paramGrid
+# End - MakeParameterGrid
+
+
+
+################################################################################
+#
+# [MakeRSIParameterGrid]
+#
+# Buy when the RSI is low and sell when it is high, for every pair of
+# thresholds, with both the strict and non-strict relations.
+################################################################################
+def MakeRSIParameterGrid(buyThresholdList, sellThresholdList):
+    return MakeParameterGrid(StockRobot.ROBOT_VALUE_RSI, 
+                            [StockRobot.RELATION_LESS_THAN, StockRobot.RELATION_LESS_THAN_EQUAL], buyThresholdList, 
+                            StockRobot.ROBOT_VALUE_RSI, 
+                            [StockRobot.RELATION_GREATER_THAN, StockRobot.RELATION_GREATER_THAN_EQUAL], sellThresholdList)
+# End - MakeRSIParameterGrid
+
+
+
+################################################################################
+#
+# [GetNumDaysInRun]
+#
+# The number of days that RunRobot would run, which is the length of each
+# daily value series.
+################################################################################
+def GetNumDaysInRun(stockTicker, numDaysToScan, fCountTradingDays):
+    if (not StockMarket.GotoRunStartDate(stockTicker, numDaysToScan, fCountTradingDays)):
+        return 0
+    return stockTicker.PastPrices.GetNumRows() - stockTicker.IteratorIndex
+# End - GetNumDaysInRun
+
+
+
+################################################################################
+#
+# [InitSweepWorker]
+#
+# This runs once in each worker process. It maps the price file, and the
+# daily value file if there is one.
+################################################################################
+def InitSweepWorker(priceFilePath, dailyValueFilePath, numPoints, numDays, numDaysToScan, fCountTradingDays):
+    global g_WorkerTicker, g_WorkerDailyValueMap, g_WorkerNumDaysToScan, g_WorkerCountTradingDays
+
+    g_WorkerTicker = StockTicker.OpenTickerFromPriceFile(priceFilePath, 0)
+    g_WorkerDailyValueMap = None
+    if (dailyValueFilePath is not None):
+        g_WorkerDailyValueMap = np.memmap(dailyValueFilePath, dtype=np.float32, mode='r+', shape=(numPoints, numDays))
+    g_WorkerNumDaysToScan = numDaysToScan
+    g_WorkerCountTradingDays = fCountTradingDays
+# End - InitSweepWorker
+
+
+
+################################################################################
+#
+# [RunSweepTask]
+#
+# Run the robot of every row of paramGrid, which starts at row firstPointIndex
+# of the whole grid. This runs in a worker process.
+# Returns firstPointIndex, an array of final values, and an array of trade counts.
+################################################################################
+def RunSweepTask(firstPointIndex, paramGrid):
+    numPoints = len(paramGrid)
+    finalValueArray = np.zeros(numPoints, dtype=np.float64)
+    numTradesArray = np.zeros(numPoints, dtype=np.int32)
+
+    for pointIndex in range(numPoints):
+        paramRow = paramGrid[pointIndex]
+        robot = StockRobot.MakeThresholdRobot(int(paramRow['BuyValueType']), int(paramRow['BuyRelation']), 
+                                            float(paramRow['BuyThreshold']), int(paramRow['SellValueType']), 
+                                            int(paramRow['SellRelation']), float(paramRow['SellThreshold']))
+        account = StockAccount.MakeTradingAccount(INITIAL_ACCOUNT_VALUE)
+        numTrades = StockMarket.RunRobotVectorized(g_WorkerTicker, robot, account, g_WorkerNumDaysToScan, 
+                                                    g_WorkerCountTradingDays)
+
+        finalValueArray[pointIndex] = account.GetAccountValue()
+        numTradesArray[pointIndex] = -1 if (numTrades is None) else numTrades
+        if (g_WorkerDailyValueMap is not None):
+            g_WorkerDailyValueMap[firstPointIndex + pointIndex] = account.GetDailyValueArray()
+    # End - for pointIndex in range(numPoints):
+
+    if (g_WorkerDailyValueMap is not None):
+        g_WorkerDailyValueMap.flush()
+
+    return firstPointIndex, finalValueArray, numTradesArray
+# End - RunSweepTask
+
+
+
+################################################################################
+#
+# [PrintSweepProgress]
+#
+################################################################################
+def PrintSweepProgress(numPointsDone, numPoints, elapsedSecs):
+    pointsPerSec = numPointsDone / max(elapsedSecs, 1e-9)
+    print("Sweep. " + str(numPointsDone) + " / " + str(numPoints) + " points, " 
+            + ("%.0f" % pointsPerSec) + " points/sec", file=sys.stderr)
+# End - PrintSweepProgress
+
+
+
+################################################################################
+#
+# [RunParameterSweep]
+#
+# Run a threshold robot for every row of paramGrid, from MakeParameterGrid.
+# The ticker must already have its stats computed.
+#
+# If fCountTradingDays is True, then the days are counted in the ticker's own
+# trading calendar, not a shared one.
+# If dailyValueFilePath is not None, then the daily values are written to it as
+# a (points x days) float32 memmap. Open it with OpenDailyValueFile.
+# progressCallback(numPointsDone, numPoints, elapsedSecs) is called as tasks
+# finish. Pass None for no progress.
+#
+# Returns a record array of g_SweepResultFieldList, in the same order as paramGrid.
+# NumTrades is -1 for a point that could not be run with RunRobotVectorized.
+################################################################################
+def RunParameterSweep(stockTicker, paramGrid, numDaysToScan=-1, fCountTradingDays=False, 
+                        numWorkers=None, dailyValueFilePath=None, pointsPerTask=DEFAULT_POINTS_PER_TASK,
+                        progressCallback=PrintSweepProgress):
+    numPoints = len(paramGrid)
+    if (numWorkers is None):
+        numWorkers = os.cpu_count() or 1
+    numWorkers = max(1, numWorkers)
+    pointsPerTask = max(1, pointsPerTask)
+
+    resultTable = np.zeros(numPoints, dtype=g_SweepResultFieldList)
+    for fieldName, _ in g_SweepParamFieldList:
+        resultTable[fieldName] = paramGrid[fieldName]
+
+    # The workers read the prices from a private copy of the price file, in the
+    # same format as the shared ticker store.
+    tempDirPath = tempfile.mkdtemp(prefix="stockSweep")
+    try:
+        priceFilePath = os.path.join(tempDirPath, stockTicker.GetStockSymbol() + StockPriceFile.PRICE_FILE_SUFFIX)
+        StockPriceFile.WritePriceFile(priceFilePath, stockTicker.GetStockSymbol(), {}, stockTicker.PastPrices)
+
+        # Count the days the same way the workers will, on a ticker from the file.
+        numDays = GetNumDaysInRun(StockTicker.OpenTickerFromPriceFile(priceFilePath, 0), numDaysToScan, fCountTradingDays)
+        if (dailyValueFilePath is not None):
+            dailyValueMap = np.memmap(dailyValueFilePath, dtype=np.float32, mode='w+', 
+                                    shape=(max(numPoints, 1), max(numDays, 1)))
+            del dailyValueMap
+
+        startTime = time.perf_counter()
+        lastProgressTime = startTime
+        numPointsDone = 0
+        with ProcessPoolExecutor(max_workers=numWorkers, initializer=InitSweepWorker,
+                                initargs=(priceFilePath, dailyValueFilePath, max(numPoints, 1), max(numDays, 1),
+                                            numDaysToScan, fCountTradingDays)) as sweepPool:
+            pendingSet = set()
+            nextPointIndex = 0
+            while ((nextPointIndex < numPoints) or (len(pendingSet) > 0)):
+                while ((nextPointIndex < numPoints) and (len(pendingSet) < numWorkers * TASKS_PER_WORKER)):
+                    paramSlice = paramGrid[nextPointIndex:nextPointIndex + pointsPerTask]
+                    pendingSet.add(sweepPool.submit(RunSweepTask, nextPointIndex, paramSlice))
+                    nextPointIndex += len(paramSlice)
+                # End - while ((nextPointIndex < numPoints) and ...
+
+                doneSet, pendingSet = wait(pendingSet, return_when=FIRST_COMPLETED)
+                for future in doneSet:
+                    firstPointIndex, finalValueArray, numTradesArray = future.result()
+                    lastPointIndex = firstPointIndex + len(finalValueArray)
+                    resultTable['FinalValue'][firstPointIndex:lastPointIndex] = finalValueArray
+                    resultTable['NumTrades'][firstPointIndex:lastPointIndex] = numTradesArray
+                    numPointsDone += len(finalValueArray)
+                # End - for future in doneSet:
+
+                now = time.perf_counter()
+                if ((progressCallback is not None) 
+                        and ((now - lastProgressTime >= PROGRESS_INTERVAL_SECS) or (numPointsDone == numPoints))):
+                    progressCallback(numPointsDone, numPoints, now - startTime)
+                    lastProgressTime = now
+            # End - while ((nextPointIndex < numPoints) or (len(pendingSet) > 0)):
+        # End - with ProcessPoolExecutor(...) as sweepPool:
+    finally:
+        shutil.rmtree(tempDirPath, ignore_errors=True)
+
+    return resultTable
+# End - RunParameterSweep
+
+
+
+################################################################################
+#
+# [OpenDailyValueFile]
+#
+# Returns a read-only (points x days) memmap of a daily value file
+# written by RunParameterSweep.
+################################################################################
+def OpenDailyValueFile(dailyValueFilePath, numPoints, numDays):
+    return np.memmap(dailyValueFilePath, dtype=np.float32, mode='r', shape=(numPoints, numDays))
+# End - OpenDailyValueFile
+
+
+
+################################################################################
+#
+# [GetBestSweepResults]
+#
+# Returns the numResults rows with the biggest final value, best first.
+################################################################################
+def GetBestSweepResults(resultTable, numResults):
+    numResults = min(numResults, len(resultTable))
+    if (numResults <= 0):
+        return resultTable[:0]
+
+    bestIndexArray = np.argpartition(resultTable['FinalValue'], len(resultTable) - numResults)[-numResults:]
+    bestIndexArray = bestIndexArray[np.argsort(resultTable['FinalValue'][bestIndexArray])[::-1]]
+    return resultTable[bestIndexArray]
+# End - GetBestSweepResults
+
+
+
+
+
+################################################################################
+#
+# [GetBuyThresholdSteps]
+#
+# For one sell rule, returns the step function of the buy threshold, as 3 arrays:
+#   stepValueArray      The indicator values of the record days, sorted
+#   logGrowthArray      log(final value / initial cash), once the buy threshold
+#                       includes stepValueArray[0..i]
+#   numTradesArray      The number of trades, for the same thresholds
+# sortedIndexArray is np.argsort(valueArray), so it can be shared between calls.
+################################################################################
+def GetBuyThresholdSteps(closeArray, valueArray, sellRelation, sellThreshold, sortedIndexArray):
+    numDays = len(closeArray)
+    if (numDays == 0):
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int32)
+
+    sellArray = StockRobot.CompareWithThreshold(valueArray, sellRelation, sellThreshold)
+    sellIndexArray = np.flatnonzero(sellArray)
+    numSells = len(sellIndexArray)
+    # Segment k starts after sell day k, and ends on sell day k + 1, or the last day.
+    segmentArray = np.cumsum(sellArray)
+    segmentEndArray = np.append(sellIndexArray, numDays - 1)
+
+    # A running minimum that starts over in each segment. Each segment is shifted
+    # below all of the ones before it, and a sell day is never a record.
+    valueRange = float(np.nanmax(valueArray) - np.nanmin(valueArray)) + 1.0
+    shiftedArray = valueArray - (segmentArray * valueRange)
+    shiftedArray[sellArray] = np.inf
+    runningMinArray = np.fmin.accumulate(shiftedArray)
+    recordArray = shiftedArray < np.concatenate(([np.inf], runningMinArray[:-1]))
+
+    # The growth if the segment buys on each record day. When a record turns on, the
+    # earlier record of the same segment, if any, replaces it when X is a little higher.
+    recordIndexArray = np.flatnonzero(recordArray)
+    recordSegmentArray = segmentArray[recordIndexArray]
+    logCloseArray = np.log(closeArray)
+    recordGrowthArray = logCloseArray[segmentEndArray[recordSegmentArray]] - logCloseArray[recordIndexArray]
+    fSameSegmentArray = np.append(recordSegmentArray[1:] == recordSegmentArray[:-1], False)
+
+    dayLogGrowthArray = np.zeros(numDays)
+    dayLogGrowthArray[recordIndexArray] = recordGrowthArray - np.where(fSameSegmentArray, np.append(recordGrowthArray[1:], 0.0), 0.0)
+    # A segment starts to trade at its last record, which is its lowest value. It buys
+    # once, and then sells unless it is the last segment.
+    dayNumTradesArray = np.zeros(numDays, dtype=np.int32)
+    dayNumTradesArray[recordIndexArray] = np.where(fSameSegmentArray, 0, 1 + (recordSegmentArray < numSells))
+
+    sortedRecordIndexArray = sortedIndexArray[recordArray[sortedIndexArray]]
+    stepValueArray = valueArray[sortedRecordIndexArray]
+    logGrowthArray = np.cumsum(dayLogGrowthArray[sortedRecordIndexArray])
+    numTradesArray = np.cumsum(dayNumTradesArray[sortedRecordIndexArray])
+
+    return stepValueArray, logGrowthArray, numTradesArray
+# End - GetBuyThresholdSteps
+
+
+
+################################################################################
+#
+# [SweepThresholds]
+#
+# The final value and the number of trades for every pair of a buy threshold
+# and a sell threshold, as 2 tables of (numBuyThresholds x numSellThresholds).
+# buyRelation is RELATION_LESS_THAN or RELATION_LESS_THAN_EQUAL, and
+# sellRelation is RELATION_GREATER_THAN or RELATION_GREATER_THAN_EQUAL.
+# A pair whose buy and sell days overlap is NaN, with -1 trades, since the robot
+# does not sell on a day it buys, and the steps do not hold then.
+# Returns None, None for any other relation.
+################################################################################
+def SweepThresholds(closeArray, valueArray, buyRelation, buyThresholdList, sellRelation, sellThresholdList, 
+                    initialCash=INITIAL_ACCOUNT_VALUE):
+    if ((buyRelation not in g_SweepBuySideDict) or (sellRelation not in g_SweepNotSellSideDict)):
+        print("SweepThresholds. Unsupported relations: " + str(buyRelation) + ", " + str(sellRelation))
+        return None, None
+
+    valueArray = np.asarray(valueArray, dtype=np.float64)
+    buyThresholdArray = np.asarray(buyThresholdList, dtype=np.float64)
+    sellThresholdArray = np.asarray(sellThresholdList, dtype=np.float64)
+    finalValueTable = np.zeros((len(buyThresholdArray), len(sellThresholdArray)))
+    numTradesTable = np.zeros((len(buyThresholdArray), len(sellThresholdArray)), dtype=np.int32)
+
+    sortedIndexArray = np.argsort(valueArray, kind='stable')
+    sortedValueArray = valueArray[sortedIndexArray]
+    # In sorted order, the buy days are a prefix and the sell days are a suffix.
+    numBuyDaysArray = np.searchsorted(sortedValueArray, buyThresholdArray, side=g_SweepBuySideDict[buyRelation])
+    numNotSellDaysArray = np.searchsorted(sortedValueArray, sellThresholdArray, side=g_SweepNotSellSideDict[sellRelation])
+
+    for sellIndex, sellThreshold in enumerate(sellThresholdArray):
+        stepValueArray, logGrowthArray, numTradesArray = GetBuyThresholdSteps(closeArray, valueArray, sellRelation, 
+                                                                            sellThreshold, sortedIndexArray)
+        numStepsArray = np.searchsorted(stepValueArray, buyThresholdArray, side=g_SweepBuySideDict[buyRelation])
+        finalValueTable[:, sellIndex] = initialCash * np.exp(np.concatenate(([0.0], logGrowthArray))[numStepsArray])
+        numTradesTable[:, sellIndex] = np.concatenate(([0], numTradesArray))[numStepsArray]
+    # End - for sellIndex, sellThreshold in enumerate(sellThresholdArray):
+
+    fOverlapTable = numBuyDaysArray[:, np.newaxis] > numNotSellDaysArray[np.newaxis, :]
+    finalValueTable[fOverlapTable] = np.nan
+    numTradesTable[fOverlapTable] = -1
+
+    return finalValueTable, numTradesTable
+# End - SweepThresholds
+
+
+
+################################################################################
+#
+# [RunThresholdSweep]
+#
+# This is RunParameterSweep, with the same paramGrid and the same result table,
+# but it uses SweepThresholds for every group of rows with the same value types
+# and relations. It runs in this process. A row that SweepThresholds cannot do
+# is run with RunRobotVectorized.
+################################################################################
+def RunThresholdSweep(stockTicker, paramGrid, numDaysToScan=-1, fCountTradingDays=False):
+    resultTable = np.zeros(len(paramGrid), dtype=g_SweepResultFieldList)
+    for fieldName, _ in g_SweepParamFieldList:
+        resultTable[fieldName] = paramGrid[fieldName]
+    resultTable['FinalValue'] = np.nan
+
+    numDays = GetNumDaysInRun(stockTicker, numDaysToScan, fCountTradingDays)
+    firstIndex = stockTicker.PastPrices.GetNumRows() - numDays
+    closeArray = stockTicker.PastPrices.GetColumn('Cl')[firstIndex:]
+    rsiArray = stockTicker.PastPrices.GetColumn('RSI')[firstIndex:]
+
+    ruleArray = np.stack((paramGrid['BuyValueType'], paramGrid['BuyRelation'], 
+                        paramGrid['SellValueType'], paramGrid['SellRelation']), axis=1)
+    uniqueRuleArray, ruleIndexArray = np.unique(ruleArray, axis=0, return_inverse=True)
+    ruleIndexArray = ruleIndexArray.ravel()
+    for ruleNum, (buyValueType, buyRelation, sellValueType, sellRelation) in enumerate(uniqueRuleArray):
+        if ((numDays == 0) or (buyValueType != StockRobot.ROBOT_VALUE_RSI) or (sellValueType != StockRobot.ROBOT_VALUE_RSI)
+                or (buyRelation not in g_SweepBuySideDict) or (sellRelation not in g_SweepNotSellSideDict)):
+            continue
+
+        rowIndexArray = np.flatnonzero(ruleIndexArray == ruleNum)
+        buyThresholdArray, buyInverseArray = np.unique(paramGrid['BuyThreshold'][rowIndexArray], return_inverse=True)
+        sellThresholdArray, sellInverseArray = np.unique(paramGrid['SellThreshold'][rowIndexArray], return_inverse=True)
+        finalValueTable, numTradesTable = SweepThresholds(closeArray, rsiArray, buyRelation, buyThresholdArray, 
+                                                        sellRelation, sellThresholdArray)
+        resultTable['FinalValue'][rowIndexArray] = finalValueTable[buyInverseArray, sellInverseArray]
+        resultTable['NumTrades'][rowIndexArray] = numTradesTable[buyInverseArray, sellInverseArray]
+    # End - for ruleNum, (buyValueType, ...) in enumerate(uniqueRuleArray):
+
+    for rowIndex in np.flatnonzero(np.isnan(resultTable['FinalValue'])):
+        paramRow = paramGrid[rowIndex]
+        robot = StockRobot.MakeThresholdRobot(int(paramRow['BuyValueType']), int(paramRow['BuyRelation']), 
+                                            float(paramRow['BuyThreshold']), int(paramRow['SellValueType']), 
+                                            int(paramRow['SellRelation']), float(paramRow['SellThreshold']))
+        account = StockAccount.MakeTradingAccount(INITIAL_ACCOUNT_VALUE)
+        numTrades = StockMarket.RunRobotVectorized(stockTicker, robot, account, numDaysToScan, fCountTradingDays)
+        resultTable['FinalValue'][rowIndex] = account.GetAccountValue()
+        resultTable['NumTrades'][rowIndex] = -1 if (numTrades is None) else numTrades
+    # End - for rowIndex in np.flatnonzero(np.isnan(resultTable['FinalValue'])):
+
+    return resultTable
+# End - RunThresholdSweep
+
+
+
+
+
+################################################################################
+#
+# Main
+#
+################################################################################
+if __name__ == "__main__":
+    argList = sys.argv[1:]
+    tickerSourceName = StockTickerYahoo.YAHOO_FINANCE
+    numWorkers = None
+    numDaysToScan = -1
+    tickerSymbol = StockTicker.SP500_TICKER
+    fSortedSweep = False
+    while (len(argList) > 0):
+        argStr = argList.pop(0)
+        if ((argStr == "--source") and (len(argList) > 0)):
+            tickerSourceName = argList.pop(0)
+        elif ((argStr == "--workers") and (len(argList) > 0)):
+            numWorkers = int(argList.pop(0))
+        elif ((argStr == "--days") and (len(argList) > 0)):
+            numDaysToScan = int(argList.pop(0))
+        elif (argStr == "--sorted"):
+            fSortedSweep = True
+        elif (argStr.startswith("--")):
+            print("Usage: python3 stockSweep.py [--source yahoo|fake] [--workers N] [--days N] [--sorted] [symbol]")
+            sys.exit(1)
+        else:
+            tickerSymbol = argStr
+    # End - while (len(argList) > 0):
+
+    stockTicker = StockTickerYahoo.FetchTicker(tickerSourceName, tickerSymbol)
+    if (stockTicker is None):
+        print("Sweep. Cannot fetch " + tickerSymbol)
+        sys.exit(1)
+    stockTicker.ComputeAllStats()
+
+    paramGrid = MakeRSIParameterGrid(np.arange(10, 51), np.arange(50, 91))
+    startTime = time.perf_counter()
+    if (fSortedSweep):
+        resultTable = RunThresholdSweep(stockTicker, paramGrid, numDaysToScan)
+    else:
+        resultTable = RunParameterSweep(stockTicker, paramGrid, numDaysToScan, numWorkers=numWorkers)
+    print("Sweep. " + str(len(paramGrid)) + " points in " + ("%.3f" % (time.perf_counter() - startTime)) + " secs")
+
+    for resultRow in GetBestSweepResults(resultTable, 10):
+        print("   buy RSI rel " + str(resultRow['BuyRelation']) + " " + str(resultRow['BuyThreshold'])
+                + ", sell RSI rel " + str(resultRow['SellRelation']) + " " + str(resultRow['SellThreshold'])
+                + ": " + ("%.2f" % resultRow['FinalValue']) + ", " + str(resultRow['NumTrades']) + " trades")
+    sys.exit(0)
+# End - if __name__ == "__main__":
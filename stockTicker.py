@@ -36,120 +36,154 @@
 ################################################################################
 import sys
 from datetime import datetime
+from datetime import date
+from collections import deque
+from operator import itemgetter
 
 #import statistics
 #from scipy import stats
 #from scipy.stats import spearmanr
-#import numpy as np
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockPriceStore as StockPriceStore
+import stockCalendar as StockCalendar
+import stockPriceFile as StockPriceFile
+import stockExtremes as StockExtremes
 
 STAT_SCORE_CORRELATION_WITH_PRICE_T1 = "corrPriceT1"
 STAT_SCORE_CORRELATION_WITH_PRICE_T4 = "corrPriceT4"
 
+# The stats that ComputeAllStatCorrelations correlates with future prices,
+# and the default number of days in the future.
+CORRELATION_STAT_NAMES = ['RSI', 'EMA12', 'EMA26', 'MACD', 'KStochastic', 'BiggestRecentDropPercent']
+DEFAULT_CORRELATION_HORIZONS = list(range(1, 31))
+
 SP500_TICKER = '^GSPC'
 GOLDEN_DRAGON_TICKER = '^HXC'
 
 YAHOO_FINANCE = "yahoo"
 
 # OpCodes for GetExtremes
-EXTREMES_MAX_PRICES = "maxPrices"
-EXTREMES_MIN_PRICES = "minPrices"
-EXTREMES_MAX_PRICE_CHANGES = "maxPriceChanges"
-EXTREMES_MAX_PRICE_INCREASES = "maxPriceIncreases"
-EXTREMES_MAX_PRICE_DECLINES = "maxPriceDeclines"
+EXTREMES_MAX_PRICES = StockExtremes.EXTREMES_MAX_PRICES
+EXTREMES_MIN_PRICES = StockExtremes.EXTREMES_MIN_PRICES
+EXTREMES_MAX_PRICE_CHANGES = StockExtremes.EXTREMES_MAX_PRICE_CHANGES
+EXTREMES_MAX_PRICE_INCREASES = StockExtremes.EXTREMES_MAX_PRICE_INCREASES
+EXTREMES_MAX_PRICE_DECLINES = StockExtremes.EXTREMES_MAX_PRICE_DECLINES
 
 # OpCodes for CompareDates
 DATE_COMPARE_GREATER_THAN_EQUAL = 1
 
 DEFAULT_RSI_NUM_DATA = 15
 
+# If True, ComputeAllStats computes each stat for the whole history in a few array
+# passes. If False, it calls ComputeRSI, GetStochastic,... once for each day.
+# Both give the same numbers, but the per-day path is O(numDays x window).
+USE_VECTORIZED_STATS = True
+
 
 
-g_DaysInMonth = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 ################################################################################
-# 
-# [GetDateForNumDaysOffset]
 #
-# Note, g_DaysInMonth is 0-based, while the date strings use months that are 1-based.
+# Day Numbers
+#
+# A date is stored as one int, the day number from datetime.date.toordinal().
+# Day 1 is Jan 1 of year 1, so dates compare and subtract like ints, and a sorted
+# column of them can be binary searched. numpy datetime64[D] counts days from
+# Jan 1 1970, so converting those to day numbers adds EPOCH_DAY_NUM.
 ################################################################################
-def GetDateForNumDaysOffset(startYear, startMonth, startDay, deltaDays):
-    fDebug = False
-    newYear = startYear
-    newMonth = startMonth
-    newDay = startDay
+EPOCH_DAY_NUM = date(1970, 1, 1).toordinal()
 
-    if (fDebug):
-        print("GetDateForNumDaysOffset. deltaDays=" + str(deltaDays))
-        print("     startYear=" + str(startYear) + ", startMonth=" + str(startMonth) + ", startDay=" + str(startDay))
-        print("     newYear=" + str(newYear) + ", newMonth=" + str(newMonth) + ", newDay=" + str(newDay))
+################################################################################
+#
+# [DateToDayNum]
+#
+################################################################################
+def DateToDayNum(year, month, day):
+    return date(int(year), int(month), int(day)).toordinal()
+# End - DateToDayNum
 
-    # Back up years
-    while (deltaDays >= 365):
-        # 1900 was NOT a leap year but 2000 was a leap year
-        fIsStartDateLeapYear = False
-        if (((newYear - 1900) % 4) == 0):
-            if ((newMonth > 2) or ((newMonth == 2) and (newDay == 29))):
-                fIsStartDateLeapYear = True
-
-        newYear = newYear - 1
-        deltaDays = deltaDays - 365
-        if (fIsStartDateLeapYear):
-            fIsStartDateLeapYear = False
-            deltaDays = deltaDays - 1
-    # End - while (deltaDays >= 365):
-
-    # Decide if we end up on a leap year.
-    # 1900 was NOT a leap year but 2000 was a leap year
-    fInLeapYear = (((newYear - 1900) % 4) == 0)
 
-    if (fDebug):
-        print("GetDateForNumDaysOffset. Subtracted years. deltaDays=" + str(deltaDays))
-        print("     newYear=" + str(newYear) + ", newMonth=" + str(newMonth) + ", newDay=" + str(newDay))
+################################################################################
+#
+# [DayNumToDate]
+#
+################################################################################
+def DayNumToDate(dayNum):
+    dateValue = date.fromordinal(int(dayNum))
+    return dateValue.year, dateValue.month, dateValue.day
+# End - DayNumToDate
 
-    # Back up months
-    if ((fInLeapYear) and (newMonth == 2)):
-        numDaysInMonth = 29
-    else:
-        numDaysInMonth = g_DaysInMonth[newMonth - 1]
-    while (deltaDays >= numDaysInMonth):
-        deltaDays = deltaDays - numDaysInMonth
-
-        newMonth = newMonth - 1
-        if (newMonth <= 0):
-            newMonth = 12
-            newYear = newYear - 1
-            fInLeapYear = (((newYear - 1900) % 4) == 0)
-
-        # Do this for the next iteration
-        if ((fInLeapYear) and (newMonth == 2)):
-            numDaysInMonth = 29
-        else:
-            numDaysInMonth = g_DaysInMonth[newMonth - 1]
-    # End  - while (deltaDays >= 30):
 
-    if (fDebug):
-        print("GetDateForNumDaysOffset. Subtracted months. deltaDays=" + str(deltaDays))
-        print("     newYear=" + str(newYear) + ", newMonth=" + str(newMonth) + ", newDay=" + str(newDay))
+################################################################################
+#
+# [DatesToDayNums]
+#
+# The array version of DateToDayNum.
+# This is the days-from-civil calculation, with only int arithmetic. The year
+# starts in March, so the leap day is the last day of the year, and every 400
+# years is an era of exactly 146097 days. That is much faster than numpy's
+# datetime64 month and year conversions.
+################################################################################
+def DatesToDayNums(yearArray, monthArray, dayArray):
+    yearArray = np.asarray(yearArray, dtype=np.int64)
+    monthArray = np.asarray(monthArray, dtype=np.int64)
+    dayArray = np.asarray(dayArray, dtype=np.int64)
 
-    # Back up days   
-    newDay = newDay - deltaDays
-    while (newDay <= 0):
-        newMonth = newMonth - 1
-        if (newMonth <= 0):
-            newMonth = 12
-            newYear = newYear - 1
-            fInLeapYear = (((newYear - 1900) % 4) == 0)
-
-        if ((fInLeapYear) and (newMonth == 2)):
-            numDaysInMonth = 29
-        else:
-            numDaysInMonth = g_DaysInMonth[newMonth - 1]
+    yearArray = yearArray - (monthArray <= 2)
+    eraArray = yearArray // 400
+    yearOfEraArray = yearArray - (eraArray * 400)
+    dayOfYearArray = (((153 * ((monthArray + 9) % 12)) + 2) // 5) + dayArray - 1
+    dayOfEraArray = (yearOfEraArray * 365) + (yearOfEraArray // 4) - (yearOfEraArray // 100) + dayOfYearArray
 
-        # Add, since we are adding a negtaive number
-        newDay = numDaysInMonth + newDay   
-    # End - while (newDay < 0):
+    # Day 0 of era 0 is Mar 1 of year 0, which is day number -305.
+    return ((eraArray * 146097) + dayOfEraArray - 305).astype(np.int32)
+# End - DatesToDayNums
 
+
+################################################################################
+#
+# [DayNumsToDates]
+#
+# The array version of DayNumToDate. This is the reverse of DatesToDayNums.
+################################################################################
+def DayNumsToDates(dayNumArray):
+    dayNumArray = np.asarray(dayNumArray, dtype=np.int64) + 305
+    eraArray = dayNumArray // 146097
+    dayOfEraArray = dayNumArray - (eraArray * 146097)
+    yearOfEraArray = (dayOfEraArray - (dayOfEraArray // 1460) + (dayOfEraArray // 36524) - (dayOfEraArray // 146096)) // 365
+    dayOfYearArray = dayOfEraArray - ((365 * yearOfEraArray) + (yearOfEraArray // 4) - (yearOfEraArray // 100))
+    marchMonthArray = ((5 * dayOfYearArray) + 2) // 153
+
+    dayArray = dayOfYearArray - (((153 * marchMonthArray) + 2) // 5) + 1
+    monthArray = ((marchMonthArray + 2) % 12) + 1
+    yearArray = yearOfEraArray + (eraArray * 400) + (monthArray <= 2)
+    return yearArray, monthArray, dayArray
+# End - DayNumsToDates
+
+
+
+################################################################################
+# 
+# [GetDateForNumDaysOffset]
+#
+# Returns the date that is deltaDays before the start date.
+# deltaDays may also be a list or array, and then this returns arrays of
+# years, months and days, one for each offset.
+################################################################################
+def GetDateForNumDaysOffset(startYear, startMonth, startDay, deltaDays):
+    fDebug = False
+    startDayNum = DateToDayNum(startYear, startMonth, startDay)
+
+    if (np.ndim(deltaDays) > 0):
+        return DayNumsToDates(startDayNum - np.asarray(deltaDays, dtype=np.int64))
+
+    newYear, newMonth, newDay = DayNumToDate(startDayNum - deltaDays)
     if (fDebug):
-        print("GetDateForNumDaysOffset. Subtracted days. deltaDays=" + str(deltaDays))
+        print("GetDateForNumDaysOffset. deltaDays=" + str(deltaDays))
+        print("     startYear=" + str(startYear) + ", startMonth=" + str(startMonth) + ", startDay=" + str(startDay))
         print("     newYear=" + str(newYear) + ", newMonth=" + str(newMonth) + ", newDay=" + str(newDay))
 
     return newYear, newMonth, newDay
@@ -190,6 +224,752 @@ def CompareDates(opCode, year1, month1, day1, year2, month2, day2):
 
 
 
+################################################################################
+#
+# Vectorized Indicators
+#
+# Each of these computes one stat for every day in a history of closing prices.
+# They give the same numbers as the per-day methods of CStockTicker, including
+# their quirks. The per-day methods read their window with GetPastPrices, which
+# stops one price short of the window size and never includes the oldest price
+# (index 0), so day i uses the closes from max(1, i - numPrices + 2) to i.
+#
+# The sums and EMAs are accumulated one window position at a time across all
+# days, so the floating point operations happen in the same order as in the
+# per-day methods.
+################################################################################
+
+################################################################################
+#
+# Rolling Extremes
+#
+# This is the kernel for every indicator that needs the min or max of a trailing
+# window, like stochastics, the biggest recent drop, or a price channel.
+# Both modes cost amortized O(1) per value, so a longer window does not cost more.
+#
+# ComputeRollingMinMax is the batch mode, for a whole history. It splits the values
+# into blocks of windowLen, and takes the running max from the start and from the end
+# of each block. Every window covers the tail of one block and the head of the next,
+# so its max is the larger of two of those running values (van Herk/Gil-Werman).
+#
+# CRollingExtremes is the streaming mode, for values that arrive one at a time.
+# It keeps a monotonic deque of (index, value) for the min and for the max. A new
+# value removes every older value that it beats, since those can never be the
+# extreme again, so the front of each deque is always the extreme of the window.
+#
+# Both give the extremes of values[max(0, i - windowLen + 1) : i + 1] for each i
+################################################################################
+
+################################################################################
+#
+# [ComputeRollingMax]
+#
+################################################################################
+def ComputeRollingMax(valueArray, windowLen):
+    valueArray = np.asarray(valueArray, dtype=np.float64)
+    numValues = len(valueArray)
+    if ((numValues <= 0) or (windowLen <= 0)):
+        return np.zeros(numValues)
+    if (windowLen == 1):
+        return valueArray.copy()
+
+    # Pad the front with the oldest value, which is in every short window anyway,
+    # so window i is paddedArray[i : i + windowLen]. Then pad the end to whole blocks.
+    numPadded = numValues + windowLen - 1
+    numBlocks = (numPadded + windowLen - 1) // windowLen
+    paddedArray = np.full(numBlocks * windowLen, -np.inf)
+    paddedArray[:windowLen - 1] = valueArray[0]
+    paddedArray[windowLen - 1:numPadded] = valueArray
+
+    blockArray = paddedArray.reshape(numBlocks, windowLen)
+    maxFromBlockStart = np.maximum.accumulate(blockArray, axis=1).reshape(-1)
+    maxFromBlockEnd = np.maximum.accumulate(blockArray[:, ::-1], axis=1)[:, ::-1].reshape(-1)
+
+    return np.maximum(maxFromBlockEnd[:numValues], maxFromBlockStart[windowLen - 1:numPadded])
+# End - ComputeRollingMax
+
+
+
+################################################################################
+#
+# [ComputeRollingMinMax]
+#
+################################################################################
+def ComputeRollingMinMax(valueArray, windowLen):
+    valueArray = np.asarray(valueArray, dtype=np.float64)
+    minArray = -ComputeRollingMax(-valueArray, windowLen)
+    maxArray = ComputeRollingMax(valueArray, windowLen)
+    return minArray, maxArray
+# End - ComputeRollingMinMax
+
+
+
+
+
+################################################################################
+#
+# class CRollingExtremes
+#
+# The streaming mode of the rolling extremes kernel.
+################################################################################
+class CRollingExtremes(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, windowLen):
+        self.m_WindowLen = windowLen
+        self.m_NumValues = 0
+        # Each is a deque of [index, value]. The min deque is increasing, and the max deque is decreasing.
+        self.m_MinDeque = deque()
+        self.m_MaxDeque = deque()
+    # End -  __init__
+
+
+    #####################################################
+    # [CRollingExtremes::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CRollingExtremes::GetMin]
+    #####################################################
+    def GetMin(self):
+        return self.m_MinDeque[0][1]
+
+    #####################################################
+    # [CRollingExtremes::GetMax]
+    #####################################################
+    def GetMax(self):
+        return self.m_MaxDeque[0][1]
+
+
+    #####################################################
+    #
+    # [CRollingExtremes::Append]
+    #
+    # Add the newest value, and return the min and max of the window that ends with it.
+    #####################################################
+    def Append(self, value):
+        index = self.m_NumValues
+        minDeque = self.m_MinDeque
+        maxDeque = self.m_MaxDeque
+
+        while ((len(minDeque) > 0) and (minDeque[-1][1] >= value)):
+            minDeque.pop()
+        minDeque.append([index, value])
+        while ((len(maxDeque) > 0) and (maxDeque[-1][1] <= value)):
+            maxDeque.pop()
+        maxDeque.append([index, value])
+
+        oldestIndexInWindow = (index - self.m_WindowLen) + 1
+        if (minDeque[0][0] < oldestIndexInWindow):
+            minDeque.popleft()
+        if (maxDeque[0][0] < oldestIndexInWindow):
+            maxDeque.popleft()
+
+        self.m_NumValues = index + 1
+        return minDeque[0][1], maxDeque[0][1]
+    # End - Append
+
+
+    #####################################################
+    #
+    # [CRollingExtremes::AppendArray]
+    #
+    # Add several values, and return the min and max arrays for each of them.
+    #####################################################
+    def AppendArray(self, valueArray):
+        numValues = len(valueArray)
+        minArray = np.zeros(numValues)
+        maxArray = np.zeros(numValues)
+        for index in range(numValues):
+            minArray[index], maxArray[index] = self.Append(float(valueArray[index]))
+
+        return minArray, maxArray
+    # End - AppendArray
+
+
+    #####################################################
+    # [CRollingExtremes::GetCheckpoint]
+    #####################################################
+    def GetCheckpoint(self):
+        return {'windowLen': self.m_WindowLen, 'numValues': self.m_NumValues,
+                'min': list(self.m_MinDeque), 'max': list(self.m_MaxDeque) }
+
+    #####################################################
+    # [CRollingExtremes::RestoreCheckpoint]
+    #####################################################
+    def RestoreCheckpoint(self, checkpointDict):
+        self.m_WindowLen = checkpointDict['windowLen']
+        self.m_NumValues = checkpointDict['numValues']
+        self.m_MinDeque = deque([list(entry) for entry in checkpointDict['min']])
+        self.m_MaxDeque = deque([list(entry) for entry in checkpointDict['max']])
+
+# End - CRollingExtremes
+
+
+
+################################################################################
+#
+# [ComputeRSISeries]
+#
+# This matches CStockTicker::ComputeRSI for each day.
+################################################################################
+def ComputeRSISeries(closeArray, numPrices):
+    numDays = len(closeArray)
+    rsiArray = np.zeros(numDays)
+    # The number of price changes in a full window
+    numChangesInWindow = numPrices - 2
+    if ((numDays < 3) or (numChangesInWindow <= 0)):
+        return rsiArray
+
+    percentChangeArray = np.zeros(numDays)
+    percentChangeArray[1:] = ((closeArray[1:] - closeArray[:-1]) / closeArray[:-1]) * 100.0
+    gainArray = np.where(percentChangeArray > 0, percentChangeArray, 0.0)
+    lossArray = np.where(percentChangeArray > 0, 0.0, -percentChangeArray)
+    # Close 0 is never in a window, so changes 0 and 1 are never used.
+    gainArray[:2] = 0.0
+    lossArray[:2] = 0.0
+
+    # Days before the first full window use all changes from 2 up to that day.
+    sumGainArray = np.zeros(numDays)
+    sumLossArray = np.zeros(numDays)
+    firstFullDay = numPrices - 1
+    lastPartialDay = min(firstFullDay, numDays)
+    sumGainArray[2:lastPartialDay] = np.cumsum(gainArray[2:lastPartialDay])
+    sumLossArray[2:lastPartialDay] = np.cumsum(lossArray[2:lastPartialDay])
+
+    # Day i in a full window uses changes (i - numChangesInWindow + 1) to i
+    if (numDays > firstFullDay):
+        gainWindows = sliding_window_view(gainArray, numChangesInWindow)[2:]
+        lossWindows = sliding_window_view(lossArray, numChangesInWindow)[2:]
+        fullGainArray = np.zeros(len(gainWindows))
+        fullLossArray = np.zeros(len(lossWindows))
+        for position in range(numChangesInWindow):
+            fullGainArray = fullGainArray + gainWindows[:, position]
+            fullLossArray = fullLossArray + lossWindows[:, position]
+        sumGainArray[firstFullDay:] = fullGainArray
+        sumLossArray[firstFullDay:] = fullLossArray
+    # End - if (numDays > firstFullDay):
+
+    numChangesArray = np.minimum(np.arange(numDays), firstFullDay) - 1
+    fHasChanges = (numChangesArray > 0)
+    avgGainArray = np.divide(sumGainArray, numChangesArray, out=np.zeros(numDays), where=fHasChanges)
+    avgLossArray = np.divide(sumLossArray, numChangesArray, out=np.zeros(numDays), where=fHasChanges)
+
+    relativeStrengthArray = np.divide(avgGainArray, avgLossArray, out=np.zeros(numDays), where=(avgLossArray != 0))
+    rsiArray = 100.0 - (100.0 / (1.0 + relativeStrengthArray))
+
+    return rsiArray
+# End - ComputeRSISeries
+
+
+
+################################################################################
+#
+# [ComputeEMASeries]
+#
+# This matches CStockTicker::GetExponentialMovingAverage for each day.
+# The EMA restarts at the oldest price of each window, and the Nth price
+# in the window has alpha = 2 / (N + 1)
+################################################################################
+def ComputeEMASeries(closeArray, numPrices):
+    numDays = len(closeArray)
+    emaArray = np.zeros(numDays)
+    windowLen = numPrices - 1
+    if ((numDays < 2) or (windowLen <= 0)):
+        return emaArray
+
+    # Days before the first full window all start at close 1, so one running EMA
+    # gives the value for each of them.
+    firstFullDay = numPrices - 1
+    currentEMA = float(closeArray[1])
+    for index in range(1, min(firstFullDay, numDays)):
+        if (index > 1):
+            currentAlpha = 2.0 / (float(index - 1) + 1.0)
+            currentEMA = (currentAlpha * float(closeArray[index])) + ((1 - currentAlpha) * currentEMA)
+        emaArray[index] = currentEMA
+    # End - for index in range(1, min(firstFullDay, numDays)):
+
+    # Day i in a full window uses closes (i - windowLen + 1) to i
+    if (numDays > firstFullDay):
+        priceWindows = sliding_window_view(closeArray, windowLen)[1:]
+        fullEMAArray = priceWindows[:, 0].copy()
+        for position in range(1, windowLen):
+            currentAlpha = 2.0 / (float(position) + 1.0)
+            fullEMAArray = (currentAlpha * priceWindows[:, position]) + ((1 - currentAlpha) * fullEMAArray)
+        emaArray[firstFullDay:] = fullEMAArray
+    # End - if (numDays > firstFullDay):
+
+    return emaArray
+# End - ComputeEMASeries
+
+
+
+################################################################################
+#
+# [ComputeStochasticSeries]
+#
+# This matches CStockTicker::GetStochastic for each day.
+################################################################################
+def ComputeStochasticSeries(closeArray):
+    numDays = len(closeArray)
+    if (numDays <= 0):
+        return np.zeros(0), np.zeros(0)
+
+    lowestIn14DaysArray, highestIn14DaysArray = ComputeRollingMinMax(closeArray, 14)
+    lowestIn3DaysArray, highestIn3DaysArray = ComputeRollingMinMax(closeArray, 3)
+
+    denomArray = highestIn14DaysArray - lowestIn14DaysArray
+    kArray = np.zeros(numDays)
+    np.divide(closeArray - lowestIn14DaysArray, denomArray, out=kArray, where=(denomArray > 0))
+    kArray = 100.0 * kArray
+
+    dArray = np.zeros(numDays)
+    np.divide(highestIn3DaysArray, lowestIn3DaysArray, out=dArray, where=(lowestIn3DaysArray > 0))
+    dArray = 100.0 * dArray
+
+    return kArray, dArray
+# End - ComputeStochasticSeries
+
+
+
+################################################################################
+#
+# [ComputeBiggestRecentDropSeries]
+#
+# This matches CStockTicker::ComputeBiggestRecentDrop for each day.
+################################################################################
+def ComputeBiggestRecentDropSeries(closeArray, numPrices):
+    numDays = len(closeArray)
+    dropArray = np.zeros(numDays)
+    windowLen = numPrices - 1
+    if ((numDays < 2) or (windowLen <= 0)):
+        return dropArray
+
+    # Day i uses closes max(1, i - windowLen + 1) to i
+    highestPastPriceArray = ComputeRollingMax(closeArray[1:], windowLen)
+    latestPriceArray = closeArray[1:]
+    dropArray[1:] = np.where(highestPastPriceArray > latestPriceArray, highestPastPriceArray - latestPriceArray, 0.0)
+
+    return dropArray
+# End - ComputeBiggestRecentDropSeries
+
+
+
+
+
+################################################################################
+#
+# class CIncrementalStats
+#
+# This is the running state that lets CStockTicker::AppendDailyPrice compute the
+# stats for one new day in constant time, rather than recomputing the whole history.
+#
+# - RSI keeps the last few gains and losses and their running sums.
+# - The EMA in this file restarts at the oldest price of each window, with
+#   alpha = 2 / (N + 1) for the Nth price. Those weights telescope to a linearly
+#   weighted average of the newest (numPrices - 2) closes, with weights 1, 2, 3,...
+#   So each EMA keeps the plain sum and the weighted sum of its window.
+# - Stochastics and the biggest drop are streaming rolling extremes.
+#
+# The running sums are updated by adding and subtracting, so they can differ from
+# ComputeAllStats in the last few bits. They are re-added from their windows every
+# INCREMENTAL_RESUM_DAYS days, so rounding errors do not build up. All of the state is plain numbers and lists,
+# so GetCheckpoint can be saved as JSON, and RestoreCheckpoint resumes from it.
+################################################################################
+# The new day must be at least this far into the history, so every window is full.
+INCREMENTAL_STATS_MIN_HISTORY = 25
+INCREMENTAL_RSI_WINDOW = DEFAULT_RSI_NUM_DATA - 2
+INCREMENTAL_EMA12_WINDOW = 12 - 2
+INCREMENTAL_EMA26_WINDOW = 26 - 2
+INCREMENTAL_DROP_WINDOW = 7 - 1
+INCREMENTAL_RESUM_DAYS = 64
+
+class CIncrementalStats(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self):
+        self.m_NumDays = 0
+        self.m_PrevClose = 0.0
+
+        # RSI
+        self.m_GainList = deque()
+        self.m_LossList = deque()
+        self.m_SumGain = 0.0
+        self.m_SumLoss = 0.0
+        self.m_NumNonZeroGains = 0
+        self.m_NumNonZeroLosses = 0
+
+        # EMA. Each is [closeList, sum, weightedSum]
+        self.m_EMA12State = [deque(), 0.0, 0.0]
+        self.m_EMA26State = [deque(), 0.0, 0.0]
+
+        # Stochastics and biggest drop
+        self.m_Extremes14Days = CRollingExtremes(14)
+        self.m_Extremes3Days = CRollingExtremes(3)
+        self.m_DropExtremes = CRollingExtremes(INCREMENTAL_DROP_WINDOW)
+    # End -  __init__
+
+
+    #####################################################
+    # [CIncrementalStats::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        return
+    # End of destructor
+
+
+    #####################################################
+    # [CIncrementalStats::GetNumDays]
+    #####################################################
+    def GetNumDays(self):
+        return self.m_NumDays
+
+
+    #####################################################
+    #
+    # [CIncrementalStats::BuildFromHistory]
+    #
+    # Load the state from the tail of the history, so the next
+    # AppendClose is day len(closeArray). This only reads the last
+    # few closes.
+    #####################################################
+    def BuildFromHistory(self, closeArray):
+        numDays = len(closeArray)
+        if (numDays < INCREMENTAL_STATS_MIN_HISTORY):
+            return False
+
+        self.__init__()
+
+        # Push the changes and closes that are still in the window of the next day.
+        # Each Push* drops whatever falls out of the window.
+        firstIndex = numDays - INCREMENTAL_EMA26_WINDOW
+        for index in range(firstIndex, numDays):
+            close = float(closeArray[index])
+            prevClose = float(closeArray[index - 1])
+            if (index > (numDays - INCREMENTAL_RSI_WINDOW)):
+                self.PushPriceChange(((close - prevClose) / prevClose) * 100.0)
+            self.PushEMAClose(self.m_EMA12State, INCREMENTAL_EMA12_WINDOW, close)
+            self.PushEMAClose(self.m_EMA26State, INCREMENTAL_EMA26_WINDOW, close)
+            self.PushExtremesClose(close)
+        # End - for index in range(firstIndex, numDays):
+
+        self.m_PrevClose = float(closeArray[numDays - 1])
+        self.m_NumDays = numDays
+        return True
+    # End - BuildFromHistory
+
+
+    #####################################################
+    #
+    # [CIncrementalStats::AppendClose]
+    #
+    # Add one day and return its stats.
+    #####################################################
+    def AppendClose(self, close):
+        close = float(close)
+        index = self.m_NumDays
+
+        if ((index % INCREMENTAL_RESUM_DAYS) == 0):
+            self.ResumWindows()
+
+        ##################################
+        # RSI
+        self.PushPriceChange(((close - self.m_PrevClose) / self.m_PrevClose) * 100.0)
+        sumGain = self.m_SumGain if (self.m_NumNonZeroGains > 0) else 0.0
+        sumLoss = self.m_SumLoss if (self.m_NumNonZeroLosses > 0) else 0.0
+        avgPercentGain = sumGain / INCREMENTAL_RSI_WINDOW
+        avgPercentLoss = sumLoss / INCREMENTAL_RSI_WINDOW
+        if (avgPercentLoss == 0):
+            relativeStrength = 0.0
+        else:
+            relativeStrength = avgPercentGain / avgPercentLoss
+        rsi = 100.0 - (100.0 / (1.0 + relativeStrength))
+
+        ##################################
+        # EMA and MACD
+        ema12 = self.PushEMAClose(self.m_EMA12State, INCREMENTAL_EMA12_WINDOW, close)
+        ema26 = self.PushEMAClose(self.m_EMA26State, INCREMENTAL_EMA26_WINDOW, close)
+        macd = ema12 - ema26
+
+        ##################################
+        # Stochastics and biggest drop
+        self.PushExtremesClose(close)
+        lowestPriceIn14Days = self.m_Extremes14Days.GetMin()
+        highestPriceIn14Days = self.m_Extremes14Days.GetMax()
+        lowestPriceIn3Days = self.m_Extremes3Days.GetMin()
+        highestPriceIn3Days = self.m_Extremes3Days.GetMax()
+        highestPastPrice = self.m_DropExtremes.GetMax()
+
+        denom = highestPriceIn14Days - lowestPriceIn14Days
+        if (denom <= 0):
+            kVal = 0.0
+        else:
+            kVal = 100.0 * ((close - lowestPriceIn14Days) / denom)
+        if (lowestPriceIn3Days <= 0):
+            dVal = 0.0
+        else:
+            dVal = 100.0 * (highestPriceIn3Days / lowestPriceIn3Days)
+
+        if (highestPastPrice > close):
+            biggestPriceDrop = highestPastPrice - close
+        else:
+            biggestPriceDrop = 0.0
+
+        self.m_PrevClose = close
+        self.m_NumDays = index + 1
+
+        return rsi, ema12, ema26, macd, kVal, dVal, biggestPriceDrop
+    # End - AppendClose
+
+
+    #####################################################
+    #
+    # [CIncrementalStats::ResumWindows]
+    #
+    # Recompute the running sums from the values in their windows.
+    #####################################################
+    def ResumWindows(self):
+        self.m_SumGain = sum(self.m_GainList)
+        self.m_SumLoss = sum(self.m_LossList)
+        for emaState in (self.m_EMA12State, self.m_EMA26State):
+            emaState[1] = sum(emaState[0])
+            emaState[2] = sum((weight + 1) * close for weight, close in enumerate(emaState[0]))
+    # End - ResumWindows
+
+
+    #####################################################
+    # [CIncrementalStats::PushPriceChange]
+    #####################################################
+    def PushPriceChange(self, percentChange):
+        if (percentChange > 0):
+            gain = percentChange
+            loss = 0.0
+        else:
+            gain = 0.0
+            loss = -percentChange
+
+        self.m_GainList.append(gain)
+        self.m_LossList.append(loss)
+        self.m_SumGain += gain
+        self.m_SumLoss += loss
+        self.m_NumNonZeroGains += (gain != 0)
+        self.m_NumNonZeroLosses += (loss != 0)
+
+        if (len(self.m_GainList) > INCREMENTAL_RSI_WINDOW):
+            oldGain = self.m_GainList.popleft()
+            oldLoss = self.m_LossList.popleft()
+            self.m_SumGain -= oldGain
+            self.m_SumLoss -= oldLoss
+            self.m_NumNonZeroGains -= (oldGain != 0)
+            self.m_NumNonZeroLosses -= (oldLoss != 0)
+    # End - PushPriceChange
+
+
+    #####################################################
+    #
+    # [CIncrementalStats::PushEMAClose]
+    #
+    # The window holds the newest windowLen closes, and the oldest has weight 1.
+    # Sliding the window lowers every weight by 1, which subtracts the plain sum.
+    #####################################################
+    def PushEMAClose(self, emaState, windowLen, close):
+        closeList = emaState[0]
+        if (len(closeList) >= windowLen):
+            emaState[2] = emaState[2] - emaState[1]
+            emaState[1] = emaState[1] - closeList.popleft()
+        closeList.append(close)
+        emaState[1] = emaState[1] + close
+        emaState[2] = emaState[2] + (len(closeList) * close)
+
+        numCloses = len(closeList)
+        return (2.0 * emaState[2]) / float(numCloses * (numCloses + 1))
+    # End - PushEMAClose
+
+
+    #####################################################
+    # [CIncrementalStats::PushExtremesClose]
+    #####################################################
+    def PushExtremesClose(self, close):
+        self.m_Extremes14Days.Append(close)
+        self.m_Extremes3Days.Append(close)
+        self.m_DropExtremes.Append(close)
+    # End - PushExtremesClose
+
+
+    #####################################################
+    # [CIncrementalStats::GetCheckpoint]
+    #####################################################
+    def GetCheckpoint(self):
+        checkpointDict = {'numDays': self.m_NumDays, 'prevClose': self.m_PrevClose,
+                        'gains': list(self.m_GainList), 'losses': list(self.m_LossList),
+                        'sumGain': self.m_SumGain, 'sumLoss': self.m_SumLoss,
+                        'ema12': [list(self.m_EMA12State[0]), self.m_EMA12State[1], self.m_EMA12State[2]],
+                        'ema26': [list(self.m_EMA26State[0]), self.m_EMA26State[1], self.m_EMA26State[2]],
+                        'extremes14': self.m_Extremes14Days.GetCheckpoint(),
+                        'extremes3': self.m_Extremes3Days.GetCheckpoint(),
+                        'dropExtremes': self.m_DropExtremes.GetCheckpoint() }
+        return checkpointDict
+    # End - GetCheckpoint
+
+
+    #####################################################
+    # [CIncrementalStats::RestoreCheckpoint]
+    #####################################################
+    def RestoreCheckpoint(self, checkpointDict):
+        self.m_NumDays = checkpointDict['numDays']
+        self.m_PrevClose = checkpointDict['prevClose']
+        self.m_GainList = deque(checkpointDict['gains'])
+        self.m_LossList = deque(checkpointDict['losses'])
+        self.m_SumGain = checkpointDict['sumGain']
+        self.m_SumLoss = checkpointDict['sumLoss']
+        self.m_NumNonZeroGains = sum(1 for gain in self.m_GainList if (gain != 0))
+        self.m_NumNonZeroLosses = sum(1 for loss in self.m_LossList if (loss != 0))
+        self.m_EMA12State = [deque(checkpointDict['ema12'][0]), checkpointDict['ema12'][1], checkpointDict['ema12'][2]]
+        self.m_EMA26State = [deque(checkpointDict['ema26'][0]), checkpointDict['ema26'][1], checkpointDict['ema26'][2]]
+        self.m_Extremes14Days.RestoreCheckpoint(checkpointDict['extremes14'])
+        self.m_Extremes3Days.RestoreCheckpoint(checkpointDict['extremes3'])
+        self.m_DropExtremes.RestoreCheckpoint(checkpointDict['dropExtremes'])
+    # End - RestoreCheckpoint
+
+# End - CIncrementalStats
+
+
+
+
+
+################################################################################
+#
+# Rank Correlation
+#
+# A Spearman correlation is the Pearson correlation of the ranks of two lists.
+# Correlating a stat with the price N days later pairs stat[0 : numDays - N]
+# with close[N : numDays], so each horizon ranks a slightly different list.
+# Rather than ranking from scratch for each horizon, ComputeStatHorizonCorrelations
+# ranks each full list once, and then removes one value at a time from the end of
+# the stats and the start of the closes. Removing value v lowers the rank of every
+# larger value by 1, and of every equal value by 1/2, which keeps the average
+# ranks of ties exact. Each horizon then costs a few array passes over all stats.
+################################################################################
+
+################################################################################
+#
+# [ComputeRanks]
+#
+# Ranks start at 1, and ties get the average of their ranks, like scipy.stats.rankdata
+################################################################################
+def ComputeRanks(valueArray):
+    valueArray = np.asarray(valueArray, dtype=np.float64)
+    numValues = len(valueArray)
+    if (numValues <= 0):
+        return np.zeros(0)
+
+    sortOrder = np.argsort(valueArray, kind='mergesort')
+    sortedArray = valueArray[sortOrder]
+    fStartsTieGroup = np.concatenate(([True], sortedArray[1:] != sortedArray[:-1]))
+    groupStartArray = np.flatnonzero(fStartsTieGroup)
+    groupStopArray = np.append(groupStartArray[1:], numValues)
+    groupRankArray = (groupStartArray + groupStopArray + 1) / 2.0
+
+    rankArray = np.empty(numValues)
+    rankArray[sortOrder] = groupRankArray[np.cumsum(fStartsTieGroup) - 1]
+    return rankArray
+# End - ComputeRanks
+
+
+
+################################################################################
+#
+# [ComputeRankPearson]
+#
+# The Pearson correlation of each row of rankMatrix with rankArray.
+# Every list of average ranks 1..N has the mean (N + 1) / 2
+################################################################################
+def ComputeRankPearson(rankMatrix, rankArray):
+    meanRank = (len(rankArray) + 1) / 2.0
+    centeredMatrix = rankMatrix - meanRank
+    centeredArray = rankArray - meanRank
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        numerArray = centeredMatrix @ centeredArray
+        denomArray = np.sqrt((centeredMatrix * centeredMatrix).sum(axis=1) * (centeredArray @ centeredArray))
+        correlationArray = numerArray / denomArray
+
+    return correlationArray
+# End - ComputeRankPearson
+
+
+
+################################################################################
+#
+# [ComputeSpearmanCorrelation]
+#
+# Returns NaN if either list is constant or too short, like scipy.stats.spearmanr
+################################################################################
+def ComputeSpearmanCorrelation(xList, yList):
+    if ((len(xList) < 2) or (len(xList) != len(yList))):
+        return float('nan')
+
+    xRankMatrix = ComputeRanks(xList).reshape(1, -1)
+    return float(ComputeRankPearson(xRankMatrix, ComputeRanks(yList))[0])
+# End - ComputeSpearmanCorrelation
+
+
+
+################################################################################
+#
+# [ComputeStatHorizonCorrelations]
+#
+# statMatrix has one row per stat, and one column per day.
+# Returns a matrix with one row per stat and one column per entry in horizonList.
+# The entry for stat S and horizon N is the Spearman correlation of
+# stat S on each day with the closing price N days later.
+################################################################################
+def ComputeStatHorizonCorrelations(statMatrix, closeArray, horizonList):
+    statMatrix = np.atleast_2d(np.asarray(statMatrix, dtype=np.float64))
+    closeArray = np.asarray(closeArray, dtype=np.float64)
+    numStats, numDays = statMatrix.shape
+    correlationMatrix = np.full((numStats, len(horizonList)), np.nan)
+    if ((numDays < 3) or (len(horizonList) <= 0)):
+        return correlationMatrix
+
+    statRankMatrix = np.vstack([ComputeRanks(statArray) for statArray in statMatrix])
+    closeRankArray = ComputeRanks(closeArray)
+    horizonColumns = {}
+    for column, numDaysInFuture in enumerate(horizonList):
+        horizonColumns.setdefault(numDaysInFuture, []).append(column)
+
+    maxHorizon = min(max(horizonList), numDays - 2)
+    for numDaysInFuture in range(1, maxHorizon + 1):
+        # Remove the newest stat and the oldest close from their lists.
+        removedStatArray = statMatrix[:, numDays - numDaysInFuture].reshape(-1, 1)
+        statRankMatrix -= ((removedStatArray < statMatrix) + (0.5 * (removedStatArray == statMatrix)))
+        removedClose = closeArray[numDaysInFuture - 1]
+        closeRankArray -= ((removedClose < closeArray) + (0.5 * (removedClose == closeArray)))
+
+        if (numDaysInFuture not in horizonColumns):
+            continue
+
+        numPairs = numDays - numDaysInFuture
+        correlationArray = ComputeRankPearson(statRankMatrix[:, :numPairs], closeRankArray[numDaysInFuture:])
+        for column in horizonColumns[numDaysInFuture]:
+            correlationMatrix[:, column] = correlationArray
+    # End - for numDaysInFuture in range(1, maxHorizon + 1):
+
+    return correlationMatrix
+# End - ComputeStatHorizonCorrelations
+
+
+
+
+
 
 ################################################################################
 #
@@ -246,9 +1026,30 @@ class CStockTicker(object):
         self.kStochasticCovariances = {}
         self.dStochasticScores = {}
 
-        # Past Values
+        # The full correlation of each stat with the price N days later.
+        # There is one row for each name, and one column for each horizon.
+        self.StatCorrelationNames = []
+        self.StatCorrelationHorizons = []
+        self.StatCorrelationMatrix = None
+
+        # Past Values. These are stored in columns, one typed array per field.
         self.OptionDates = 0
-        self.PastPriceList = []
+        self.PastPrices = StockPriceStore.CStockPriceStore()
+
+        # Running state for AppendDailyPrice. This is None until it is needed.
+        self.m_IncrementalStats = None
+
+        # The trading calendar. This is built from the past prices when it is needed,
+        # unless a calendar shared by several tickers is set.
+        self.m_TradingCalendar = None
+        self.m_fSharedTradingCalendar = False
+
+        # The option chain, a stockOptions.CStockOptionChain. This is None unless options were loaded.
+        self.m_OptionChain = None
+
+        # The stockExtremes.CExtremePriceIndex of the past prices. This is built when it
+        # is needed, and built again if rows were added since.
+        self.m_ExtremePriceIndex = None
     # End -  __init__
 
 
@@ -281,6 +1082,12 @@ class CStockTicker(object):
     def GetCompanyName(self):
         return self.CompanyName
 
+    #####################################################
+    # [CStockTicker::GetOptionChain]
+    #####################################################
+    def GetOptionChain(self):
+        return self.m_OptionChain
+
     #####################################################
     # [CStockTicker::GetCurrentPrice]
     #####################################################
@@ -344,6 +1151,12 @@ class CStockTicker(object):
     def GetDStochastic(self):
         return round(self.dStochastic, 2)
 
+    #####################################################
+    # [CStockTicker::GetStatCorrelationMatrix]
+    #####################################################
+    def GetStatCorrelationMatrix(self):
+        return self.StatCorrelationNames, self.StatCorrelationHorizons, self.StatCorrelationMatrix
+
     #####################################################
     # [CStockTicker::GetMACD]
     #####################################################
@@ -359,12 +1172,11 @@ class CStockTicker(object):
         percentChange = 0
         absChange = 0
 
-        newestPriceIndex = len(self.PastPriceList) - 1
+        closeColumn = self.PastPrices.GetColumn('Cl')
+        newestPriceIndex = len(closeColumn) - 1
         secondNewestPriceIndex = newestPriceIndex - 1
-        newestPriceInfo = self.PastPriceList[newestPriceIndex]
-        newestClosePrice = newestPriceInfo['Cl']
-        secondNewestPriceInfo = self.PastPriceList[secondNewestPriceIndex]
-        secondNewestClosePrice = secondNewestPriceInfo['Cl']
+        newestClosePrice = float(closeColumn[newestPriceIndex])
+        secondNewestClosePrice = float(closeColumn[secondNewestPriceIndex])
 
         absChange = round((newestClosePrice - secondNewestClosePrice), 2)
         percentChange = round(((absChange / secondNewestClosePrice) * 100.0), 2)
@@ -372,8 +1184,8 @@ class CStockTicker(object):
         if (fDebug):
             print("GetPrevDayChange")
             print("   self.CurrentPrice = " + str(self.CurrentPrice))
-            print("   newestPriceInfo = " + str(newestPriceInfo))
-            print("   secondNewestPriceInfo = " + str(secondNewestPriceInfo))
+            print("   newestPriceInfo = " + str(self.PastPrices.GetRowDict(newestPriceIndex)))
+            print("   secondNewestPriceInfo = " + str(self.PastPrices.GetRowDict(secondNewestPriceIndex)))
             print("   newestClosePrice = " + str(newestClosePrice))
             print("   secondNewestClosePrice = " + str(secondNewestClosePrice))
             print("   absChange = " + str(absChange))
@@ -390,10 +1202,11 @@ class CStockTicker(object):
     #####################################################
     def GetLatestDate(self):
         fDebug = False
-        newestPriceIndex = len(self.PastPriceList) - 1
-        newestPriceInfo = self.PastPriceList[newestPriceIndex]
+        newestPriceIndex = self.PastPrices.GetNumRows() - 1
 
-        return newestPriceInfo['y'], newestPriceInfo['m'], newestPriceInfo['d']
+        return (int(self.PastPrices.GetColumn('y')[newestPriceIndex]),
+                int(self.PastPrices.GetColumn('m')[newestPriceIndex]),
+                int(self.PastPrices.GetColumn('d')[newestPriceIndex]))
     # End - GetLatestDate
 
 
@@ -412,6 +1225,12 @@ class CStockTicker(object):
     def SetOptionDates(self, value):
         self.OptionDates = value
 
+    #####################################################
+    # [CStockTicker::SetOptionChain
+    #####################################################
+    def SetOptionChain(self, optionChain):
+        self.m_OptionChain = optionChain
+
     #####################################################
     # [CStockTicker::SetCompanyName
     #####################################################
@@ -518,15 +1337,133 @@ class CStockTicker(object):
     # [CStockTicker::SetPastValues
     #####################################################
     def SetPastValues(self, year, month, day, openPrice, closePrice, volume, highPrice, lowPrice, rsi, ema12, ema26, macd, kStochastic, dStochastic, biggestPriceDrop):
-        newQueueEntry = {'y': year, 'm': month, 'd': day,
-                        'Cl': closePrice, 'Op': openPrice, 'Hi': highPrice, 'Lo': lowPrice, 'Vo': volume,
-                        'RSI': rsi, 'EMA12': ema12, 'EMA26': ema26, 'MACD': macd, 'KStochastic': kStochastic,
-                        'BiggestRecentDropPercent': biggestPriceDrop }
-        self.PastPriceList.append(newQueueEntry)
+        # This is the same order as StockPriceStore.g_PriceColumnList
+        self.PastPrices.AppendRow((year, month, day,
+                                closePrice, openPrice, highPrice, lowPrice, volume,
+                                rsi, ema12, ema26, macd, kStochastic, dStochastic,
+                                biggestPriceDrop, DateToDayNum(year, month, day)))
+
+        # The stats were not computed from the running state, so it is stale now.
+        self.m_IncrementalStats = None
+        if (not self.m_fSharedTradingCalendar):
+            self.m_TradingCalendar = None
     # End - SetPastValues
 
 
 
+    #####################################################
+    #
+    # [CStockTicker::GetTradingCalendar]
+    #
+    # Unless a shared calendar was set, the sessions are the days of the
+    # past prices, so session N is past price N.
+    #####################################################
+    def GetTradingCalendar(self):
+        if (self.m_TradingCalendar is None):
+            self.m_TradingCalendar = StockCalendar.CTradingCalendar(self.PastPrices.GetColumn('DayNum'))
+        return self.m_TradingCalendar
+    # End - GetTradingCalendar
+
+
+    #####################################################
+    #
+    # [CStockTicker::SetTradingCalendar]
+    #
+    # Use one calendar for a group of tickers, from MakeTradingCalendarForTickers.
+    # Pass None to go back to a calendar built from this ticker.
+    #####################################################
+    def SetTradingCalendar(self, tradingCalendar):
+        self.m_TradingCalendar = tradingCalendar
+        self.m_fSharedTradingCalendar = (tradingCalendar is not None)
+    # End - SetTradingCalendar
+
+
+
+
+    #####################################################
+    #
+    # [CStockTicker::AppendDailyPrice]
+    #
+    # Add one new day to the end of the history, and compute its stats
+    # and the current stats from the running state in constant time.
+    # The covariances are not updated, since they depend on the whole history.
+    #####################################################
+    def AppendDailyPrice(self, year, month, day, openPrice, closePrice, volume, highPrice, lowPrice):
+        fDebug = False
+
+        numPastPrices = self.PastPrices.GetNumRows()
+        if ((self.m_IncrementalStats is None) or (self.m_IncrementalStats.GetNumDays() != numPastPrices)):
+            self.m_IncrementalStats = CIncrementalStats()
+            fHaveState = self.m_IncrementalStats.BuildFromHistory(self.PastPrices.GetColumn('Cl'))
+        else:
+            fHaveState = True
+        if (fDebug):
+            print("AppendDailyPrice. numPastPrices=" + str(numPastPrices) + ", fHaveState=" + str(fHaveState))
+
+        # A short history does not have full windows yet, and is cheap to recompute.
+        if (not fHaveState):
+            self.SetPastValues(year, month, day, openPrice, closePrice, volume, highPrice, lowPrice, 0, 0, 0, 0, 0, 0, 0)
+            self.ComputeAllStatSeries()
+            return
+
+        incrementalStats = self.m_IncrementalStats
+        rsi, ema12, ema26, macd, kVal, dVal, biggestPriceDrop = incrementalStats.AppendClose(closePrice)
+        self.SetPastValues(year, month, day, openPrice, closePrice, volume, highPrice, lowPrice, 
+                            rsi, ema12, ema26, macd, kVal, dVal, biggestPriceDrop)
+        self.m_IncrementalStats = incrementalStats
+
+        self.m_RSI = rsi
+        self.EMA12 = ema12
+        self.EMA26 = ema26
+        self.MACD = macd
+        self.kStochastic = kVal
+        self.dStochastic = dVal
+        self.BiggestRecentDropPercent = biggestPriceDrop
+    # End - AppendDailyPrice
+
+
+
+    #####################################################
+    #
+    # [CStockTicker::GetIncrementalStatsCheckpoint]
+    #
+    # Save the running state of AppendDailyPrice, so a new process can
+    # load the history and keep appending without recomputing it.
+    #####################################################
+    def GetIncrementalStatsCheckpoint(self):
+        numPastPrices = self.PastPrices.GetNumRows()
+        if ((self.m_IncrementalStats is None) or (self.m_IncrementalStats.GetNumDays() != numPastPrices)):
+            self.m_IncrementalStats = CIncrementalStats()
+            if (not self.m_IncrementalStats.BuildFromHistory(self.PastPrices.GetColumn('Cl'))):
+                self.m_IncrementalStats = None
+                return None
+
+        checkpointDict = self.m_IncrementalStats.GetCheckpoint()
+        checkpointDict['latestDate'] = list(self.GetLatestDate())
+        return checkpointDict
+    # End - GetIncrementalStatsCheckpoint
+
+
+
+    #####################################################
+    #
+    # [CStockTicker::RestoreIncrementalStatsCheckpoint]
+    #
+    # This only accepts a checkpoint that was saved at the current end of the history.
+    #####################################################
+    def RestoreIncrementalStatsCheckpoint(self, checkpointDict):
+        if ((checkpointDict is None) 
+                or (checkpointDict['numDays'] != self.PastPrices.GetNumRows())
+                or (tuple(checkpointDict['latestDate']) != self.GetLatestDate())):
+            return False
+
+        self.m_IncrementalStats = CIncrementalStats()
+        self.m_IncrementalStats.RestoreCheckpoint(checkpointDict)
+        return True
+    # End - RestoreIncrementalStatsCheckpoint
+
+
+
 
 
     ##########################################################################################################
@@ -542,8 +1479,109 @@ class CStockTicker(object):
         fDebug = False
 
         if (fDebug):
-            print("ComputeAllStats")
+            print("ComputeAllStats. USE_VECTORIZED_STATS=" + str(USE_VECTORIZED_STATS))
+
+        if (USE_VECTORIZED_STATS):
+            self.ComputeAllStatSeries()
+        else:
+            self.ComputeAllStatsPerDay()
+
+        # Now, compute the covariance for each stat, which correlates the list of stats with 
+        # a synchronized list of future prices
+        self.ComputeAllStatCorrelations(DEFAULT_CORRELATION_HORIZONS)
+    # End - ComputeAllStats(self)
+
+
+
+
+    #####################################################
+    #
+    # [CStockTicker::ComputeAllStatCorrelations]
+    #
+    # Correlate every stat in CORRELATION_STAT_NAMES with the closing price
+    # at every horizon in one call, and fill in the covariance dicts.
+    #####################################################
+    def ComputeAllStatCorrelations(self, horizonList):
+        fDebug = False
+
+        # The covariance dicts always need T+1 and T+4
+        horizonList = sorted(set(horizonList) | {1, 4})
+        statMatrix = np.vstack([self.PastPrices.GetColumn(statName) for statName in CORRELATION_STAT_NAMES])
+        correlationMatrix = ComputeStatHorizonCorrelations(statMatrix, self.PastPrices.GetColumn('Cl'), horizonList)
+
+        self.StatCorrelationNames = list(CORRELATION_STAT_NAMES)
+        self.StatCorrelationHorizons = horizonList
+        self.StatCorrelationMatrix = correlationMatrix
+
+        t1Column = horizonList.index(1)
+        t4Column = horizonList.index(4)
+        scoresDictList = []
+        for statIndex in range(len(CORRELATION_STAT_NAMES)):
+            scoresDictList.append({ STAT_SCORE_CORRELATION_WITH_PRICE_T1: float(correlationMatrix[statIndex, t1Column]), 
+                                    STAT_SCORE_CORRELATION_WITH_PRICE_T4: float(correlationMatrix[statIndex, t4Column]) })
+        # End - for statIndex in range(len(CORRELATION_STAT_NAMES)):
+
+        self.m_RSICovariances = scoresDictList[CORRELATION_STAT_NAMES.index('RSI')]
+        self.EMA12Covariances = scoresDictList[CORRELATION_STAT_NAMES.index('EMA12')]
+        self.EMA26Covariances = scoresDictList[CORRELATION_STAT_NAMES.index('EMA26')]
+        self.MACDCovariances = scoresDictList[CORRELATION_STAT_NAMES.index('MACD')]
+        self.kStochasticCovariances = scoresDictList[CORRELATION_STAT_NAMES.index('KStochastic')]
+        self.BiggestRecentDropPercentCovariances = scoresDictList[CORRELATION_STAT_NAMES.index('BiggestRecentDropPercent')]
+
+        if (fDebug):
+            print("ComputeAllStatCorrelations. horizonList=" + str(horizonList))
+            print("     correlationMatrix=" + str(correlationMatrix))
+    # End - ComputeAllStatCorrelations
+
+
+
+
+    #####################################################
+    # [CStockTicker::ComputeAllStatSeries]
+    #
+    # Compute each stat for the whole history at once, with the
+    # vectorized indicator functions.
+    #####################################################
+    def ComputeAllStatSeries(self):
+        numPastPrices = self.PastPrices.GetNumRows()
+        if (numPastPrices <= 0):
+            return
+
+        closeArray = self.PastPrices.GetColumn('Cl')
+        rsiArray = ComputeRSISeries(closeArray, DEFAULT_RSI_NUM_DATA)
+        ema12Array = ComputeEMASeries(closeArray, 12)
+        ema26Array = ComputeEMASeries(closeArray, 26)
+        kStochasticArray, dStochasticArray = ComputeStochasticSeries(closeArray)
+        biggestDropArray = ComputeBiggestRecentDropSeries(closeArray, 7)
+
+        self.PastPrices.GetWritableColumn('RSI')[:] = rsiArray
+        self.PastPrices.GetWritableColumn('EMA12')[:] = ema12Array
+        self.PastPrices.GetWritableColumn('EMA26')[:] = ema26Array
+        self.PastPrices.GetWritableColumn('MACD')[:] = ema12Array - ema26Array
+        self.PastPrices.GetWritableColumn('KStochastic')[:] = kStochasticArray
+        self.PastPrices.GetWritableColumn('DStochastic')[:] = dStochasticArray
+        self.PastPrices.GetWritableColumn('BiggestRecentDropPercent')[:] = biggestDropArray
+
+        # The current stats are the stats for the latest price
+        self.m_RSI = float(rsiArray[-1])
+        self.EMA12 = float(ema12Array[-1])
+        self.EMA26 = float(ema26Array[-1])
+        self.MACD = self.EMA12 - self.EMA26
+        self.kStochastic = float(kStochasticArray[-1])
+        self.dStochastic = float(dStochasticArray[-1])
+        self.BiggestRecentDropPercent = float(biggestDropArray[-1])
+    # End - ComputeAllStatSeries
+
+
+
 
+    #####################################################
+    # [CStockTicker::ComputeAllStatsPerDay]
+    #
+    # Compute each stat one day at a time. This is the slow path,
+    # and is kept to check the vectorized path.
+    #####################################################
+    def ComputeAllStatsPerDay(self):
         # Compute the current stats for the latest pric information
         self.m_RSI = self.ComputeRSI(0, DEFAULT_RSI_NUM_DATA)
         self.EMA12 = self.GetExponentialMovingAverage(0, 12)
@@ -552,32 +1590,29 @@ class CStockTicker(object):
         self.kStochastic, self.dStochastic = self.GetStochastic(0)
         self.BiggestRecentDropPercent = self.ComputeBiggestRecentDrop(0, 7)
 
-        # Compute the stats for each historical day
-        newestPriceIndex = len(self.PastPriceList) - 1
-        numPastPrices = len(self.PastPriceList)
+        # Compute the stats for each historical day.
+        # The columns are views, so writing into them writes into the store.
+        rsiColumn = self.PastPrices.GetWritableColumn('RSI')
+        ema12Column = self.PastPrices.GetWritableColumn('EMA12')
+        ema26Column = self.PastPrices.GetWritableColumn('EMA26')
+        macdColumn = self.PastPrices.GetWritableColumn('MACD')
+        kStochasticColumn = self.PastPrices.GetWritableColumn('KStochastic')
+        dStochasticColumn = self.PastPrices.GetWritableColumn('DStochastic')
+        biggestDropColumn = self.PastPrices.GetWritableColumn('BiggestRecentDropPercent')
+        newestPriceIndex = self.PastPrices.GetNumRows() - 1
+        numPastPrices = self.PastPrices.GetNumRows()
         for index in range(numPastPrices):
             #print("ComputeAllStats - index=" + str(index))
-            currentPriceInfo = self.PastPriceList[newestPriceIndex]
-
-            currentPriceInfo['RSI'] = self.ComputeRSI(index, DEFAULT_RSI_NUM_DATA)
-            currentPriceInfo['EMA12'] = self.GetExponentialMovingAverage(index, 12)
-            currentPriceInfo['EMA26'] = self.GetExponentialMovingAverage(index, 26)
-            currentPriceInfo['MACD'] = currentPriceInfo['EMA12'] - currentPriceInfo['EMA26']
-            currentPriceInfo['KStochastic'], currentPriceInfo['DStochastic'] = self.GetStochastic(index)
-            currentPriceInfo['BiggestRecentDropPercent'] = self.ComputeBiggestRecentDrop(index, 7)
+            rsiColumn[newestPriceIndex] = self.ComputeRSI(index, DEFAULT_RSI_NUM_DATA)
+            ema12Column[newestPriceIndex] = self.GetExponentialMovingAverage(index, 12)
+            ema26Column[newestPriceIndex] = self.GetExponentialMovingAverage(index, 26)
+            macdColumn[newestPriceIndex] = ema12Column[newestPriceIndex] - ema26Column[newestPriceIndex]
+            kStochasticColumn[newestPriceIndex], dStochasticColumn[newestPriceIndex] = self.GetStochastic(index)
+            biggestDropColumn[newestPriceIndex] = self.ComputeBiggestRecentDrop(index, 7)
 
             newestPriceIndex = newestPriceIndex - 1
         # End - for index in range(numPastPrices):
-
-        # Now, compute the covariance for each stat, which correlates the list of stats with 
-        # a synchronized list of future prices
-        self.m_RSICovariances = self.ComputeCovarianceForOneStat('RSI')
-        self.EMA12Covariances = self.ComputeCovarianceForOneStat('EMA12')
-        self.EMA26Covariances = self.ComputeCovarianceForOneStat('EMA26')
-        self.MACDCovariances = self.ComputeCovarianceForOneStat('MACD')
-        self.kStochasticCovariances = self.ComputeCovarianceForOneStat('KStochastic')
-        self.BiggestRecentDropPercentCovariances = self.ComputeCovarianceForOneStat('BiggestRecentDropPercent')
-    # End - ComputeAllStats(self)
+    # End - ComputeAllStatsPerDay
 
 
 
@@ -589,15 +1624,15 @@ class CStockTicker(object):
     #####################################################
     def ComputeCovarianceForOneStat(self, statName):
         fDebug = False
-        newestPriceIndex = len(self.PastPriceList) - 1
+        newestPriceIndex = self.PastPrices.GetNumRows() - 1
 
         # Compute the covariance for each value
         statList, futurePriceList = self.GetSynchronizedStatAndFuturePriceLists(statName, newestPriceIndex, 1)
-        nextDayCorrelation, _ = spearmanr(statList, futurePriceList)
+        nextDayCorrelation = ComputeSpearmanCorrelation(statList, futurePriceList)
 
         # Compute the covariance for each value
         statList, futurePriceList = self.GetSynchronizedStatAndFuturePriceLists(statName, newestPriceIndex, 4)
-        futureDayCorrelation, _ = spearmanr(statList, futurePriceList)
+        futureDayCorrelation = ComputeSpearmanCorrelation(statList, futurePriceList)
 
         scoresDict = { STAT_SCORE_CORRELATION_WITH_PRICE_T1: nextDayCorrelation, 
                         STAT_SCORE_CORRELATION_WITH_PRICE_T4: futureDayCorrelation }
@@ -625,7 +1660,7 @@ class CStockTicker(object):
         if (fDebug):
             print("GetPastPrices. startingFromNDaysBeforeNow=" + str(startingFromNDaysBeforeNow) + ", numPrices=" + str(numPrices))
  
-        maxAvailPrices = len(self.PastPriceList) - abs(startingFromNDaysBeforeNow)
+        maxAvailPrices = self.PastPrices.GetNumRows() - abs(startingFromNDaysBeforeNow)
         # Subtract 1 because the indexes are 0-based
         newestPriceIndex = maxAvailPrices - 1
         # Add 1 because the oldest index is a valid result values.
@@ -635,23 +1670,20 @@ class CStockTicker(object):
         numPrices = newestPriceIndex - oldestPriceIndex
 
         if (fDebug):
-            print("GetPastPrices. List length=" + str(len(self.PastPriceList)))
+            print("GetPastPrices. List length=" + str(self.PastPrices.GetNumRows()))
             print("GetPastPrices. maxAvailPrices=" + str(maxAvailPrices))
             print("GetPastPrices. newestPriceIndex=" + str(newestPriceIndex))
             print("GetPastPrices. oldestPriceIndex=" + str(oldestPriceIndex))
             print("GetPastPrices. numPrices=" + str(numPrices))
 
-        resultList = [0] * numPrices
-        lastDestIndex = numPrices - 1
-        for index in range(numPrices):
-            resultList[lastDestIndex - index] = self.PastPriceList[newestPriceIndex - index]['Cl']
-            if (fDebug):
-                print("Copy from " + str(newestPriceIndex - index) + " to " + str(lastDestIndex - index) + ": " + str(resultList[lastDestIndex - index]))
-        # End - for index in range(numPrices):
+        # This copies the newest numPrices closing prices, ending at newestPriceIndex
+        if (numPrices <= 0):
+            return []
+        closeColumn = self.PastPrices.GetColumn('Cl')
+        resultList = closeColumn[(newestPriceIndex - numPrices) + 1:newestPriceIndex + 1].tolist()
 
         if (fDebug):
             print("GetPastPrices. resultList=" + str(resultList))
-            print("GetPastPrices. self.PastPriceList=" + str(self.PastPriceList))
 
         return resultList
     # End - GetPastPrices()
@@ -675,35 +1707,19 @@ class CStockTicker(object):
             print("     startOffset=" + str(startOffset))
             print("     daysInFuturePrice=" + str(daysInFuturePrice))
  
-        maxAvailPrices = len(self.PastPriceList) - abs(daysInFuturePrice)
+        maxAvailPrices = self.PastPrices.GetNumRows() - abs(daysInFuturePrice)
         if (fDebug):
-            print("GetPastPrices. List length=" + str(len(self.PastPriceList)))
+            print("GetPastPrices. List length=" + str(self.PastPrices.GetNumRows()))
             print("GetPastPrices. maxAvailPrices=" + str(maxAvailPrices))
 
-        for index in range(maxAvailPrices):
-            currentPriceInfo = self.PastPriceList[index]
-            if (markerName not in currentPriceInfo):
-                continue
-            currentMarker = currentPriceInfo[markerName]
-
-            futurePriceInfo = self.PastPriceList[index + daysInFuturePrice]
-            if ('Cl' not in futurePriceInfo):
-                continue
-            futurePrice = futurePriceInfo['Cl']
+        if ((maxAvailPrices <= 0) or (not self.PastPrices.HasColumn(markerName))):
+            return statList, futurePriceList
 
-            if (fDebug):
-                print("Iteration. index = " + str(index))
-                print("     index + daysInFuturePrice = " + str(index + daysInFuturePrice))
-                print("     len(self.PastPriceList) = " + str(len(self.PastPriceList)))
-                print("     len(currentMarker) = " + str(currentMarker))
-                print("     len(futurePrice) = " + str(futurePrice))
-
-            statList.append(currentMarker)
-            futurePriceList.append(futurePrice)
-        # End - for index in range(maxAvailPrices):
+        # The stat for day N is paired with the closing price of day N + daysInFuturePrice
+        statList = self.PastPrices.GetColumn(markerName)[:maxAvailPrices].tolist()
+        futurePriceList = self.PastPrices.GetColumn('Cl')[daysInFuturePrice:daysInFuturePrice + maxAvailPrices].tolist()
 
         if (fDebug):
-            #print("GetSynchronizedStatAndFuturePriceLists. self.PastPriceList=" + str(self.PastPriceList))
             print("GetSynchronizedStatAndFuturePriceLists. statList=" + str(statList))
             print("GetSynchronizedStatAndFuturePriceLists. futurePriceList=" + str(futurePriceList))
 
@@ -848,13 +1864,14 @@ class CStockTicker(object):
     def GetStochastic(self, startingFromNDaysBeforeNow):
         fDebug = False
  
-        maxAvailPrices = len(self.PastPriceList) - abs(startingFromNDaysBeforeNow)
-        newestPriceIndex = (len(self.PastPriceList) - 1) - startingFromNDaysBeforeNow
+        closeColumn = self.PastPrices.GetColumn('Cl')
+        maxAvailPrices = len(closeColumn) - abs(startingFromNDaysBeforeNow)
+        newestPriceIndex = (len(closeColumn) - 1) - startingFromNDaysBeforeNow
         lowestPriceIn14Days = -1
         highestPriceIn14Days = -1
         lowestPriceIn3Days = -1
         highestPriceIn3Days = -1
-        latestClosingPrice = self.PastPriceList[newestPriceIndex]['Cl']
+        latestClosingPrice = float(closeColumn[newestPriceIndex])
 
         ##################################
         # Get the highest and lowest price in the past 14 trading days
@@ -868,9 +1885,9 @@ class CStockTicker(object):
             print("    numPrices=" + str(numPrices))
         for index in range(numPrices):
             if (fDebug):
-                print("GetStochastic. Current=" + str(self.PastPriceList[newestPriceIndex - index]))
+                print("GetStochastic. Current=" + str(self.PastPrices.GetRowDict(newestPriceIndex - index)))
 
-            closingPrice = self.PastPriceList[newestPriceIndex - index]['Cl']
+            closingPrice = closeColumn[newestPriceIndex - index]
             if ((lowestPriceIn14Days < 0) or (closingPrice < lowestPriceIn14Days)):
                 lowestPriceIn14Days = closingPrice
             if ((highestPriceIn14Days < 0) or (closingPrice > highestPriceIn14Days)):
@@ -888,9 +1905,9 @@ class CStockTicker(object):
         numPrices = (newestPriceIndex - oldestPriceIndex) + 1
         for index in range(numPrices):
             if (fDebug):
-                print("GetStochastic. Current=" + str(self.PastPriceList[newestPriceIndex - index]))
+                print("GetStochastic. Current=" + str(self.PastPrices.GetRowDict(newestPriceIndex - index)))
 
-            closingPrice = self.PastPriceList[newestPriceIndex - index]['Cl']
+            closingPrice = closeColumn[newestPriceIndex - index]
             if ((lowestPriceIn3Days < 0) or (closingPrice < lowestPriceIn3Days)):
                 lowestPriceIn3Days = closingPrice
             if ((highestPriceIn3Days < 0) or (closingPrice > highestPriceIn3Days)):
@@ -945,8 +1962,8 @@ class CStockTicker(object):
         if (numActualPrices == 0):
             return 0
 
-        newestPriceIndex = (len(self.PastPriceList) - 1) - startingFromNDaysBeforeNow
-        latestClosingPrice = self.PastPriceList[newestPriceIndex]['Cl']
+        newestPriceIndex = (self.PastPrices.GetNumRows() - 1) - startingFromNDaysBeforeNow
+        latestClosingPrice = float(self.PastPrices.GetColumn('Cl')[newestPriceIndex])
         highestPastPrice = max(pastPriceList)
         if (fDebug):
             print("ComputeBiggestRecentDrop. highestPastPrice=" + str(highestPastPrice))
@@ -993,85 +2010,63 @@ class CStockTicker(object):
     #####################################################
     def GetCovarianceWithPredictedStockTicker(self, predictedStockTicker, daysOffsetInPredictedStock):
         fDebug = False
-        myValueList = []
-        otherValueList = []
-        myDeltaValueList = []
-        otherDeltaValueList = []
         valueName = "Cl"
         if (fDebug):
             print("GetCovarianceWithPredictedStockTicker. valueName=" + str(valueName) + ", daysOffsetInPredictedStock=" + str(daysOffsetInPredictedStock))
 
-        myMaxAvailPrices = len(self.PastPriceList)
-        otherMaxAvailPrices = len(predictedStockTicker.PastPriceList)
-        mostRecentOtherIndex = 0
-        myPrevValue = -1
-        otherPrevValue = -1
-        numRisesInMyStock = 0
-        numRisesInpredictedStockTickerWhenMyStockRises = 0
-        totalRiseInMyStock = 0
-        totalRiseInpredictedStockTicker = 0
-        for index in range(myMaxAvailPrices):
-            myEntry = self.PastPriceList[index]
-
-            foundOtherEntry = False
-            otherIndex = mostRecentOtherIndex
-            while (otherIndex < otherMaxAvailPrices):
-                otherEntry = predictedStockTicker.PastPriceList[otherIndex]
-                if ((myEntry['y'] == otherEntry['y']) and (myEntry['m'] == otherEntry['m']) and (myEntry['d'] == otherEntry['d'])):
-                    foundOtherEntry = True
-                    mostRecentOtherIndex = otherIndex + 1
-                    break
-                otherIndex += 1
-            # End - while (otherIndex < otherMaxAvailPrices):
-
-            if (not foundOtherEntry):
-                break
-
-            if (daysOffsetInPredictedStock != 0):
-                otherIndex = otherIndex + daysOffsetInPredictedStock
-                if ((otherIndex >= 0) and (otherIndex < otherMaxAvailPrices)):
-                    otherEntry = predictedStockTicker.PastPriceList[otherIndex]
-                else:
-                    #print("Error. Could not find another entry (2)")
-                    break
-            # End - while (otherIndex < otherMaxAvailPrices):
-                
-            if (fDebug):
+        myDayNumColumn = self.PastPrices.GetColumn('DayNum')
+        myValueColumn = self.PastPrices.GetColumn(valueName)
+        otherDayNumColumn = predictedStockTicker.PastPrices.GetColumn('DayNum')
+        otherValueColumn = predictedStockTicker.PastPrices.GetColumn(valueName)
+        otherMaxAvailPrices = len(otherValueColumn)
+
+        # Join the two tickers on the day number. Both columns are sorted, so one
+        # binary search per day finds the matching day in the other ticker.
+        otherIndexArray = np.searchsorted(otherDayNumColumn, myDayNumColumn, side='left')
+        clippedIndexArray = np.minimum(otherIndexArray, max(otherMaxAvailPrices - 1, 0))
+        fMatchedArray = (otherIndexArray < otherMaxAvailPrices)
+        if (otherMaxAvailPrices > 0):
+            fMatchedArray &= (otherDayNumColumn[clippedIndexArray] == myDayNumColumn)
+
+        # Then shift by the offset. Stop at the first of my days that is not in the
+        # other ticker, or whose shifted day is past either end of the other ticker.
+        otherIndexArray = otherIndexArray + daysOffsetInPredictedStock
+        fMatchedArray &= (otherIndexArray >= 0) & (otherIndexArray < otherMaxAvailPrices)
+        numMatches = len(fMatchedArray)
+        if (not np.all(fMatchedArray)):
+            numMatches = int(np.argmin(fMatchedArray))
+        otherIndexArray = otherIndexArray[:numMatches]
+
+        myValueArray = myValueColumn[:numMatches].astype(np.float64)
+        otherValueArray = otherValueColumn[otherIndexArray].astype(np.float64)
+        if (fDebug):
+            for index in range(numMatches):
                 print("Found another entry")
-                print("     myEntry=" + str(myEntry))
-                print("     otherEntry=" + str(otherEntry))
-
-
-            myCurrentValue = myEntry[valueName]
-            otherCurrentValue = otherEntry[valueName]
-            myValueList.append(myCurrentValue)
-            otherValueList.append(otherCurrentValue)
-            if ((myPrevValue > 0) and (otherPrevValue > 0)):
-                myDelta = myCurrentValue - myPrevValue
-                otherDelta = otherCurrentValue - otherPrevValue
-
-                myDeltaValueList.append(myDelta)
-                otherDeltaValueList.append(otherDelta)
-
-                if (myDelta > 0):
-                    numRisesInMyStock += 1
-                    if (otherDelta > 0):
-                        numRisesInpredictedStockTickerWhenMyStockRises += 1
-                        totalRiseInMyStock += myDelta
-                        totalRiseInpredictedStockTicker += otherDelta
-                # End - if (myDelta > 0):
-            # End - if ((myPrevValue > 0) and (otherPrevValue > 0)):
-
-            myPrevValue = myCurrentValue
-            otherPrevValue = otherCurrentValue
-        # End - for index in range(myMaxAvailPrices):
+                print("     myEntry=" + str(self.PastPrices.GetRowDict(index)))
+                print("     otherEntry=" + str(predictedStockTicker.PastPrices.GetRowDict(otherIndexArray[index])))
+
+        # A day has a delta only if both previous prices are positive.
+        fPrevValidArray = (myValueArray[:-1] > 0) & (otherValueArray[:-1] > 0)
+        myDeltaArray = np.diff(myValueArray)[fPrevValidArray]
+        otherDeltaArray = np.diff(otherValueArray)[fPrevValidArray]
+
+        fMyRiseArray = (myDeltaArray > 0)
+        fBothRiseArray = fMyRiseArray & (otherDeltaArray > 0)
+        numRisesInMyStock = int(np.count_nonzero(fMyRiseArray))
+        numRisesInpredictedStockTickerWhenMyStockRises = int(np.count_nonzero(fBothRiseArray))
+        totalRiseInMyStock = float(np.sum(myDeltaArray[fBothRiseArray]))
+
+        myValueList = myValueArray.tolist()
+        otherValueList = otherValueArray.tolist()
+        myDeltaValueList = myDeltaArray.tolist()
+        otherDeltaValueList = otherDeltaArray.tolist()
 
         if (fDebug):
             print("myValueList=" + str(myValueList))
             print("otherValueList=" + str(otherValueList))
 
-        valueCorrelation, _ = spearmanr(myValueList, otherValueList)
-        deltaCorrelation, _ = spearmanr(myDeltaValueList, otherDeltaValueList)
+        valueCorrelation = ComputeSpearmanCorrelation(myValueList, otherValueList)
+        deltaCorrelation = ComputeSpearmanCorrelation(myDeltaValueList, otherDeltaValueList)
         if (numRisesInMyStock > 0):
             fractionMyRisesLeadToOtherRise = float(numRisesInpredictedStockTickerWhenMyStockRises) / float(numRisesInMyStock)
         else:
@@ -1092,136 +2087,81 @@ class CStockTicker(object):
 
     #####################################################
     #
-    # [CStockTicker::GetDaysWithExtremePrices]
+    # [CStockTicker::GetExtremePriceIndex]
     #
-    # The oldest price is index 0, and the latest price is at index numPrices-1
     #####################################################
-    def GetDaysWithExtremePrices(self, opCodeStr, numExtremePrices):
-        fDebug = False
-        fLookForLargestValues = False
-        numPrices = 0
-        priceList = [0] * numExtremePrices
-        priceDateList = [{'y': 0}] * numExtremePrices
-        pricePrevDateList = [{'y': 0}] * numExtremePrices
+    def GetExtremePriceIndex(self):
+        if ((self.m_ExtremePriceIndex is None) or (self.m_ExtremePriceIndex.GetNumRows() != self.PastPrices.GetNumRows())):
+            self.m_ExtremePriceIndex = StockExtremes.MakeExtremePriceIndex(self.PastPrices)
+        return self.m_ExtremePriceIndex
+    # End - GetExtremePriceIndex
 
-        if (fDebug):
-            print("GetDaysWithExtremePrices. opCodeStr=" + opCodeStr)
-            print("    numExtremePrices=" + str(numExtremePrices))
 
 
-        ####################
-        # Set some flags for the comparison, so we are using bools not comparing strings. 
-        fLookForLargestValues = True
-        if (opCodeStr in [EXTREMES_MIN_PRICES, EXTREMES_MAX_PRICE_DECLINES]):
-            fLookForLargestValues = False
+    #####################################################
+    #
+    # [CStockTicker::GetDaysWithExtremePrices]
+    #
+    # The oldest price is index 0, and the latest price is at index numPrices-1
+    # If numSessionsToSearch is positive, then this only searches that many
+    # of the most recent trading days.
+    # The results are in order, the most extreme first.
+    #####################################################
+    def GetDaysWithExtremePrices(self, opCodeStr, numExtremePrices, numSessionsToSearch=-1):
+        firstIndex = 0
+        if (numSessionsToSearch > 0):
+            firstIndex = max(0, self.PastPrices.GetNumRows() - numSessionsToSearch)
 
-        fComparePriceChanges = False
-        if (opCodeStr in [EXTREMES_MAX_PRICE_CHANGES, EXTREMES_MAX_PRICE_INCREASES, EXTREMES_MAX_PRICE_DECLINES]):
-            fComparePriceChanges = True
+        indexArray, valueArray = self.GetExtremePriceIndex().GetExtremes(opCodeStr, numExtremePrices, firstIndex)
+        return self.GetExtremeDayLists(indexArray, valueArray)
+    # End - GetDaysWithExtremePrices()
 
-        fCompareAbsoluteValues = False
-        if (opCodeStr in [EXTREMES_MAX_PRICE_CHANGES]):
-            fCompareAbsoluteValues = True
 
 
-        ####################
-        # Get the array indexes. Subtract 1 because the indexes are 0-based
-        newestPriceIndex = len(self.PastPriceList) - 1
-        newestPriceIndex = max(0, newestPriceIndex)
-        #oldestPriceIndex = (newestPriceIndex - numPricesToSearch) + 1
-        #oldestPriceIndex = max(0, oldestPriceIndex)
-        oldestPriceIndex = 0
-        # Add 1 because we include both the oldest and newest indexes as result values.
-        numPricesToSearch = (newestPriceIndex - oldestPriceIndex) + 1
+    #####################################################
+    #
+    # [CStockTicker::GetDaysWithExtremePricesInDateRange]
+    #
+    # This is GetDaysWithExtremePrices, for the days from the first date
+    # to the last date, both included. For example, the biggest declines
+    # in the last 5 years.
+    #####################################################
+    def GetDaysWithExtremePricesInDateRange(self, opCodeStr, numExtremePrices, firstYear, firstMonth, firstDay, 
+                                            lastYear, lastMonth, lastDay):
+        indexArray, valueArray = self.GetExtremePriceIndex().GetExtremesInDateRange(opCodeStr, numExtremePrices, 
+                                                        DateToDayNum(firstYear, firstMonth, firstDay), 
+                                                        DateToDayNum(lastYear, lastMonth, lastDay))
+        return self.GetExtremeDayLists(indexArray, valueArray)
+    # End - GetDaysWithExtremePricesInDateRange
 
-        if (fDebug):
-            print("GetDaysWithExtremePrices. List length=" + str(len(self.PastPriceList)))
-            print("     newestPriceIndex=" + str(newestPriceIndex))
-            print("     oldestPriceIndex=" + str(oldestPriceIndex))
-            print("     numExtremePrices=" + str(numExtremePrices))
-            print("     numPricesToSearch=" + str(numPricesToSearch))
-
-
-        #############################
-        # Look at every available price
-        prevDate = {'y': 0, 'm': 0, 'd': 0}
-        prevPrice = (self.PastPriceList[oldestPriceIndex])['Cl']
-        for index in range(numPricesToSearch):
-            # Search in forward direction, so we can record the previous date.
-            # We are looking for peaks and valleys, so it does not matter whether we approach
-            # them from the future or the past.
-            # currentPriceInfo = self.PastPriceList[newestPriceIndex - index]
-            currentPriceInfo = self.PastPriceList[oldestPriceIndex + index]
-            currentPrice = currentPriceInfo['Cl']
-            currentDate = {'y': currentPriceInfo['y'], 'm': currentPriceInfo['m'], 'd': currentPriceInfo['d'] }
-
-            if (fComparePriceChanges):
-                currentValue = (currentPrice - prevPrice)
-            else:  # elif (opCodeStr in (EXTREMES_MAX_PRICE_CHANGES, EXTREMES_MIN_PRICE_CHANGES)):
-                currentValue = currentPrice
-
-            if (fCompareAbsoluteValues):
-                currentValue = abs(currentValue)
 
-            if (fDebug):
-                print("GetDaysWithExtremePrices. currentValue=" + str(currentValue) + ", currentDate=" + str(currentDate))
-
-            ###################################
-            # Look to see if this is one of the extreme prices
-            if (numPrices < numExtremePrices):
-                if (fDebug):
-                    print("GetDaysWithExtremePrices. numPrices=" + str(numPrices) + ", numExtremePrices=" + str(numExtremePrices))
-                priceList[numPrices] = currentValue
-                priceDateList[numPrices] = currentDate
-                pricePrevDateList[numPrices] = prevDate
-                numPrices += 1
-            ###################################
-            else:
-                bestMatchIndex = -1
-                if (fLookForLargestValues):
-                    bestMatchValue = 100000000
-                else:
-                    bestMatchValue = -100000000                
-
-                for compareIndex in range(numExtremePrices):
-                    compareValue = priceList[compareIndex]
-                    if (fDebug):
-                        print("     Compare currentValue=" + str(currentValue) + ", compareValue=" + str(compareValue))
-
-                    if (fLookForLargestValues):
-                        # Remove the smallest of the large values
-                        if ((currentValue > compareValue) and (compareValue < bestMatchValue)):
-                            bestMatchIndex = compareIndex
-                            bestMatchValue = compareValue
-                        # End - if ((currentValue > compareValue) and (compareValue < bestMatchValue)):
-                    else:   # if (not fLookForLargestValues):
-                        # Remove the largest of the small values
-                        if ((currentValue < compareValue) and (compareValue > bestMatchValue)):
-                            bestMatchIndex = compareIndex
-                            bestMatchValue = compareValue
-                        # End - if ((currentValue > compareValue) and (compareValue < bestMatchValue)):
-                # End - for compareIndex in range(numExtremePrices):
-
-                if (bestMatchIndex >= 0):
-                    if (fDebug):
-                        print("     GetDaysWithExtremePrices found Match. currentValue=" + str(currentValue))
-                    priceList[bestMatchIndex] = currentValue                    
-                    priceDateList[bestMatchIndex] = currentDate
-                    pricePrevDateList[bestMatchIndex] = prevDate
-                # End - if (bestMatchIndex >= 0)
-            # End - We have already found numExtremePrices extremes, now find the most extreme.
-
-            prevPrice = currentPrice
-            prevDate = currentDate
-        # End - for index in range(numPricesToSearch):
 
-        if (fDebug):
-            print("GetDaysWithExtremePrices. numPrices=" + str(numPrices) + ", priceList=" + str(priceList))
-            print("     priceDateList=" + str(priceDateList))
-            print("     pricePrevDateList=" + str(pricePrevDateList))
+    #####################################################
+    #
+    # [CStockTicker::GetExtremeDayLists]
+    #
+    # Returns numPrices, priceList, priceDateList, pricePrevDateList for the rows
+    # in indexArray. The previous date of the first row is {'y': 0, 'm': 0, 'd': 0}.
+    #####################################################
+    def GetExtremeDayLists(self, indexArray, valueArray):
+        yearColumn = self.PastPrices.GetColumn('y')
+        monthColumn = self.PastPrices.GetColumn('m')
+        dayColumn = self.PastPrices.GetColumn('d')
+
+        priceList = valueArray.tolist()
+        priceDateList = []
+        pricePrevDateList = []
+        for rowIndex in indexArray.tolist():
+            priceDateList.append({'y': int(yearColumn[rowIndex]), 'm': int(monthColumn[rowIndex]), 'd': int(dayColumn[rowIndex])})
+            if (rowIndex > 0):
+                pricePrevDateList.append({'y': int(yearColumn[rowIndex - 1]), 'm': int(monthColumn[rowIndex - 1]), 
+                                        'd': int(dayColumn[rowIndex - 1])})
+            else:
+                pricePrevDateList.append({'y': 0, 'm': 0, 'd': 0})
+        # End - for rowIndex in indexArray.tolist():
 
-        return numPrices, priceList, priceDateList, pricePrevDateList
-    # End - GetDaysWithExtremePrices()
+        return len(priceList), priceList, priceDateList, pricePrevDateList
+    # End - GetExtremeDayLists()
 
 
 
@@ -1240,7 +2180,7 @@ class CStockTicker(object):
     #
     #####################################################
     def GotoFirstDate(self):
-        if (len(self.PastPriceList) <= 0):
+        if (self.PastPrices.GetNumRows() <= 0):
             return False
 
         self.IteratorIndex = 0
@@ -1260,25 +2200,68 @@ class CStockTicker(object):
         if (fDebug):
             print("GotoDate. startYear=" + str(startYear) + ", startMonth=" + str(startMonth) + ", startDay=" + str(startDay))
 
-        self.IteratorIndex = len(self.PastPriceList) - 1
-        while (self.IteratorIndex >= 0):
-            priceInfo = self.PastPriceList[self.IteratorIndex]
+        # Find the last day on or before the start date. The DayNum column is sorted,
+        # so this is a binary search.
+        dayNumColumn = self.PastPrices.GetColumn('DayNum')
+        startDayNum = DateToDayNum(startYear, startMonth, startDay)
+        self.IteratorIndex = int(np.searchsorted(dayNumColumn, startDayNum, side='right')) - 1
+        if (self.IteratorIndex >= 0):
+            fFoundDate = True
             if (fDebug):
-                print("     priceInfo=" + str(priceInfo))
-            if (CompareDates(DATE_COMPARE_GREATER_THAN_EQUAL, startYear, startMonth, startDay, priceInfo['y'], priceInfo['m'], priceInfo['d'])):
-                if (fDebug):
-                    print("     Found Matching Date")
-                fFoundDate = True
-                break
+                print("     Found Matching Date")
+                print("     priceInfo=" + str(self.PastPrices.GetRowDict(self.IteratorIndex)))
+        else:
+            self.IteratorIndex = 0
+
+        return fFoundDate
+    # End of GotoDate
+
+
+
+    #####################################################
+    #
+    # [CStockTicker::GetIndexRangeForDates]
+    #
+    # Returns the first and last index of the days between the two dates,
+    # including both dates. If there are no days in the range, then
+    # lastIndex is less than firstIndex.
+    #####################################################
+    def GetIndexRangeForDates(self, firstYear, firstMonth, firstDay, lastYear, lastMonth, lastDay):
+        dayNumColumn = self.PastPrices.GetColumn('DayNum')
+        firstIndex = int(np.searchsorted(dayNumColumn, DateToDayNum(firstYear, firstMonth, firstDay), side='left'))
+        lastIndex = int(np.searchsorted(dayNumColumn, DateToDayNum(lastYear, lastMonth, lastDay), side='right')) - 1
+        return firstIndex, lastIndex
+    # End of GetIndexRangeForDates
+
+
 
-            self.IteratorIndex = self.IteratorIndex - 1
-        # End - while (self.IteratorIndex >= 0):
+    #####################################################
+    #
+    # [CStockTicker::GotoSessionIndex]
+    #
+    # Go to the session in the trading calendar. If this ticker has no price
+    # on that session, this goes to the last price before it, like GotoDate.
+    #####################################################
+    def GotoSessionIndex(self, sessionIndex):
+        tradingCalendar = self.GetTradingCalendar()
+        if ((sessionIndex < 0) or (sessionIndex >= tradingCalendar.GetNumSessions())):
+            self.IteratorIndex = 0
+            return False
+
+        # When the calendar is built from this ticker, the session is the index.
+        if (not self.m_fSharedTradingCalendar):
+            self.IteratorIndex = sessionIndex
+            return True
 
+        dayNumColumn = self.PastPrices.GetColumn('DayNum')
+        sessionDayNum = tradingCalendar.GetSessionDayNum(sessionIndex)
+        self.IteratorIndex = int(np.searchsorted(dayNumColumn, sessionDayNum, side='right')) - 1
         if (self.IteratorIndex < 0):
             self.IteratorIndex = 0
+            return False
 
-        return fFoundDate
-    # End of GotoDate
+        return True
+    # End of GotoSessionIndex
 
 
 
@@ -1292,7 +2275,7 @@ class CStockTicker(object):
         if (fDebug):
             print("GotoNextDate")
 
-        if (self.IteratorIndex >= (len(self.PastPriceList) - 1)):
+        if (self.IteratorIndex >= (self.PastPrices.GetNumRows() - 1)):
             return False
 
         self.IteratorIndex += 1
@@ -1313,14 +2296,17 @@ class CStockTicker(object):
         if (fDebug):
             print("GetIteratorCurrentPriceInfo")
 
-        if ((self.IteratorIndex < 0) or (self.IteratorIndex == len(self.PastPriceList))):
+        if ((self.IteratorIndex < 0) or (self.IteratorIndex == self.PastPrices.GetNumRows())):
             return False, 0, 0, 0, 0, 0, 0, 0, 0, 0
 
-        priceInfo = self.PastPriceList[self.IteratorIndex]
+        index = self.IteratorIndex
+        columns = self.PastPrices.m_Columns
         if (fDebug):
-            print("GetIteratorCurrentPriceInfo. priceInfo=" + str(priceInfo))
+            print("GetIteratorCurrentPriceInfo. priceInfo=" + str(self.PastPrices.GetRowDict(index)))
 
-        return True, priceInfo['y'], priceInfo['m'], priceInfo['d'], priceInfo['Cl'], priceInfo['Op'], priceInfo['Lo'], priceInfo['Hi'], priceInfo['Vo'], priceInfo['RSI']
+        return (True, int(columns['y'][index]), int(columns['m'][index]), int(columns['d'][index]), 
+                float(columns['Cl'][index]), float(columns['Op'][index]), float(columns['Lo'][index]), 
+                float(columns['Hi'][index]), int(columns['Vo'][index]), float(columns['RSI'][index]))
     # End of GetIteratorCurrentPriceInfo
 
 
@@ -1336,16 +2322,18 @@ class CStockTicker(object):
         if (fDebug):
             print("GetIteratorCurrentPriceInfo")
 
-        if ((self.IteratorIndex < 0) or (self.IteratorIndex == len(self.PastPriceList))):
+        if ((self.IteratorIndex < 0) or (self.IteratorIndex == self.PastPrices.GetNumRows())):
             return False, 0, 0, 0, 0, 0, 0, 0, 0, 0
 
-        priceInfo = self.PastPriceList[self.IteratorIndex]
-        if (self.IteratorIndex <= 0):
+        index = self.IteratorIndex
+        columns = self.PastPrices.m_Columns
+        if (index <= 0):
             prevPrice = 0
         else:
-            prevPrice = self.PastPriceList[self.IteratorIndex - 1]['Cl']
+            prevPrice = float(columns['Cl'][index - 1])
 
-        return True, prevPrice, priceInfo['EMA12'], priceInfo['EMA26'], priceInfo['MACD'], priceInfo['KStochastic'], priceInfo['DStochastic'], priceInfo['BiggestRecentDropPercent']
+        return (True, prevPrice, float(columns['EMA12'][index]), float(columns['EMA26'][index]), float(columns['MACD'][index]), 
+                float(columns['KStochastic'][index]), float(columns['DStochastic'][index]), float(columns['BiggestRecentDropPercent'][index]))
     # End of GetIteratorExtendedCurrentPriceInfo
 
 
@@ -1361,9 +2349,9 @@ class CStockTicker(object):
     def PrintDebug(self):
         print("\n\n PrintDebug \n\n")
 
-        numEntries = len(self.PastPriceList)
+        numEntries = self.PastPrices.GetNumRows()
         for index in range(numEntries):
-            print(str(index) + ": " + str(self.PastPriceList[index]))
+            print(str(index) + ": " + str(self.PastPrices.GetRowDict(index)))
         # End - for index in range(numEntries):
     # End - PrintDebug
 
@@ -1375,25 +2363,33 @@ class CStockTicker(object):
 
 
 ################################################################################
-# 
+#
+# [LoadTickerFromColumns]
+#
+# Make a ticker from whole columns of past prices. columnDict maps the names in
+# StockPriceStore.g_PriceColumnList to arrays with at least numRows values.
+# The arrays are used as they are, without copying, and may be read-only.
+# A missing DayNum column is computed from the dates.
+#
+# The years are sorted, so skipping the years before firstYear is a binary
+# search and a slice.
 ################################################################################
-def LoadTickerFromValueDict(tickerSymbol, valueDictList, firstYear):
+def LoadTickerFromColumns(tickerSymbol, columnDict, numRows, currentPriceDict, firstYear):
     fDebug = False
     if (fDebug):
-        print("LoadTickerFromValueDict")
+        print("LoadTickerFromColumns. tickerSymbol=" + tickerSymbol + ", numRows=" + str(numRows))
 
     # Make a new empty ticker
     stockTicker = CStockTicker(tickerSymbol)
 
     # Set latest stock info
-    latestDictEntry = valueDictList[len(valueDictList) - 1]
     stockTicker.SetCompanyName(tickerSymbol)
-    stockTicker.SetCurrentPrice(latestDictEntry['cl'])
-    stockTicker.SetPrevClose(latestDictEntry['cl'])
-    stockTicker.SetTodayOpenPrice(latestDictEntry['op'])
-    stockTicker.SetTodayLowPrice(latestDictEntry['lo'])
-    stockTicker.SetTodayHighPrice(latestDictEntry['hi'])
-    stockTicker.SetVolume(latestDictEntry['lo'])
+    stockTicker.SetCurrentPrice(currentPriceDict['CurrentPrice'])
+    stockTicker.SetPrevClose(currentPriceDict['PrevClose'])
+    stockTicker.SetTodayOpenPrice(currentPriceDict['TodayOpenPrice'])
+    stockTicker.SetTodayLowPrice(currentPriceDict['TodayLowPrice'])
+    stockTicker.SetTodayHighPrice(currentPriceDict['TodayHighPrice'])
+    stockTicker.SetVolume(currentPriceDict['Volume'])
 
     stockTicker.SetTrailingPE(-1)
     stockTicker.SetForwardPE(-1)
@@ -1408,23 +2404,103 @@ def LoadTickerFromValueDict(tickerSymbol, valueDictList, firstYear):
 
     #######################
     # Set all past info
-    for valueDict in valueDictList:
-        if ((valueDict['y'] == latestDictEntry['y']) and (valueDict['m'] == latestDictEntry['m']) and (valueDict['d'] == latestDictEntry['d'])):
-            break
+    firstIndex = 0
+    if (firstYear > 0):
+        firstIndex = int(np.searchsorted(columnDict['y'][:numRows], firstYear, side='left'))
 
-        # I mean, really, do we need to simulate back to 1930? Let's just skip those.
-        if ((firstYear > 0) and (valueDict['y'] < firstYear)):
-            continue
+    pastColumnDict = {}
+    for columnName, column in columnDict.items():
+        pastColumnDict[columnName] = column[firstIndex:numRows]
+    if ('DayNum' not in pastColumnDict):
+        pastColumnDict['DayNum'] = DatesToDayNums(pastColumnDict['y'], pastColumnDict['m'], pastColumnDict['d'])
 
-        stockTicker.SetPastValues(valueDict['y'], valueDict['m'], valueDict['d'], 
-                                valueDict['op'], valueDict['cl'], valueDict['vo'], 
-                                valueDict['hi'], valueDict['lo'],
-                                valueDict['rsi'], valueDict['ema12'], valueDict['ema26'],
-                                valueDict['macd'], valueDict['kStochastic'], valueDict['dStochastic'],
-                                valueDict['drop'])
-    # for row in hist.itertuples():
+    if (not stockTicker.PastPrices.AttachColumns(pastColumnDict, numRows - firstIndex)):
+        return None
 
     return stockTicker
+# End - LoadTickerFromColumns
+
+
+
+################################################################################
+#
+# [LoadTickerFromValueDict]
+#
+# valueDictList is a list of dicts, one per day, with the keys in
+# g_ValueDictKeyList. The latest entry is the current price, and is not
+# added to the past prices.
+################################################################################
+g_ValueDictKeyList = [('y', 'y'), ('m', 'm'), ('d', 'd'), 
+                    ('cl', 'Cl'), ('op', 'Op'), ('hi', 'Hi'), ('lo', 'Lo'), ('vo', 'Vo'),
+                    ('rsi', 'RSI'), ('ema12', 'EMA12'), ('ema26', 'EMA26'), ('macd', 'MACD'),
+                    ('kStochastic', 'KStochastic'), ('dStochastic', 'DStochastic'), 
+                    ('drop', 'BiggestRecentDropPercent')]
+
+def LoadTickerFromValueDict(tickerSymbol, valueDictList, firstYear):
+    fDebug = False
+    if (fDebug):
+        print("LoadTickerFromValueDict")
+
+    numEntries = len(valueDictList)
+    latestDictEntry = valueDictList[numEntries - 1]
+    currentPriceDict = {'CurrentPrice': latestDictEntry['cl'],
+                        'PrevClose': latestDictEntry['cl'],
+                        'TodayOpenPrice': latestDictEntry['op'],
+                        'TodayLowPrice': latestDictEntry['lo'],
+                        'TodayHighPrice': latestDictEntry['hi'],
+                        'Volume': latestDictEntry['lo']}
+
+    # Pull each key out of every dict into one typed column.
+    columnTypeDict = dict(StockPriceStore.g_PriceColumnList)
+    columnDict = {}
+    for keyName, columnName in g_ValueDictKeyList:
+        columnDict[columnName] = np.fromiter(map(itemgetter(keyName), valueDictList), 
+                                            dtype=columnTypeDict[columnName], count=numEntries)
+
+    # The past prices stop at the first entry with the same date as the latest entry.
+    columnDict['DayNum'] = DatesToDayNums(columnDict['y'], columnDict['m'], columnDict['d'])
+    numRows = int(np.argmax(columnDict['DayNum'] == columnDict['DayNum'][-1]))
+
+    return LoadTickerFromColumns(tickerSymbol, columnDict, numRows, currentPriceDict, firstYear)
 # End - LoadTickerFromValueDict
 
 
+
+################################################################################
+#
+# [WriteTickerToPriceFile]
+#
+# Save the past prices and current prices in a memory-mappable price file.
+################################################################################
+def WriteTickerToPriceFile(stockTicker, filePath):
+    currentPriceDict = {'CurrentPrice': stockTicker.CurrentPrice, 
+                        'PrevClose': stockTicker.PrevClose,
+                        'TodayOpenPrice': stockTicker.TodayOpenPrice,
+                        'TodayLowPrice': stockTicker.TodayLowPrice,
+                        'TodayHighPrice': stockTicker.TodayHighPrice,
+                        'Volume': stockTicker.volume}
+    return StockPriceFile.WritePriceFile(filePath, stockTicker.GetStockSymbol(), currentPriceDict, stockTicker.PastPrices)
+# End - WriteTickerToPriceFile
+
+
+
+################################################################################
+#
+# [OpenTickerFromPriceFile]
+#
+# This is like LoadTickerFromValueDict, but the past prices are views on the
+# memory-mapped file, so nothing is copied or parsed.
+# Returns None if the file cannot be read.
+################################################################################
+def OpenTickerFromPriceFile(filePath, firstYear):
+    tickerSymbol, currentPriceDict, priceStore = StockPriceFile.ReadPriceFile(filePath)
+    if (priceStore is None):
+        return None
+
+    columnDict = {}
+    for columnName in priceStore.GetColumnNames():
+        columnDict[columnName] = priceStore.GetColumn(columnName)
+
+    return LoadTickerFromColumns(tickerSymbol, columnDict, priceStore.GetNumRows(), currentPriceDict, firstYear)
+# End - OpenTickerFromPriceFile
+
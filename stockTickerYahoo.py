@@ -34,18 +34,43 @@
 # https://docs.data.nasdaq.com/docs/python-tables
 #
 ################################################################################
+import os
 import sys
+import time
+import zlib
+import json
+import random
+import urllib.request
+import urllib.parse
+import urllib.error
 #import copy
 from datetime import datetime
 #from collections import deque
-
-# Yahoo Finance
-import yfinance as yf
-
-import statistics
-from scipy import stats
-from scipy.stats import spearmanr
-#import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+import multiprocessing
+import asyncio
+
+# Yahoo Finance. This is only needed for the Yahoo source, so the fake
+# source still works without it.
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+#import statistics
+#from scipy import stats
+#from scipy.stats import spearmanr
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockTicker as StockTicker
+import stockPriceStore as StockPriceStore
+import stockPriceFile as StockPriceFile
+import stockAsyncSource as StockAsyncSource
+import stockOptions as StockOptions
 
 g_libDirPath = "/home/ddean/ddRoot/lib"
 # Allow import to pull from the per-user lib directory.
@@ -60,6 +85,67 @@ SP500_TICKER = '^GSPC'
 GOLDEN_DRAGON_TICKER = '^HXC'
 
 YAHOO_FINANCE = "yahoo"
+# Made-up prices, for testing and benchmarking without a network.
+FAKE_SOURCE = "fake"
+
+# The number of times OpenTickersForStocks tries to load one ticker.
+MAX_LOAD_ATTEMPTS = 5
+
+# The fake source sleeps this long for each ticker, like a network fetch would.
+FAKE_SOURCE_LATENCY_SECS = 0.0
+FAKE_SOURCE_NUM_DAYS = 15000
+
+# The Yahoo client. This is the yfinance module, but a test can set a stand-in
+# with the same Ticker(symbol).info and Ticker(symbol).history() calls.
+g_YahooClient = yf
+
+# The directory of cached price files, one per ticker. If this is None, then
+# LoadTickerFromYahoo always downloads the full history.
+g_PriceCacheDirPath = None
+
+# If this is True, then LoadTickerFromYahoo also loads the option chain of each ticker.
+# That is one download per expiration date, so it is off by default.
+g_fLoadOptions = False
+
+# The overlapping bar must match the cached bar this closely, or else the prices
+# were adjusted, for a split or dividend, and the whole history is downloaded again.
+CACHE_OVERLAP_TOLERANCE = 1e-6
+
+# The price columns that come from the history download.
+g_HistoryColumnNameList = ['y', 'm', 'd', 'Op', 'Hi', 'Lo', 'Cl', 'Vo', 'DayNum']
+
+# The quote snapshot asks for this many symbols in each request.
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/"
+QUOTE_BATCH_SIZE = 50
+QUOTE_TIMEOUT_SECS = 10
+DEFAULT_QUOTE_THREADS = 4
+# A failed batch waits before it is tried again, with the same capped exponential
+# backoff as stockAsyncSource, so a throttling server is not hit again at once.
+QUOTE_BASE_BACKOFF_SECS = StockAsyncSource.DEFAULT_BASE_BACKOFF_SECS
+QUOTE_MAX_BACKOFF_SECS = StockAsyncSource.DEFAULT_MAX_BACKOFF_SECS
+
+# Each ticker field, the quote fields to try for it in order, and the value to use if
+# none of them are in the quote. A default of None means the quote is no good without it.
+g_QuoteFieldList = [
+    ('SetCompanyName', ['shortName', 'longName', 'symbol'], None),
+    ('SetCurrentPrice', ['currentPrice', 'regularMarketPrice', 'regularMarketOpen', 'regularMarketPreviousClose'], None),
+    ('SetPrevClose', ['regularMarketPreviousClose', 'previousClose'], None),
+    ('SetTodayOpenPrice', ['regularMarketOpen', 'open'], None),
+    ('SetTodayLowPrice', ['regularMarketDayLow', 'dayLow'], None),
+    ('SetTodayHighPrice', ['regularMarketDayHigh', 'dayHigh'], None),
+    ('SetVolume', ['regularMarketVolume', 'volume'], None),
+    ('SetTrailingPE', ['trailingPE'], -1),
+    ('SetForwardPE', ['forwardPE'], -1),
+    ('SetBid', ['bid'], -1),
+    ('SetAsk', ['ask'], -1),
+    ('SetFiftyTwoWeekLow', ['fiftyTwoWeekLow'], 0),
+    ('SetFiftyTwoWeekHigh', ['fiftyTwoWeekHigh'], 0),
+    ('SetFiftyDayAverage', ['fiftyDayAverage'], 0),
+    ('SetTwoHundredDayAverage', ['twoHundredDayAverage'], 0),
+    ('SetAvgVolume', ['averageDailyVolume3Month', 'averageVolume'], 0),
+    ('SetPEGRatio', ['pegRatio', 'trailingPegRatio'], 0)
+]
 
 # OpCodes for GetExtremes
 EXTREMES_MAX_PRICES = "maxPrices"
@@ -86,8 +172,11 @@ def LoadTickerFromYahoo(stockTicker):
     fRetry = False
     if (fDebug):
         print("CYahooTicker.Load")
+    if (g_YahooClient is None):
+        print("LoadTickerFromYahoo. yfinance is not installed")
+        return fSuccess, fRetry
 
-    remoteTicker = yf.Ticker(stockTicker.GetStockSymbol())
+    remoteTicker = g_YahooClient.Ticker(stockTicker.GetStockSymbol())
     if (remoteTicker is None):
         print("LoadTickerFromYahoo. remoteTicker is None. Symbol=" + stockTicker.GetStockSymbol())
         fRetry = True
@@ -200,100 +289,27 @@ def LoadTickerFromYahoo(stockTicker):
 
 
     #######################
-    # Get historical market data. This returns a pandas.core.frame.DataFrame
-    # This must be one of ['1d', '5d', '1mo', '3mo', 'ytd', 'max']
-    hist = remoteTicker.history(period="max")
-
-    # Each row is a pandas.core.frame.Pandas
-    for row in hist.itertuples():
-        currentTimeStamp = row[0]
-        currentOpen = row[1]
-        currentHigh = row[2]
-        currentLow = row[3]
-        currentClose = row[4]
-        currentVolume = row[5]
-        # The timestamp is a pandas._libs.tslibs.timestamps.Timestamp
-        dateTime = currentTimeStamp.to_pydatetime()
-        dateTimeDate = dateTime.date()
-        #print("dateTime = " + str(dateTime) + ", dateTimeDate.year=" + str(dateTimeDate.year))
-        stockTicker.SetPastValues(dateTimeDate.year, dateTimeDate.month, dateTimeDate.day, 
-                                currentOpen, currentClose, currentVolume, 
-                                currentHigh, currentLow, 0, 0, 0, 0, 0, 0, 0, 0)
-    # for row in hist.itertuples():
+    # Get historical market data. If there is a cached history, then only download
+    # the days since the last cached day.
+    columnDict, numRows = LoadHistoryWithCache(remoteTicker, stockTicker.GetStockSymbol())
+    stockTicker.PastPrices.AttachColumns(columnDict, numRows)
 
 
 
     #######################
-    # Get options data
-    if (False):
-        stockTicker.SetOptionDates(remoteTicker.options)  #expiration dates
-        self.OptionsList = []
-        for dateStr in remoteTicker.options:
-            if (fDebug):
-                print("Options Date: " + dateStr)
-            dateStrParts = dateStr.split('-')
-            strikeDateYear = int(dateStrParts[0])
-            strikeDateMonth = int(dateStrParts[1])
-            strikeDateDay = int(dateStrParts[2])
-
-            totalOptionInfo = self.Ticker.option_chain(dateStr)
-            callOptionInfo = totalOptionInfo.calls
-            putOptionInfo = totalOptionInfo.puts
-            if (fDebug):
-                print("callOptionChain = " + str(callOptionInfo))
-
-            callOptionList = []
-            for row in callOptionInfo.itertuples():
-                lastTradeDateInPanda = row[2]
-                dateTime = lastTradeDateInPanda.to_pydatetime()
-                lastTradeDate = dateTime.date()
-                ltdDateYear = lastTradeDate.year
-                ltdDateMonth = lastTradeDate.month
-                ltdDateDay = lastTradeDate.day
-
-                strikePrice = row[3]
-                bidPrice = row[5]
-                askPrice = row[6]
-                currentVolume = row[9]
-                openInterest = row[10]
-                newQueueEntry = {'s': strikePrice, 'bid': bidPrice, 'ask': askPrice, 
-                                'vo': currentVolume, 'oi': openInterest,
-                                'ltdY': ltdDateYear, 'ltdM': ltdDateMonth, 'ltdD': ltdDateDay }
-                callOptionList.append(newQueueEntry)
-                if (fDebug):
-                    print("One CallInfo = " + str(newQueueEntry))
-            # End - for row in callOptionInfo.itertuples():
-
-            putOptionList = []
-            for row in putOptionInfo.itertuples():
-                if (fDebug):
-                    print("put row = " + str(row))
-                lastTradeDateInPanda = row[2]
-                dateTime = lastTradeDateInPanda.to_pydatetime()
-                lastTradeDate = dateTime.date()
-                ltdDateYear = lastTradeDate.year
-                ltdDateMonth = lastTradeDate.month
-                ltdDateDay = lastTradeDate.day
-
-                strikePrice = row[3]
-                bidPrice = row[5]
-                askPrice = row[6]
-                currentVolume = row[9]
-                openInterest = row[10]
-
-                newQueueEntry = {'s': strikePrice, 'bid': bidPrice, 'ask': askPrice, 
-                                'vo': currentVolume, 'oi': openInterest,
-                                'ltdY': ltdDateYear, 'ltdM': ltdDateMonth, 'ltdD': ltdDateDay }
-                putOptionList.append(newQueueEntry)
-                if (fDebug):
-                    print("One PutInfo = " + str(newQueueEntry))
-            # End - for row in putOptionInfo.itertuples():
-
-            newQueueEntry = {'strikeYear': strikeDateYear, 'strikeMonth': strikeDateMonth, 'strikeDay': strikeDateDay, 'calls': callOptionList, 'puts': putOptionList}
-            self.OptionsList.append(newQueueEntry)
-            if (fDebug):
-                print("New Options Chain: " + str(newQueueEntry))
-        # for dateStr in self.TickerOptionDates
+    # Get options data. Each expiration is a separate download, so they are
+    # fetched in parallel and put into one columnar chain.
+    if (g_fLoadOptions):
+        try:
+            optionChain = StockOptions.LoadOptionChain(stockTicker.GetStockSymbol(), 
+                                                    StockOptions.CYahooOptionProvider(g_YahooClient))
+        except Exception as err:
+            print("LoadTickerFromYahoo. Cannot get options: " + str(err))
+            optionChain = None
+        if (optionChain is not None):
+            stockTicker.SetOptionDates(optionChain.GetExpiryDates())
+            stockTicker.SetOptionChain(optionChain)
+    # End - if (g_fLoadOptions):
 
     fSuccess = True
     fRetry = False
@@ -303,64 +319,664 @@ def LoadTickerFromYahoo(stockTicker):
 
 
 
+################################################################################
+#
+# [SetYahooClient]
+#
+################################################################################
+def SetYahooClient(yahooClient):
+    global g_YahooClient
+    g_YahooClient = yahooClient
+# End - SetYahooClient
+
+
+################################################################################
+#
+# [SetPriceCacheDir]
+#
+# Pass None to stop caching.
+################################################################################
+def SetPriceCacheDir(dirPath):
+    global g_PriceCacheDirPath
+    if (dirPath is not None):
+        os.makedirs(dirPath, exist_ok=True)
+    g_PriceCacheDirPath = dirPath
+# End - SetPriceCacheDir
+
+
+################################################################################
+#
+# [GetPriceCacheFilePath]
+#
+# Symbols like ^GSPC have characters that do not belong in a file name.
+################################################################################
+def GetPriceCacheFilePath(tickerSymbol):
+    fileName = "".join([(c if (c.isalnum() or c in "-.") else "_") for c in tickerSymbol])
+    return os.path.join(g_PriceCacheDirPath, fileName + StockPriceFile.PRICE_FILE_SUFFIX)
+# End - GetPriceCacheFilePath
+
+
+
+################################################################################
+#
+# [GetHistoryColumns]
+#
+# Convert the DataFrame from history() into price columns.
+# This works on whole columns, and never makes a Python object for a row.
+# Returns a dict with the names in g_HistoryColumnNameList, and the number of rows.
+################################################################################
+def GetHistoryColumns(hist):
+    # The index is a DatetimeIndex, usually in the exchange's time zone. Drop the
+    # time zone but keep the local time, so each bar stays on its own trading day.
+    dateIndex = hist.index
+    if (getattr(dateIndex, 'tz', None) is not None):
+        dateIndex = dateIndex.tz_localize(None)
+    dayNumArray = (np.asarray(dateIndex.values).astype('datetime64[D]').astype(np.int64) 
+                    + StockTicker.EPOCH_DAY_NUM).astype(np.int32)
+    yearArray, monthArray, dayArray = StockTicker.DayNumsToDates(dayNumArray)
+
+    columnDict = {'y': yearArray.astype(np.int16), 
+                'm': monthArray.astype(np.int8), 
+                'd': dayArray.astype(np.int8),
+                'Op': hist['Open'].to_numpy(dtype=np.float64), 
+                'Hi': hist['High'].to_numpy(dtype=np.float64), 
+                'Lo': hist['Low'].to_numpy(dtype=np.float64), 
+                'Cl': hist['Close'].to_numpy(dtype=np.float64),
+                'Vo': np.nan_to_num(hist['Volume'].to_numpy(dtype=np.float64)).astype(np.int64),
+                'DayNum': dayNumArray}
+    return columnDict, len(dayNumArray)
+# End - GetHistoryColumns
+
+
+
+################################################################################
+#
+# [MergeHistoryWithCache]
+#
+# The new history starts on the last cached day, so that one day overlaps.
+# If the overlapping day is missing or does not match, then the prices have
+# been adjusted since they were cached, and this returns None.
+################################################################################
+def MergeHistoryWithCache(cachedStore, newColumnDict, numNewRows):
+    fDebug = False
+    numCachedRows = cachedStore.GetNumRows()
+    lastCachedIndex = numCachedRows - 1
+
+    overlapIndex = int(np.searchsorted(newColumnDict['DayNum'][:numNewRows], 
+                                        cachedStore.GetColumn('DayNum')[lastCachedIndex], side='left'))
+    if ((overlapIndex >= numNewRows) 
+            or (newColumnDict['DayNum'][overlapIndex] != cachedStore.GetColumn('DayNum')[lastCachedIndex])):
+        if (fDebug):
+            print("MergeHistoryWithCache. The overlapping day is missing")
+        return None, 0
+
+    for columnName in ['Op', 'Hi', 'Lo', 'Cl']:
+        cachedValue = cachedStore.GetColumn(columnName)[lastCachedIndex]
+        newValue = newColumnDict[columnName][overlapIndex]
+        if (not np.isclose(cachedValue, newValue, rtol=CACHE_OVERLAP_TOLERANCE, atol=0.0)):
+            if (fDebug):
+                print("MergeHistoryWithCache. " + columnName + " changed from " + str(cachedValue) + " to " + str(newValue))
+            return None, 0
+    # End - for columnName in ['Op', 'Hi', 'Lo', 'Cl']:
+
+    # Nothing new, so just use the mapped cache.
+    firstNewIndex = overlapIndex + 1
+    if (firstNewIndex >= numNewRows):
+        columnDict = {}
+        for columnName in g_HistoryColumnNameList:
+            columnDict[columnName] = cachedStore.GetColumn(columnName)
+        return columnDict, numCachedRows
+    # End - if (firstNewIndex >= numNewRows):
+
+    columnDict = {}
+    for columnName in g_HistoryColumnNameList:
+        columnDict[columnName] = np.concatenate((cachedStore.GetColumn(columnName), 
+                                                newColumnDict[columnName][firstNewIndex:numNewRows]))
+    return columnDict, numCachedRows + (numNewRows - firstNewIndex)
+# End - MergeHistoryWithCache
+
+
+
+################################################################################
+#
+# [LoadHistoryWithCache]
+#
+# Returns the price columns of the whole history, and the number of rows.
+################################################################################
+def LoadHistoryWithCache(remoteTicker, tickerSymbol):
+    fDebug = False
+    cachedStore = None
+    if (g_PriceCacheDirPath is not None):
+        cacheFilePath = GetPriceCacheFilePath(tickerSymbol)
+        if (os.path.exists(cacheFilePath)):
+            _, _, cachedStore = StockPriceFile.ReadPriceFile(cacheFilePath)
+    # End - if (g_PriceCacheDirPath is not None):
+
+    columnDict = None
+    if ((cachedStore is not None) and (cachedStore.GetNumRows() > 0)):
+        lastYear = int(cachedStore.GetColumn('y')[-1])
+        lastMonth = int(cachedStore.GetColumn('m')[-1])
+        lastDay = int(cachedStore.GetColumn('d')[-1])
+        startDateStr = "%04d-%02d-%02d" % (lastYear, lastMonth, lastDay)
+        hist = remoteTicker.history(start=startDateStr)
+        newColumnDict, numNewRows = GetHistoryColumns(hist)
+        columnDict, numRows = MergeHistoryWithCache(cachedStore, newColumnDict, numNewRows)
+        if (fDebug):
+            print("LoadHistoryWithCache. " + tickerSymbol + " start=" + startDateStr + ", numNewRows=" + str(numNewRows) 
+                    + ", fMerged=" + str(columnDict is not None))
+        if ((columnDict is not None) and (numRows == cachedStore.GetNumRows())):
+            return columnDict, numRows
+    # End - if ((cachedStore is not None) and (cachedStore.GetNumRows() > 0)):
+
+    # There is no cache, or else the prices were adjusted, so get everything.
+    # This must be one of ['1d', '5d', '1mo', '3mo', 'ytd', 'max']
+    if (columnDict is None):
+        hist = remoteTicker.history(period="max")
+        columnDict, numRows = GetHistoryColumns(hist)
+        if (fDebug):
+            print("LoadHistoryWithCache. " + tickerSymbol + " full history. numRows=" + str(numRows))
+    # End - if (columnDict is None):
+
+    if ((g_PriceCacheDirPath is not None) and (numRows > 0)):
+        cacheStore = StockPriceStore.CStockPriceStore()
+        cacheStore.AttachColumns(columnDict, numRows)
+        # The cache is only an optimization, so a symbol that cannot be saved is just not cached.
+        try:
+            StockPriceFile.WritePriceFile(GetPriceCacheFilePath(tickerSymbol), tickerSymbol, {}, cacheStore)
+        except ValueError as err:
+            print("LoadHistoryWithCache. Cannot cache " + tickerSymbol + ": " + str(err))
+
+    return columnDict, numRows
+# End - LoadHistoryWithCache
+
+
+
+################################################################################
+#
+# class CHttpTransport
+#
+# This is how the quote snapshot talks to the server. Any object with the
+# same Get method can be used instead, like one that reads canned replies.
+################################################################################
+class CHttpTransport(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, timeoutSecs=QUOTE_TIMEOUT_SECS):
+        self.m_TimeoutSecs = timeoutSecs
+        self.m_HeaderDict = {'User-Agent': 'Mozilla/5.0', 'Accept': 'application/json'}
+    # End -  __init__
+
+
+    #####################################################
+    #
+    # [CHttpTransport::Get]
+    #
+    # Returns the HTTP status and the body bytes.
+    # The status is 0 if the server could not be reached.
+    #####################################################
+    def Get(self, url):
+        request = urllib.request.Request(url, headers=self.m_HeaderDict)
+        try:
+            with urllib.request.urlopen(request, timeout=self.m_TimeoutSecs) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as err:
+            return err.code, b''
+        except (urllib.error.URLError, OSError):
+            return 0, b''
+    # End - Get
+
+# End - CHttpTransport
+
+
+
+################################################################################
+#
+# [FetchQuoteBatch]
+#
+# Get the quotes for one batch of symbols in one request.
+# Returns a dict of symbol to quote dict, or None if the request failed.
+################################################################################
+def FetchQuoteBatch(transport, quoteUrl, symbolList):
+    fDebug = False
+    url = quoteUrl + "?" + urllib.parse.urlencode({'symbols': ",".join(symbolList)})
+    statusCode, bodyBytes = transport.Get(url)
+    if (fDebug):
+        print("FetchQuoteBatch. url=" + url + ", statusCode=" + str(statusCode))
+    if (statusCode != 200):
+        return None
+
+    try:
+        resultList = json.loads(bodyBytes)['quoteResponse']['result']
+    except (ValueError, KeyError, TypeError):
+        print("FetchQuoteBatch. Bad reply for " + ",".join(symbolList))
+        return None
+
+    quoteDict = {}
+    for quote in resultList:
+        if ('symbol' in quote):
+            quoteDict[quote['symbol']] = quote
+    return quoteDict
+# End - FetchQuoteBatch
+
+
+
+################################################################################
+#
+# [FetchQuoteBatchWithRetries]
+#
+# Returns an empty dict if every attempt failed.
+# Between attempts, this waits a random time up to the exponential backoff, which
+# is capped at QUOTE_MAX_BACKOFF_SECS.
+################################################################################
+def FetchQuoteBatchWithRetries(transport, quoteUrl, symbolList):
+    for attemptNum in range(MAX_LOAD_ATTEMPTS):
+        if (attemptNum > 0):
+            time.sleep(random.uniform(0, min(QUOTE_MAX_BACKOFF_SECS, QUOTE_BASE_BACKOFF_SECS * (2 ** (attemptNum - 1)))))
+
+        batchQuoteDict = FetchQuoteBatch(transport, quoteUrl, symbolList)
+        if (batchQuoteDict is not None):
+            return batchQuoteDict
+    # End - for attemptNum in range(MAX_LOAD_ATTEMPTS):
+
+    print("Error. Cannot get quotes for: " + ",".join(symbolList))
+    return {}
+# End - FetchQuoteBatchWithRetries
+
+
+
+################################################################################
+#
+# [FetchQuoteSnapshot]
+#
+# Get the current quote of every symbol, QUOTE_BATCH_SIZE symbols per request,
+# with numThreads requests at a time. Each batch is tried up to MAX_LOAD_ATTEMPTS
+# times. Returns a dict of symbol to quote dict. A symbol is missing from it if
+# its batch failed or the server did not know it.
+################################################################################
+def FetchQuoteSnapshot(symbolList, transport=None, quoteUrl=YAHOO_QUOTE_URL, numThreads=DEFAULT_QUOTE_THREADS):
+    if (transport is None):
+        transport = CHttpTransport()
+
+    uniqueSymbolList = list(dict.fromkeys(symbolList))
+    batchList = [uniqueSymbolList[index:index + QUOTE_BATCH_SIZE] 
+                    for index in range(0, len(uniqueSymbolList), QUOTE_BATCH_SIZE)]
+
+    snapshotDict = {}
+    with ThreadPoolExecutor(max_workers=max(1, numThreads)) as quotePool:
+        futureList = [quotePool.submit(FetchQuoteBatchWithRetries, transport, quoteUrl, batchSymbolList) 
+                        for batchSymbolList in batchList]
+        for future in futureList:
+            snapshotDict.update(future.result())
+    # End - with ThreadPoolExecutor(max_workers=max(1, numThreads)) as quotePool:
+
+    return snapshotDict
+# End - FetchQuoteSnapshot
+
+
+
+################################################################################
+#
+# [ApplyQuoteToTicker]
+#
+# Set the current values of a ticker from one quote dict.
+# Returns False if the quote does not have the prices.
+################################################################################
+def ApplyQuoteToTicker(stockTicker, quote):
+    # Check the required fields first, so a bad quote leaves the ticker unchanged.
+    valueList = []
+    for setterName, quoteNameList, defaultValue in g_QuoteFieldList:
+        value = defaultValue
+        for quoteName in quoteNameList:
+            if (quote.get(quoteName) is not None):
+                value = quote[quoteName]
+                break
+        # End - for quoteName in quoteNameList:
+
+        if ((value is None) and (setterName == 'SetCompanyName')):
+            value = stockTicker.GetStockSymbol()
+        if (value is None):
+            return False
+        valueList.append((setterName, value))
+    # End - for setterName, quoteNameList, defaultValue in g_QuoteFieldList:
+
+    for setterName, value in valueList:
+        getattr(stockTicker, setterName)(value)
+    return True
+# End - ApplyQuoteToTicker
+
+
+
+################################################################################
+#
+# [UpdateTickerQuotes]
+#
+# Refresh the current values of every ticker in stockTickerDict with one quote
+# snapshot. Returns the number of tickers that were updated.
+################################################################################
+def UpdateTickerQuotes(stockTickerDict, transport=None, quoteUrl=YAHOO_QUOTE_URL, numThreads=DEFAULT_QUOTE_THREADS):
+    symbolList = [tickerSymbol for tickerSymbol, stockTicker in stockTickerDict.items() if (stockTicker is not None)]
+    snapshotDict = FetchQuoteSnapshot(symbolList, transport, quoteUrl, numThreads)
+
+    numUpdated = 0
+    for tickerSymbol in symbolList:
+        quote = snapshotDict.get(tickerSymbol)
+        if ((quote is not None) and (ApplyQuoteToTicker(stockTickerDict[tickerSymbol], quote))):
+            numUpdated += 1
+    # End - for tickerSymbol in symbolList:
+
+    return numUpdated
+# End - UpdateTickerQuotes
+
+
+
+################################################################################
+#
+# [LoadTickerFromFakeSource]
+#
+# Fill in a ticker with a made-up random walk of prices. The prices only depend
+# on the symbol, so every run and every process sees the same values.
+################################################################################
+def LoadTickerFromFakeSource(stockTicker):
+    if (FAKE_SOURCE_LATENCY_SECS > 0):
+        time.sleep(FAKE_SOURCE_LATENCY_SECS)
+
+    randomGenerator = np.random.default_rng(zlib.crc32(stockTicker.GetStockSymbol().encode('utf-8')))
+    numDays = FAKE_SOURCE_NUM_DAYS
+
+    # Only use weekdays. Day number 1 is a Monday.
+    firstDayNum = StockTicker.DateToDayNum(1960, 1, 4)
+    weekNumArray = np.arange(numDays) // 5
+    dayNumArray = (firstDayNum + (weekNumArray * 7) + (np.arange(numDays) % 5)).astype(np.int32)
+    yearArray, monthArray, dayArray = StockTicker.DayNumsToDates(dayNumArray)
+
+    closeArray = np.round(50.0 * np.exp(np.cumsum(randomGenerator.normal(0.0003, 0.012, numDays))), 2)
+    openArray = np.round(closeArray * (1.0 + randomGenerator.normal(0.0, 0.003, numDays)), 2)
+    highArray = np.round(np.maximum(openArray, closeArray) * 1.004, 2)
+    lowArray = np.round(np.minimum(openArray, closeArray) * 0.996, 2)
+    volumeArray = randomGenerator.integers(1000000, 5000000, numDays)
+
+    stockTicker.SetCompanyName(stockTicker.GetStockSymbol())
+    stockTicker.SetCurrentPrice(float(closeArray[-1]))
+    stockTicker.SetPrevClose(float(closeArray[-2]))
+    stockTicker.SetTodayOpenPrice(float(openArray[-1]))
+    stockTicker.SetTodayLowPrice(float(lowArray[-1]))
+    stockTicker.SetTodayHighPrice(float(highArray[-1]))
+    stockTicker.SetVolume(int(volumeArray[-1]))
+    stockTicker.SetTrailingPE(-1)
+    stockTicker.SetForwardPE(-1)
+    stockTicker.SetBid(-1)
+    stockTicker.SetAsk(-1)
+    stockTicker.SetFiftyTwoWeekLow(float(np.min(lowArray[-250:])))
+    stockTicker.SetFiftyTwoWeekHigh(float(np.max(highArray[-250:])))
+    stockTicker.SetFiftyDayAverage(float(np.mean(closeArray[-50:])))
+    stockTicker.SetTwoHundredDayAverage(float(np.mean(closeArray[-200:])))
+    stockTicker.SetAvgVolume(int(np.mean(volumeArray)))
+    stockTicker.SetPEGRatio(0)
+
+    columnDict = {'y': yearArray.astype(np.int16), 'm': monthArray.astype(np.int8), 'd': dayArray.astype(np.int8),
+                    'Cl': closeArray, 'Op': openArray, 'Hi': highArray, 'Lo': lowArray, 
+                    'Vo': volumeArray.astype(np.int64), 'DayNum': dayNumArray}
+    stockTicker.PastPrices.AttachColumns(columnDict, numDays)
+
+    fSuccess = True
+    fRetry = False
+    return fSuccess, fRetry
+# End - LoadTickerFromFakeSource
+
+
+
+################################################################################
+#
+# Ticker Loaders
+#
+# Each source name maps to a function that fills in an empty CStockTicker,
+# and returns fSuccess, fRetry, like LoadTickerFromYahoo.
+################################################################################
+g_TickerLoaderDict = {
+    YAHOO_FINANCE: LoadTickerFromYahoo,
+    FAKE_SOURCE: LoadTickerFromFakeSource
+}
+
+################################################################################
+#
+# [RegisterTickerLoader]
+#
+################################################################################
+def RegisterTickerLoader(tickerSourceName, loaderFunction):
+    g_TickerLoaderDict[tickerSourceName.lower()] = loaderFunction
+# End - RegisterTickerLoader
+
+
+
+################################################################################
+#
+# [FetchTicker]
+#
+# Make and load one ticker. This tries up to MAX_LOAD_ATTEMPTS times, and stops
+# early if the loader succeeds or says there is no point in retrying.
+# Returns None if the ticker could not be loaded.
+################################################################################
+def FetchTicker(tickerSourceName, tickerSymbol):
+    fDebug = False
+    if (fDebug):
+        print("Allocate ticker for " + tickerSymbol)
+
+    # Make a new empty ticker
+    currentTicker = StockTicker.CStockTicker(tickerSymbol)
+    loaderFunction = g_TickerLoaderDict.get(tickerSourceName.lower(), None)
+
+    ###############################################
+    # Now, load all information about this ticker
+    attemptNum = 1
+    fSuccess = False
+    fRetry = False
+    while (attemptNum <= MAX_LOAD_ATTEMPTS):
+        if (loaderFunction is None):
+            #print("FetchTicker. Unrecognized Loader: " + tickerSourceName)
+            attemptNum += 1
+            continue
+
+        try:    
+            fSuccess, fRetry = loaderFunction(currentTicker)
+        except Exception:
+            attemptNum += 1
+            continue
+        # End try/except
+
+        # We succeeded, or if there is no point to retrying, then stop trying
+        if ((fSuccess) or (not fRetry)):
+            break
+        attemptNum += 1
+    # End - while (attemptNum <= MAX_LOAD_ATTEMPTS):
+
+    if ((not fSuccess) or (attemptNum > MAX_LOAD_ATTEMPTS)):
+        print("Error. Cannot find ticker: " + tickerSymbol)
+        return None
+
+    return currentTicker
+# End - FetchTicker
+
+
+
+################################################################################
+#
+# [ComputeTickerStats]
+#
+# This runs in a worker process, so the ticker is pickled there and back.
+################################################################################
+def ComputeTickerStats(stockTicker):
+    stockTicker.ComputeAllStats()
+    return stockTicker
+# End - ComputeTickerStats
+
+
+
+
 #####################################################################################
 #
 # [OpenTickersForStocks]
 #
+# If numFetchThreads is more than 0, then this fetches that many tickers at once
+# on a thread pool, since fetching mostly waits on the network. As each fetch
+# finishes, its stats are computed on a pool of numStatProcesses processes, since
+# that is CPU-bound. If numStatProcesses is 0, then the stats are computed in this
+# process as the fetches finish.
 #####################################################################################
-def OpenTickersForStocks(tickerSourceName, stockNameList, stockTickerDict):
+def OpenTickersForStocks(tickerSourceName, stockNameList, stockTickerDict, numFetchThreads=0, numStatProcesses=0):
     fDebug = False
 
     tickerSourceName = tickerSourceName.lower()
+
+    # We may combine several lists so avoid duplicates
+    symbolList = []
     for tickerSymbol in stockNameList:
         #tickerSymbol = tickerSymbol.lower()
-        if (fDebug):
-            print("Allocate ticker for " + tickerSymbol)
-
-        # We may combine several lists so avoid duplicates
         if ((stockTickerDict is not None) 
                 and (tickerSymbol in stockTickerDict) 
                 and (stockTickerDict[tickerSymbol] is not None)):
             continue
+        if (tickerSymbol not in symbolList):
+            symbolList.append(tickerSymbol)
+    # End - for tickerSymbol in stockNameList:
+
+    if (numFetchThreads <= 0):
+        for tickerSymbol in symbolList:
+            currentTicker = FetchTicker(tickerSourceName, tickerSymbol)
+            if (currentTicker is None):
+                continue
 
-        # Make a new empty ticker
-        currentTicker = CStockTicker(tickerSymbol)
-
-        ###############################################
-        # Now, load all information about this ticker
-        attemptNum = 1
-        maxAttempts = 5
-        fSuccess = False
-        fRetry = False
-        while (attemptNum <= maxAttempts):
-            try:    
-                if (tickerSourceName == YAHOO_FINANCE):
-                    fSuccess, fRetry = LoadTickerFromYahoo(currentTicker)
-                else:
-                    #print("OpenTickersForStocks. Unrecognized Loader: " + tickerSourceName)
-                    attemptNum += 1
+            currentTicker.ComputeAllStats()
+            if (stockTickerDict is not None):
+                stockTickerDict[tickerSymbol] = currentTicker
+        # End - for tickerSymbol in symbolList:
+
+        return stockTickerDict
+    # End - if (numFetchThreads <= 0):
+
+    if (fDebug):
+        print("OpenTickersForStocks. numFetchThreads=" + str(numFetchThreads) + ", numStatProcesses=" + str(numStatProcesses))
+
+    # The worker processes are started fresh rather than forked, because this
+    # process is also running the fetch threads.
+    statPool = None
+    if (numStatProcesses > 0):
+        statPool = ProcessPoolExecutor(max_workers=numStatProcesses, mp_context=multiprocessing.get_context("spawn"))
+
+    # The pool is shut down even if a fetch or a stat worker fails, so its processes are not left running.
+    tickerResultDict = {}
+    statFutureDict = {}
+    try:
+        with ThreadPoolExecutor(max_workers=numFetchThreads) as fetchPool:
+            fetchFutureDict = {}
+            for tickerSymbol in symbolList:
+                fetchFutureDict[fetchPool.submit(FetchTicker, tickerSourceName, tickerSymbol)] = tickerSymbol
+
+            for fetchFuture in as_completed(fetchFutureDict):
+                tickerSymbol = fetchFutureDict[fetchFuture]
+                currentTicker = fetchFuture.result()
+                if (currentTicker is None):
                     continue
-            except Exception:
-                attemptNum += 1
-                continue
-            # End try/except
 
-            # We succeeded, or if there is no point to retrying, then stop trying
-            if ((fSuccess) or (not fRetry)):
-                break
-        # End - while (attemptNum <= maxAttempts):
+                if (statPool is not None):
+                    statFutureDict[statPool.submit(ComputeTickerStats, currentTicker)] = tickerSymbol
+                else:
+                    currentTicker.ComputeAllStats()
+                    tickerResultDict[tickerSymbol] = currentTicker
+            # End - for fetchFuture in as_completed(fetchFutureDict):
+        # End - with ThreadPoolExecutor(max_workers=numFetchThreads) as fetchPool:
+
+        if (statPool is not None):
+            for statFuture in as_completed(statFutureDict):
+                tickerResultDict[statFutureDict[statFuture]] = statFuture.result()
+        # End - if (statPool is not None):
+    finally:
+        if (statPool is not None):
+            statPool.shutdown(cancel_futures=True)
+    # End - try
+
+    # Add them in the order they were asked for, like the serial loop does.
+    if (stockTickerDict is not None):
+        for tickerSymbol in symbolList:
+            if (tickerSymbol in tickerResultDict):
+                stockTickerDict[tickerSymbol] = tickerResultDict[tickerSymbol]
+        # End - for tickerSymbol in symbolList:
+    # End - if (stockTickerDict is not None):
+
+    return stockTickerDict
+# End - OpenTickersForStocks
+
+
 
-        if ((not fSuccess) or (attemptNum > maxAttempts)):
-            currentTicker = None
+
+#####################################################################################
+#
+# [FetchTickersAsync]
+#
+# Get one quote snapshot and the history of every symbol, all at once.
+# Returns a dict of symbol to (quote, columnDict, numRows).
+#####################################################################################
+async def FetchTickersAsync(dataSource, symbolList, quoteUrl, chartUrl):
+    try:
+        historyTaskList = [dataSource.FetchHistory(tickerSymbol, chartUrl) for tickerSymbol in symbolList]
+        replyList = await asyncio.gather(dataSource.FetchQuotes(symbolList, quoteUrl), *historyTaskList)
+    finally:
+        await dataSource.Close()
+
+    snapshotDict = replyList[0]
+    resultDict = {}
+    for tickerSymbol, (columnDict, numRows) in zip(symbolList, replyList[1:]):
+        resultDict[tickerSymbol] = (snapshotDict.get(tickerSymbol), columnDict, numRows)
+    return resultDict
+# End - FetchTickersAsync
+
+
+
+
+#####################################################################################
+#
+# [OpenTickersForStocksAsync]
+#
+# This is like OpenTickersForStocks, but fetches everything through an
+# asyncio data source, which pools connections, limits the request rate,
+# and backs off when the server throttles. A symbol is left out if its
+# quote or history could not be fetched.
+#####################################################################################
+def OpenTickersForStocksAsync(stockNameList, stockTickerDict, dataSource=None, 
+                            quoteUrl=YAHOO_QUOTE_URL, chartUrl=YAHOO_CHART_URL):
+    fDebug = False
+    if (dataSource is None):
+        dataSource = StockAsyncSource.CAsyncDataSource()
+
+    # We may combine several lists so avoid duplicates
+    symbolList = []
+    for tickerSymbol in stockNameList:
+        if ((stockTickerDict is not None) 
+                and (tickerSymbol in stockTickerDict) 
+                and (stockTickerDict[tickerSymbol] is not None)):
+            continue
+        if (tickerSymbol not in symbolList):
+            symbolList.append(tickerSymbol)
+    # End - for tickerSymbol in stockNameList:
+
+    resultDict = asyncio.run(FetchTickersAsync(dataSource, symbolList, quoteUrl, chartUrl))
+    if (fDebug):
+        print("OpenTickersForStocksAsync. numRequests=" + str(dataSource.m_NumRequests) 
+                + ", numRetries=" + str(dataSource.m_NumRetries) + ", numFailed=" + str(dataSource.m_NumFailed))
+
+    for tickerSymbol in symbolList:
+        quote, columnDict, numRows = resultDict[tickerSymbol]
+        currentTicker = StockTicker.CStockTicker(tickerSymbol)
+        if ((quote is None) or (columnDict is None) or (not ApplyQuoteToTicker(currentTicker, quote))):
             print("Error. Cannot find ticker: " + tickerSymbol)
             continue
 
+        currentTicker.PastPrices.AttachColumns(columnDict, numRows)
         currentTicker.ComputeAllStats()
         if (stockTickerDict is not None):
             stockTickerDict[tickerSymbol] = currentTicker
-    # End - for securityInfoDict in stockNameList:
-
+    # End - for tickerSymbol in symbolList:
 
     return stockTickerDict
-# End - OpenTickersForStocks
+# End - OpenTickersForStocksAsync
 
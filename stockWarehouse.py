@@ -0,0 +1,286 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Price Warehouse
+#
+# This is a SQLite database with the price history of many tickers. There is one
+# row per ticker per trading day, with the daily bar and every computed indicator.
+# The table is WITHOUT ROWID, so the rows are stored in the (ticker, dayNum)
+# primary key b-tree. The days of one ticker are stored together, in date order,
+# and a date range is one contiguous scan of that b-tree.
+#
+# The database is in WAL mode. A nightly job writes new prices while web server
+# processes keep reading the last committed version, without blocking each other.
+#
+# A reader asks for one ticker and a date range, and gets columns that go
+# straight into a CStockTicker, so it never loads more history than it needs.
+#
+################################################################################
+import os
+import sys
+import sqlite3
+
+import numpy as np
+
+# Apache will not let you set the lib from an imported library.
+# So, this *assumes* that it can import all other libraries from the same directory.
+import stockTicker as StockTicker
+import stockPriceStore as StockPriceStore
+import stockPriceFile as StockPriceFile
+
+WAREHOUSE_FILE_NAME = "stockPrices.db"
+
+# How long a connection waits for another writer to finish, in seconds.
+WAREHOUSE_BUSY_TIMEOUT_SECS = 30.0
+
+# The price columns that are stored in the database. The y, m and d columns
+# are not stored, since they are computed from DayNum when the rows are read.
+g_WarehouseColumnList = [(columnName, columnType) for columnName, columnType in StockPriceStore.g_PriceColumnList 
+                            if columnName not in ('y', 'm', 'd', 'DayNum')]
+
+g_CreateTableStrList = [
+    "CREATE TABLE IF NOT EXISTS Prices (Ticker TEXT NOT NULL, DayNum INTEGER NOT NULL, "
+        + ", ".join(columnName + (" INTEGER" if (columnType == np.int64) else " REAL") 
+                    for columnName, columnType in g_WarehouseColumnList)
+        + ", PRIMARY KEY (Ticker, DayNum)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS Tickers (Ticker TEXT NOT NULL PRIMARY KEY, "
+        + ", ".join(priceName + (" INTEGER" if (priceName == 'Volume') else " REAL") 
+                    for priceName in StockPriceFile.g_CurrentPriceNameList)
+        + ") WITHOUT ROWID"
+]
+
+g_InsertPricesStr = ("INSERT OR REPLACE INTO Prices (Ticker, DayNum, " 
+                    + ", ".join(columnName for columnName, _ in g_WarehouseColumnList) + ") VALUES (?, ?"
+                    + (", ?" * len(g_WarehouseColumnList)) + ")")
+g_InsertTickerStr = ("INSERT OR REPLACE INTO Tickers (Ticker, " + ", ".join(StockPriceFile.g_CurrentPriceNameList) 
+                    + ") VALUES (?" + (", ?" * len(StockPriceFile.g_CurrentPriceNameList)) + ")")
+
+
+
+
+
+################################################################################
+#
+# class CStockWarehouse
+#
+################################################################################
+class CStockWarehouse(object):
+    #####################################################
+    # Constructor - This method is part of any class
+    #####################################################
+    def __init__(self, dbFilePath, fReadOnly=False):
+        self.m_DBFilePath = dbFilePath
+        self.m_fReadOnly = fReadOnly
+        self.m_Connection = None
+    # End -  __init__
+
+
+    #####################################################
+    # [CStockWarehouse::
+    # Destructor - This method is part of any class
+    #####################################################
+    def __del__(self):
+        self.Close()
+    # End of destructor
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::Open]
+    #
+    # A read-only warehouse must already exist.
+    # Returns False if the database cannot be opened.
+    #####################################################
+    def Open(self):
+        try:
+            if (self.m_fReadOnly):
+                dbUri = "file:" + os.path.abspath(self.m_DBFilePath) + "?mode=ro"
+                self.m_Connection = sqlite3.connect(dbUri, uri=True, timeout=WAREHOUSE_BUSY_TIMEOUT_SECS)
+            else:
+                self.m_Connection = sqlite3.connect(self.m_DBFilePath, timeout=WAREHOUSE_BUSY_TIMEOUT_SECS)
+                # WAL is saved in the file, so readers use it too.
+                self.m_Connection.execute("PRAGMA journal_mode=WAL")
+                # In WAL mode, this is still safe if the process crashes. Only a power
+                # failure can lose the last commits.
+                self.m_Connection.execute("PRAGMA synchronous=NORMAL")
+                with self.m_Connection:
+                    for createTableStr in g_CreateTableStrList:
+                        self.m_Connection.execute(createTableStr)
+            # End - if (self.m_fReadOnly):
+        except sqlite3.Error as err:
+            print("CStockWarehouse::Open. Cannot open " + self.m_DBFilePath + ": " + str(err))
+            self.Close()
+            return False
+
+        return True
+    # End - Open
+
+
+    #####################################################
+    # [CStockWarehouse::Close]
+    #####################################################
+    def Close(self):
+        if (self.m_Connection is not None):
+            self.m_Connection.close()
+            self.m_Connection = None
+    # End - Close
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::WriteTicker]
+    #
+    # Save the current prices and the past prices of a ticker, all in one
+    # transaction. Only the days from firstDayNum on are written, so a
+    # nightly update can pass the first new day. A day that is already in
+    # the warehouse is replaced.
+    # Returns the number of days written.
+    #####################################################
+    def WriteTicker(self, stockTicker, firstDayNum=None):
+        tickerSymbol = stockTicker.GetStockSymbol()
+        priceStore = stockTicker.PastPrices
+        dayNumArray = priceStore.GetColumn('DayNum')
+        firstIndex = 0
+        if (firstDayNum is not None):
+            firstIndex = int(np.searchsorted(dayNumArray, firstDayNum, side='left'))
+        numRows = priceStore.GetNumRows() - firstIndex
+
+        # tolist() makes Python ints and floats, which sqlite3 can bind.
+        columnValueList = [[tickerSymbol] * numRows, dayNumArray[firstIndex:].tolist()]
+        for columnName, _ in g_WarehouseColumnList:
+            columnValueList.append(priceStore.GetColumn(columnName)[firstIndex:].tolist())
+        volume = stockTicker.volume
+        if (volume is not None):
+            volume = int(volume)
+        tickerValues = [tickerSymbol, stockTicker.CurrentPrice, stockTicker.PrevClose, stockTicker.TodayOpenPrice,
+                        stockTicker.TodayLowPrice, stockTicker.TodayHighPrice, volume]
+
+        with self.m_Connection:
+            self.m_Connection.execute(g_InsertTickerStr, tickerValues)
+            self.m_Connection.executemany(g_InsertPricesStr, zip(*columnValueList))
+
+        return numRows
+    # End - WriteTicker
+
+
+    #####################################################
+    # [CStockWarehouse::GetTickerSymbols]
+    #####################################################
+    def GetTickerSymbols(self):
+        cursor = self.m_Connection.execute("SELECT Ticker FROM Tickers ORDER BY Ticker")
+        return [row[0] for row in cursor.fetchall()]
+    # End - GetTickerSymbols
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::GetLastDayNum]
+    #
+    # Returns None if the ticker has no prices.
+    #####################################################
+    def GetLastDayNum(self, tickerSymbol):
+        cursor = self.m_Connection.execute("SELECT MAX(DayNum) FROM Prices WHERE Ticker = ?", (tickerSymbol,))
+        return cursor.fetchone()[0]
+    # End - GetLastDayNum
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::ReadCurrentPrices]
+    #
+    # Returns a dict with the names in g_CurrentPriceNameList,
+    # or None if the ticker is not in the warehouse.
+    #####################################################
+    def ReadCurrentPrices(self, tickerSymbol):
+        cursor = self.m_Connection.execute("SELECT " + ", ".join(StockPriceFile.g_CurrentPriceNameList) 
+                                            + " FROM Tickers WHERE Ticker = ?", (tickerSymbol,))
+        row = cursor.fetchone()
+        if (row is None):
+            return None
+
+        currentPriceDict = dict(zip(StockPriceFile.g_CurrentPriceNameList, row))
+        # A warehouse made before Volume was an INTEGER column has it as a REAL.
+        if (currentPriceDict['Volume'] is not None):
+            currentPriceDict['Volume'] = int(currentPriceDict['Volume'])
+        return currentPriceDict
+    # End - ReadCurrentPrices
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::ReadPriceColumns]
+    #
+    # Read the past prices of one ticker from firstDayNum to lastDayNum,
+    # inclusive. Either may be None, for no limit.
+    # Returns a dict with every column in g_PriceColumnList, and the number of rows.
+    #####################################################
+    def ReadPriceColumns(self, tickerSymbol, firstDayNum=None, lastDayNum=None):
+        if (firstDayNum is None):
+            firstDayNum = np.iinfo(np.int32).min
+        if (lastDayNum is None):
+            lastDayNum = np.iinfo(np.int32).max
+
+        cursor = self.m_Connection.execute("SELECT DayNum, " + ", ".join(columnName for columnName, _ in g_WarehouseColumnList)
+                                            + " FROM Prices WHERE Ticker = ? AND DayNum BETWEEN ? AND ? ORDER BY DayNum",
+                                            (tickerSymbol, int(firstDayNum), int(lastDayNum)))
+        rowList = cursor.fetchall()
+        numRows = len(rowList)
+
+        # One 2-D array, then each column is one row of its transpose.
+        # Volumes are exact as floats, up to 2**53.
+        valueMatrix = np.array(rowList, dtype=np.float64).reshape(numRows, len(g_WarehouseColumnList) + 1).T
+        columnDict = {'DayNum': valueMatrix[0].astype(np.int32)}
+        for columnIndex, (columnName, columnType) in enumerate(g_WarehouseColumnList):
+            columnDict[columnName] = valueMatrix[columnIndex + 1].astype(columnType)
+        yearArray, monthArray, dayArray = StockTicker.DayNumsToDates(columnDict['DayNum'])
+        columnDict['y'] = yearArray.astype(np.int16)
+        columnDict['m'] = monthArray.astype(np.int8)
+        columnDict['d'] = dayArray.astype(np.int8)
+
+        return columnDict, numRows
+    # End - ReadPriceColumns
+
+
+    #####################################################
+    #
+    # [CStockWarehouse::OpenTicker]
+    #
+    # Make a ticker with the prices from firstYear on. 
+    # Returns None if the ticker is not in the warehouse.
+    #####################################################
+    def OpenTicker(self, tickerSymbol, firstYear=0, lastDayNum=None):
+        currentPriceDict = self.ReadCurrentPrices(tickerSymbol)
+        if (currentPriceDict is None):
+            return None
+
+        firstDayNum = None
+        if (firstYear > 0):
+            firstDayNum = StockTicker.DateToDayNum(firstYear, 1, 1)
+        columnDict, numRows = self.ReadPriceColumns(tickerSymbol, firstDayNum, lastDayNum)
+        return StockTicker.LoadTickerFromColumns(tickerSymbol, columnDict, numRows, currentPriceDict, 0)
+    # End - OpenTicker
+
+# End - CStockWarehouse
+
@@ -26,11 +26,15 @@
 ################################################################################
 import os
 import sys
+import time
+
+# Time the import, so the cold start of a new worker process can be measured.
+g_ImportStartTime = time.perf_counter()
 
 # WSGI also seems to require the named import style. 
-import os
+import gc
+import threading
 from datetime import datetime
-import platform
 import importlib
 
 starTimeStr = str(datetime.now().time())
@@ -41,24 +45,58 @@ if g_DirPath not in sys.path:
     sys.path.insert(0, g_DirPath)
 #sys.path.append("/var/www/cgi-bin")
 
+# Only the modules that every request needs are imported here. The stock modules
+# pull in numpy, which takes most of 100ms to import, so they are imported by
+# LoadStockData the first time they are needed.
 import fileTemplate as FileTemplate
-import stockTicker as StockTicker
-import stockAccount as StockAccount
-import stockRobot as StockRobot
-import stockMarket as StockMarket
-import stockInfo_SP500 as StockInfoSP500
+StockTicker = None
+StockAccount = None
+StockRobot = None
+StockMarket = None
+StockWarehouse = None
+StockSharedStore = None
 
 NEWLINE_STR = "\n"
 
-ticker = StockTicker.LoadTickerFromValueDict(StockTicker.SP500_TICKER, StockInfoSP500.g_PriceInfo_SP500, 1990)
+# If this environment variable is "1", then the data is loaded when this module is
+# imported. A server that imports the application and then forks its workers, like
+# gunicorn --preload, then shares one copy of the data between every worker.
+# A server can also call Preload itself before it forks.
+PRELOAD_ENV_VAR_NAME = "STOCK_WEB_PRELOAD"
+
+# The prices are read from the shared ticker store published by the nightly pipeline,
+# so every worker maps the same pages. If it has not run, then they are read from the
+# price warehouse, or else the price file, both made by stockInfoConverter.py. If there
+# are neither, then fall back to the data module, which is much slower to import.
+# These are stockPipeline.SHARED_STORE_DIR_NAME and stockWarehouse.WAREHOUSE_FILE_NAME.
+g_SharedStoreDirPath = os.path.join(g_DirPath, "nightly", "shared")
+g_WarehouseFilePath = os.path.join(g_DirPath, "stockPrices.db")
+g_SP500PriceFilePath = os.path.join(g_DirPath, "SP500.prices")
+
+# The S&P 500 ticker. This is None until LoadStockData runs.
+# If there is a shared store, then use GetStockTicker instead, since the
+# store may have switched to a newer day's data since this was opened.
+ticker = None
+g_SharedStore = None
+g_fStockDataLoaded = False
+g_StockDataLock = threading.Lock()
+
+# The report made by the nightly pipeline, stockPipeline.py. These are its
+# PIPELINE_OUTPUT_DIR_NAME, CURRENT_LINK_NAME and REPORT_FILE_NAME.
+g_PipelineReportPath = os.path.join(g_DirPath, "nightly", "current", "report.html")
+
+# The page bytes of the current pipeline version, and the version directory they
+# came from. A new version is read the first time a request sees it.
+g_ReportVersionPath = None
+g_ReportPageBytes = None
 
 numExtremePrices = 10
 g_InitialAccountValue = 10000
-extremeType = StockTicker.EXTREMES_MAX_PRICES
-extremeType = StockTicker.EXTREMES_MIN_PRICES
-extremeType = StockTicker.EXTREMES_MAX_PRICE_CHANGES
-extremeType = StockTicker.EXTREMES_MAX_PRICE_INCREASES
-extremeType = StockTicker.EXTREMES_MAX_PRICE_DECLINES
+# extremeType = StockTicker.EXTREMES_MAX_PRICES
+# extremeType = StockTicker.EXTREMES_MIN_PRICES
+# extremeType = StockTicker.EXTREMES_MAX_PRICE_CHANGES
+# extremeType = StockTicker.EXTREMES_MAX_PRICE_INCREASES
+# extremeType = StockTicker.EXTREMES_MAX_PRICE_DECLINES
 
 
 # numExtremePriceDays, priceList, extremePriceDays, extremePricePrevDays = ticker.GetDaysWithExtremePrices(extremeType, numExtremePrices)
@@ -69,6 +107,11 @@ extremeType = StockTicker.EXTREMES_MAX_PRICE_DECLINES
 # finalValue = account.GetAccountValue()
 # print("Final Value: " + str(finalValue))
 
+# Or, for every number of days up to numExtremePrices at once:
+# skipBestArray, skipWorstArray, skipBothArray = StockMarket.GetSkipExtremeDaysCurves(ticker, numExtremePrices, 
+#                                                           initialValue=g_InitialAccountValue)
+# print("Final Value, skipping the 10 worst days: " + str(skipWorstArray[10]))
+
 
 
 
@@ -148,6 +191,130 @@ class CWebServerRequestContext(object):
 
 
 
+################################################################################
+#
+# [LoadStockData]
+#
+# Import the stock modules and open the S&P 500 ticker. This only does the work
+# once, and is safe to call from several request threads at once.
+# Returns the ticker, or None if there is no price data.
+################################################################################
+def LoadStockData():
+    global StockTicker, StockAccount, StockRobot, StockMarket, StockWarehouse, StockSharedStore
+    global ticker
+    global g_SharedStore
+    global g_fStockDataLoaded
+
+    if (g_fStockDataLoaded):
+        return ticker
+
+    with g_StockDataLock:
+        if (g_fStockDataLoaded):
+            return ticker
+        loadStartTime = time.perf_counter()
+
+        StockTicker = importlib.import_module("stockTicker")
+        StockAccount = importlib.import_module("stockAccount")
+        StockRobot = importlib.import_module("stockRobot")
+        StockMarket = importlib.import_module("stockMarket")
+        StockWarehouse = importlib.import_module("stockWarehouse")
+        StockSharedStore = importlib.import_module("stockSharedStore")
+
+        newTicker = None
+        sharedStore = StockSharedStore.CSharedTickerStore(g_SharedStoreDirPath)
+        if (sharedStore.Open()):
+            g_SharedStore = sharedStore
+            newTicker = g_SharedStore.GetTicker(StockTicker.SP500_TICKER, 1990)
+        if ((newTicker is None) and (os.path.exists(g_WarehouseFilePath))):
+            warehouse = StockWarehouse.CStockWarehouse(g_WarehouseFilePath, fReadOnly=True)
+            if (warehouse.Open()):
+                newTicker = warehouse.OpenTicker(StockTicker.SP500_TICKER, 1990)
+                warehouse.Close()
+        if ((newTicker is None) and (os.path.exists(g_SP500PriceFilePath))):
+            newTicker = StockTicker.OpenTickerFromPriceFile(g_SP500PriceFilePath, 1990)
+        if (newTicker is None):
+            try:
+                StockInfoSP500 = importlib.import_module("stockInfo_SP500")
+                newTicker = StockTicker.LoadTickerFromValueDict(StockTicker.SP500_TICKER, StockInfoSP500.g_PriceInfo_SP500, 1990)
+            except ImportError:
+                print("stockWebServer. There is no S&P 500 price data", file=sys.stderr)
+        # End - if (newTicker is None):
+
+        ticker = newTicker
+        g_fStockDataLoaded = True
+        print("stockWebServer. Loaded stock data in " + ("%.1f" % ((time.perf_counter() - loadStartTime) * 1000.0)) 
+                + " ms, pid " + str(os.getpid()), file=sys.stderr)
+    # End - with g_StockDataLock:
+
+    return ticker
+# End - LoadStockData
+
+
+
+################################################################################
+#
+# [GetStockTicker]
+#
+# Returns a ticker from the newest published data, or None if there is none.
+################################################################################
+def GetStockTicker(tickerSymbol):
+    LoadStockData()
+    if (g_SharedStore is not None):
+        return g_SharedStore.GetTicker(tickerSymbol, 1990)
+    if ((ticker is not None) and (ticker.GetStockSymbol() == tickerSymbol)):
+        return ticker
+    return None
+# End - GetStockTicker
+
+
+
+################################################################################
+#
+# [Preload]
+#
+# Load everything a request may need. Call this in the parent process before it
+# forks the workers, so they all share the same pages copy-on-write.
+################################################################################
+def Preload():
+    LoadStockData()
+    GetPipelineReportPage()
+
+    # Move everything loaded so far out of the garbage collector's generations.
+    # Otherwise the first collection in each worker writes to every object header,
+    # and that copies the shared pages into each worker.
+    gc.freeze()
+# End - Preload
+
+
+
+################################################################################
+#
+# [GetPipelineReportPage]
+#
+# Returns the bytes of the current precomputed report, or None if the pipeline
+# has not run yet. Resolving the link is the only work on each request.
+################################################################################
+def GetPipelineReportPage():
+    global g_ReportVersionPath
+    global g_ReportPageBytes
+
+    reportVersionPath = os.path.realpath(g_PipelineReportPath)
+    if (reportVersionPath != g_ReportVersionPath):
+        try:
+            with open(reportVersionPath, "rb") as fileH:
+                g_ReportPageBytes = fileH.read()
+        except OSError:
+            return None
+        g_ReportVersionPath = reportVersionPath
+    # End - if (reportVersionPath != g_ReportVersionPath):
+
+    return g_ReportPageBytes
+# End - GetPipelineReportPage
+
+
+
+
+
 ################################################################################
 #
 # [application]
@@ -162,6 +329,14 @@ def application(environ, start_response):
     # Make our wrapper for the environment.
     requestContext = CWebServerRequestContext(environ)
 
+    # Serve the nightly report as it is, if there is one.
+    output = GetPipelineReportPage()
+    if (output is not None):
+        response_headers = [('Content-type', 'text/html'),
+                            ('Content-Length', str(len(output)))]
+        start_response(status, response_headers)
+        return [output]
+
     try:
         reportHTML = FileTemplate.MakeTemplate()
         startimeStr = datetime.today().strftime("%A %B %d, %Y (%H:%M:%S)")
@@ -169,23 +344,31 @@ def application(environ, start_response):
 
         localDirPath = os.path.dirname(os.path.realpath(__file__))
         localTemplatePath = localDirPath + "/finTech.html"
-        textStr = reportHTML.ExpandTemplate(localTemplatePath)
 
-        output = textStr.encode('utf-8')
-        contentTypeStr = 'text/html'
+        # The page is sent in chunks as it is made, so there is no Content-Length.
+        outputChunks = reportHTML.ExpandTemplateToResponse(localTemplatePath)
+        response_headers = [('Content-type', 'text/html')]
     except:
         errStr = "Exception in MakeServerInfoPage. Version 1 textStr=(" + textStr + ")"
         output = errStr.encode('utf-8')
-        contentTypeStr = 'text/plain'
-
-    response_headers = [('Content-type', contentTypeStr),
-                        ('Content-Length', str(len(output)))]
+        outputChunks = [output]
+        response_headers = [('Content-type', 'text/plain'),
+                            ('Content-Length', str(len(output)))]
 
     start_response(status, response_headers)
-    return [output]
+    return outputChunks
 # End - application
 
 
 
+if (os.environ.get(PRELOAD_ENV_VAR_NAME, "") == "1"):
+    Preload()
+
+# mod_wsgi sends stderr to the error log.
+print("stockWebServer. Imported in " + ("%.1f" % ((time.perf_counter() - g_ImportStartTime) * 1000.0)) 
+        + " ms, pid " + str(os.getpid()), file=sys.stderr)
+
+
+
 
 
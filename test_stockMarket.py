@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+################################################################################
+#
+# Copyright (c) 2024 Dawson Dean
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+################################################################################
+#
+# Tests for stockMarket.py
+#
+# Run with: python3 -m pytest -q
+#
+################################################################################
+import numpy as np
+
+import stockTicker as StockTicker
+import stockAccount as StockAccount
+import stockRobot as StockRobot
+import stockMarket as StockMarket
+
+INITIAL_ACCOUNT_VALUE = 10000
+
+
+
+################################################################################
+#
+# [MakeTickerFromCloses]
+#
+################################################################################
+def MakeTickerFromCloses(closeList):
+    stockTicker = StockTicker.CStockTicker("TEST")
+    dayNum = StockTicker.DateToDayNum(2000, 1, 3)
+    for closePrice in closeList:
+        year, month, day = StockTicker.DayNumToDate(dayNum)
+        stockTicker.SetPastValues(year, month, day, closePrice, closePrice, 1000, closePrice, closePrice, 
+                                50, 0, 0, 0, 0, 0, 0)
+        dayNum += 1
+    # End - for closePrice in closeList:
+
+    return stockTicker
+# End - MakeTickerFromCloses
+
+
+
+################################################################################
+#
+# [RunSkipDatesRobot]
+#
+################################################################################
+def RunSkipDatesRobot(stockTicker, extremeType, numDays):
+    numExtremePriceDays, priceList, extremePriceDays, extremePricePrevDays = stockTicker.GetDaysWithExtremePrices(
+                                                                                extremeType, numDays)
+    robot = StockRobot.MakeSkipDatesRobot(numExtremePriceDays, priceList, extremePriceDays, extremePricePrevDays)
+    account = StockAccount.MakeTradingAccount(INITIAL_ACCOUNT_VALUE)
+    StockMarket.RunRobot(stockTicker, robot, account, -1)
+    return account.GetAccountValue()
+# End - RunSkipDatesRobot
+
+
+
+################################################################################
+#
+# [test_SkipExtremeDaysCurvesMatchRobotWithTies]
+#
+# Integer prices give many days with the same price change. The curve must
+# skip the same days as the robot, which takes the earlier day of a tie.
+################################################################################
+def test_SkipExtremeDaysCurvesMatchRobotWithTies():
+    closeList = [10, 12, 11, 13, 12, 14, 13, 15, 14, 16, 15, 17, 16, 18, 17, 19, 18, 20, 19, 21, 20, 
+                25, 24, 26, 25, 27, 26, 28, 27, 29, 28, 30, 29, 31, 30]
+    stockTicker = MakeTickerFromCloses(closeList)
+    maxNumDays = 12
+    skipBestArray, skipWorstArray, _ = StockMarket.GetSkipExtremeDaysCurves(stockTicker, maxNumDays, 
+                                                    initialValue=INITIAL_ACCOUNT_VALUE, fRankByPriceChange=True)
+
+    for numDays in range(1, maxNumDays + 1):
+        robotValue = RunSkipDatesRobot(stockTicker, StockTicker.EXTREMES_MAX_PRICE_DECLINES, numDays)
+        assert np.isclose(skipWorstArray[numDays], robotValue, rtol=1e-9), numDays
+
+        robotValue = RunSkipDatesRobot(stockTicker, StockTicker.EXTREMES_MAX_PRICE_INCREASES, numDays)
+        assert np.isclose(skipBestArray[numDays], robotValue, rtol=1e-9), numDays
+    # End - for numDays in range(1, maxNumDays + 1):
+# End - test_SkipExtremeDaysCurvesMatchRobotWithTies